@@ -6,11 +6,26 @@ import json
 import os
 from datetime import datetime, timedelta
 import shlex
+import heapq
+import bisect
+import itertools
+import contextlib
+import contextvars
+import re
+import urllib.parse
 import logging
 import shutil
 from typing import Optional, List, Dict, Any
 import threading
 import time
+import sqlite3
+import concurrent.futures
+import tempfile
+import mmap
+import struct
+from array import array
+from collections import Counter, OrderedDict, deque
+import atexit
 from dotenv import load_dotenv
 import psutil
 
@@ -57,7 +72,6 @@ bot = commands.Bot(command_prefix=BOT_PREFIX, intents=intents, help_command=None
 
 # Global variables
 VPS_USER_ROLE_ID = None
-cpu_monitor_active = True
 system_stats = {
     'uptime': datetime.now(),
     'total_vps_created': 0,
@@ -65,18 +79,48 @@ system_stats = {
     'commands_executed': 0
 }
 
+# Fire-and-forget tasks; the event loop only keeps weak references, so hold them until they finish
+background_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.get_running_loop().create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
 # Data storage functions
+USER_DATA_FILE = os.getenv('USER_DATA_FILE', 'user_data.json')
+VPS_DATA_FILE = os.getenv('VPS_DATA_FILE', 'vps_data.json')
+ADMIN_DATA_FILE = os.getenv('ADMIN_DATA_FILE', 'admin_data.json')
+DEPLOY_DATA_FILE = os.getenv('DEPLOY_DATA_FILE', 'deployments.json')
+SAVE_DEBOUNCE_MS = int(os.getenv('SAVE_DEBOUNCE_MS', '500'))
+JOURNAL_FILE = os.getenv('JOURNAL_FILE', 'data_journal.log')
+JOURNAL_COMPACT_BYTES = int(os.getenv('JOURNAL_COMPACT_BYTES', str(4 * 1024 * 1024)))
+JOURNAL_COMPACT_INTERVAL = int(os.getenv('JOURNAL_COMPACT_INTERVAL', '3600'))
+
+def quarantine_corrupt_file(path):
+    """Move an unreadable data file aside instead of silently overwriting it"""
+    corrupt_path = f"{path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    try:
+        os.replace(path, corrupt_path)
+        logger.error(f"{path} is corrupted, moved to {corrupt_path}; recovering from journal")
+    except OSError as e:
+        logger.error(f"{path} is corrupted and could not be moved aside: {e}")
+
 def load_data():
     try:
-        with open(os.getenv('USER_DATA_FILE', 'user_data.json'), 'r') as f:
+        with open(USER_DATA_FILE, 'r') as f:
             return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logger.warning("user_data.json not found or corrupted, initializing empty data")
+    except FileNotFoundError:
+        logger.warning("user_data.json not found, initializing empty data")
+        return {}
+    except json.JSONDecodeError:
+        quarantine_corrupt_file(USER_DATA_FILE)
         return {}
 
 def load_vps_data():
     try:
-        with open(os.getenv('VPS_DATA_FILE', 'vps_data.json'), 'r') as f:
+        with open(VPS_DATA_FILE, 'r') as f:
             loaded = json.load(f)
             vps_data = {}
             for uid, v in loaded.items():
@@ -91,38 +135,467 @@ def load_vps_data():
                     logger.warning(f"Unknown VPS data format for user {uid}, skipping")
                     continue
             return vps_data
-    except (FileNotFoundError, json.JSONDecodeError):
-        logger.warning("vps_data.json not found or corrupted, initializing empty data")
+    except FileNotFoundError:
+        logger.warning("vps_data.json not found, initializing empty data")
+        return {}
+    except json.JSONDecodeError:
+        quarantine_corrupt_file(VPS_DATA_FILE)
         return {}
 
 def load_admin_data():
     try:
-        with open(os.getenv('ADMIN_DATA_FILE', 'admin_data.json'), 'r') as f:
+        with open(ADMIN_DATA_FILE, 'r') as f:
             return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logger.warning("admin_data.json not found or corrupted, initializing with main admin")
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        if isinstance(e, json.JSONDecodeError):
+            quarantine_corrupt_file(ADMIN_DATA_FILE)
+        else:
+            logger.warning("admin_data.json not found, initializing with main admin")
         return {"admins": [str(MAIN_ADMIN_ID)], "purge_protection": {"enabled": True, "protected_users": [], "protected_vps": 0}}
 
+def load_deployment_data():
+    try:
+        with open(DEPLOY_DATA_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        quarantine_corrupt_file(DEPLOY_DATA_FILE)
+        return {}
+
+def atomic_write(path, payload):
+    """Write a file via temp file + rename so readers never see a partial write"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# Storage backends
+class JsonBackend:
+    """JSON snapshots plus an append-only mutation journal replayed at startup"""
+    name = 'json'
+
+    def __init__(self, paths, journal_path=JOURNAL_FILE, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.paths = paths
+        self.journal_path = journal_path
+        self.compact_bytes = compact_bytes
+        self._journal = None
+        self._journal_size = 0
+        self._last_compaction = time.monotonic()
+        self.wants_compaction = False
+        self.stats = {'replayed': 0, 'appended': 0, 'compactions': 0}
+
+    def load(self):
+        users, vps, admin, deploy = load_data(), load_vps_data(), load_admin_data(), load_deployment_data()
+        self._replay({'user': users, 'vps': vps, 'admin': admin, 'deploy': deploy})
+        return users, vps, admin, deploy
+
+    def _replay(self, stores):
+        """Apply the journal tail on top of the snapshots, dropping a torn last record"""
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        good_offset = 0
+        with f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete record")
+                    entry = json.loads(line)
+                    target = stores[entry['s']]
+                    if 'full' in entry:
+                        target.clear()
+                        target.update(entry['full'])
+                    elif entry.get('d'):
+                        target.pop(entry['k'], None)
+                    else:
+                        target[entry['k']] = entry['v']
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring torn journal tail at byte {good_offset}: {e}")
+                    break
+                good_offset += len(line)
+                self.stats['replayed'] += 1
+        if os.path.getsize(self.journal_path) != good_offset:
+            os.truncate(self.journal_path, good_offset)
+        self._journal_size = good_offset
+        if self.stats['replayed']:
+            logger.info(f"Replayed {self.stats['replayed']} journal entries")
+            self.wants_compaction = True
+
+    def serialize(self, store, obj, keys):
+        """Journal records for the changed keys (or the whole store)"""
+        if keys is None:
+            return json.dumps({'s': store, 'op': 'full', 'full': obj}, separators=(',', ':')) + '\n'
+        lines = []
+        for key in keys:
+            entry = {'s': store, 'k': key, 'op': keys[key] if isinstance(keys, dict) else None}
+            if key in obj:
+                entry['v'] = obj[key]
+            else:
+                entry['d'] = 1
+            lines.append(json.dumps(entry, separators=(',', ':')))
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def has_journal_tail(self):
+        return self._journal_size > 0
+
+    def serialize_snapshot(self, store, obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+    def write(self, batch, snapshot=None):
+        records = ''.join(batch.values()).encode()
+        if records:
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'ab')
+            # One fsync per flush batches every mutation since the last flush
+            self._journal.write(records)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_size += len(records)
+            self.stats['appended'] += records.count(b'\n')
+        if snapshot:
+            # Every change is already journaled, so replaying the old journal over
+            # these snapshots is idempotent if we crash before truncating it
+            for store, payload in snapshot.items():
+                atomic_write(self.paths[store], payload)
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'ab')
+            self._journal.truncate(0)
+            os.fsync(self._journal.fileno())
+            self._journal_size = 0
+            self._last_compaction = time.monotonic()
+            self.stats['compactions'] += 1
+        self.wants_compaction = self._journal_size >= self.compact_bytes or (
+            self._journal_size > 0 and time.monotonic() - self._last_compaction >= JOURNAL_COMPACT_INTERVAL)
+
+class SqliteBackend:
+    """SQLite (WAL) storage with row-level updates keyed by user id"""
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            credits INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS vps (
+            owner_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            container_name TEXT,
+            status TEXT,
+            plan TEXT,
+            plan_type TEXT,
+            processor TEXT,
+            created_at TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (owner_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_vps_container ON vps(container_name);
+        CREATE INDEX IF NOT EXISTS idx_vps_status ON vps(status);
+        CREATE TABLE IF NOT EXISTS admin (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS deployments (
+            deployment_id TEXT PRIMARY KEY,
+            status TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Reads only happen in load(); the bot serves from the in-memory working set,
+        # so after startup the connection belongs to the persistence thread
+        self.conn = self._connect()
+        self.conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def is_migrated(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_at'").fetchone()
+        return row is not None
+
+    def migrate_from_json(self):
+        """One-shot import of the JSON files (legacy VPS formats are normalized by load_vps_data)"""
+        users, vps, admin, deploy = load_data(), load_vps_data(), load_admin_data(), load_deployment_data()
+        self.write({
+            'user': self.serialize('user', users, None),
+            'vps': self.serialize('vps', vps, None),
+            'admin': self.serialize('admin', admin, None),
+            'deploy': self.serialize('deploy', deploy, None),
+        })
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_at', ?)", (datetime.now().isoformat(),))
+        logger.info(f"Migrated {len(users)} users and {sum(len(v) for v in vps.values())} VPS from JSON to SQLite")
+
+    def load(self):
+        if not self.is_migrated():
+            self.migrate_from_json()
+        users = {uid: json.loads(data) for uid, data in self.conn.execute("SELECT user_id, data FROM users")}
+        vps = {}
+        for owner_id, data in self.conn.execute("SELECT owner_id, data FROM vps ORDER BY owner_id, position"):
+            vps.setdefault(owner_id, []).append(json.loads(data))
+        admin = {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM admin")}
+        if not admin:
+            admin = load_admin_data()
+        deploy = {deployment_id: json.loads(data) for deployment_id, data in self.conn.execute("SELECT deployment_id, data FROM deployments")}
+        return users, vps, admin, deploy
+
+    def _user_row(self, user_id, record):
+        credits = record.get('credits', 0) if isinstance(record, dict) else 0
+        return (user_id, credits, json.dumps(record))
+
+    def _vps_rows(self, owner_id, vps_list):
+        return [
+            (owner_id, position, vps.get('container_name'), vps.get('status'), vps.get('plan'),
+             vps.get('plan_type'), vps.get('processor'), vps.get('created_at'), json.dumps(vps))
+            for position, vps in enumerate(vps_list)
+        ]
+
+    def serialize(self, store, obj, keys):
+        """Build the row changes for a store; keys=None means the whole store"""
+        selected = obj.keys() if keys is None else keys
+        rows = {}
+        for key in selected:
+            if key not in obj:
+                rows[key] = None  # deleted
+            elif store == 'user':
+                rows[key] = [self._user_row(key, obj[key])]
+            elif store == 'deploy':
+                rows[key] = [(key, obj[key].get('status'), json.dumps(obj[key]))]
+            elif store == 'admin':
+                rows[key] = [(key, json.dumps(obj[key]))]
+            else:
+                rows[key] = self._vps_rows(key, obj[key])
+        return (None if keys is None else set(keys), rows)
+
+    def write(self, batch, snapshot=None):
+        # WAL already gives SQLite its own journal; snapshots are never requested
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            for store, (keys, rows) in batch.items():
+                table, key_column = {'user': ('users', 'user_id'), 'vps': ('vps', 'owner_id'),
+                                     'admin': ('admin', 'key'), 'deploy': ('deployments', 'deployment_id')}[store]
+                if keys is None:
+                    cur.execute(f"DELETE FROM {table}")
+                else:
+                    cur.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", [(key,) for key in keys])
+                for key_rows in rows.values():
+                    if not key_rows:
+                        continue
+                    if store == 'user':
+                        cur.executemany("INSERT INTO users (user_id, credits, data) VALUES (?, ?, ?)", key_rows)
+                    elif store == 'deploy':
+                        cur.executemany("INSERT INTO deployments (deployment_id, status, data) VALUES (?, ?, ?)", key_rows)
+                    elif store == 'admin':
+                        cur.executemany("INSERT INTO admin (key, value) VALUES (?, ?)", key_rows)
+                    else:
+                        cur.executemany(
+                            "INSERT INTO vps (owner_id, position, container_name, status, plan, plan_type, processor, created_at, data) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", key_rows)
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json').lower()
+SQLITE_DB_FILE = os.getenv('SQLITE_DB_FILE', 'vps_bot.db')
+
+if STORAGE_BACKEND == 'sqlite':
+    storage_backend = SqliteBackend(SQLITE_DB_FILE)
+else:
+    storage_backend = JsonBackend({'user': USER_DATA_FILE, 'vps': VPS_DATA_FILE, 'admin': ADMIN_DATA_FILE, 'deploy': DEPLOY_DATA_FILE})
+
 # Load all data at startup
-user_data = load_data()
-vps_data = load_vps_data()
-admin_data = load_admin_data()
+user_data, vps_data, admin_data, deployment_data = storage_backend.load()
+logger.info(f"Loaded data using {storage_backend.name} backend")
 
 # Ensure purge protection exists
 if 'purge_protection' not in admin_data:
     admin_data['purge_protection'] = {"enabled": True, "protected_users": [], "protected_vps": 0}
 
-def save_data():
-    try:
-        with open(os.getenv('USER_DATA_FILE', 'user_data.json'), 'w') as f:
-            json.dump(user_data, f, indent=4)
-        with open(os.getenv('VPS_DATA_FILE', 'vps_data.json'), 'w') as f:
-            json.dump(vps_data, f, indent=4)
-        with open(os.getenv('ADMIN_DATA_FILE', 'admin_data.json'), 'w') as f:
-            json.dump(admin_data, f, indent=4)
-        logger.info("Data saved successfully")
-    except Exception as e:
-        logger.error(f"Error saving data: {e}")
+class PersistenceManager:
+    """Write-behind persistence with per-store dirty tracking and coalesced flushes"""
+
+    def __init__(self, backend, stores, interval_ms=SAVE_DEBOUNCE_MS):
+        # stores: name -> callable returning the live object
+        self.backend = backend
+        self.stores = stores
+        self.interval = interval_ms / 1000
+        # name -> {dirty key: mutation op}, or None when the whole store is dirty
+        self._dirty = {}
+        self._compact_requested = False
+        self._dirty_lock = threading.Lock()
+        # Single writer thread keeps flushes in order
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='persistence')
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._last_flush = 0.0
+        self.stats = {'flushes': 0, 'stores_written': 0, 'last_flush_ms': 0.0, 'errors': 0}
+
+    def mark_dirty(self, *names, keys=None, op=None):
+        """Flag stores (or only some of their keys) as changed; safe to call from any thread"""
+        with self._dirty_lock:
+            for name in names or self.stores.keys():
+                if name not in self.stores:
+                    logger.warning(f"Unknown data store: {name}")
+                    continue
+                if keys is None:
+                    self._dirty[name] = None
+                elif name not in self._dirty:
+                    self._dirty[name] = dict.fromkeys(keys, op)
+                elif self._dirty[name] is not None:
+                    self._dirty[name].update(dict.fromkeys(keys, op))
+        if self._loop and self._wakeup and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        if self._dirty or getattr(self.backend, 'wants_compaction', False):
+            self._wakeup.set()
+        self._task = self._loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            # Coalesce: never write more than once per interval
+            delay = self._last_flush + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error saving data: {e}")
+
+    def _capture(self, compact=False):
+        """Take the dirty sets and shallow copies of the stores they cover, then clear the dirty flags.
+
+        Runs on the event loop thread so the copies are consistent; serializing them is left
+        to the writer thread.
+        """
+        with self._dirty_lock:
+            dirty = self._dirty
+            self._dirty = {}
+        changes = {}
+        for name, keys in dirty.items():
+            obj = self.stores[name]()
+            # Only the dirty rows are needed; a missing key is written as a deletion
+            changes[name] = (keys, dict(obj) if keys is None else {key: obj[key] for key in keys if key in obj})
+        full = None
+        if compact or self._compact_requested:
+            self._compact_requested = False
+            full = {name: dict(getter()) for name, getter in self.stores.items()}
+        return changes, full
+
+    def _write_batch(self, changes, full):
+        start = time.perf_counter()
+        batch = {name: self.backend.serialize(name, obj, keys) for name, (keys, obj) in changes.items()}
+        snapshot = None
+        if full is not None:
+            snapshot = {name: self.backend.serialize_snapshot(name, obj) for name, obj in full.items()}
+        self.backend.write(batch, snapshot)
+        self.stats['flushes'] += 1
+        self.stats['stores_written'] += len(batch)
+        self.stats['last_flush_ms'] = (time.perf_counter() - start) * 1000
+        if getattr(self.backend, 'wants_compaction', False):
+            self._compact_requested = True
+            if self._loop and self._wakeup and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+        if batch:
+            logger.info(f"Data saved successfully ({', '.join(sorted(batch))})")
+        if snapshot:
+            logger.info("Data snapshot written and journal compacted")
+
+    async def flush(self):
+        """Write all dirty stores now without blocking the event loop"""
+        changes, full = self._capture()
+        self._last_flush = time.monotonic()
+        if changes or full:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write_batch, changes, full)
+
+    def flush_sync(self):
+        """Blocking flush used on shutdown; also compacts so the next start is fast"""
+        try:
+            compact = hasattr(self.backend, 'serialize_snapshot') and (
+                self._dirty or self.backend.has_journal_tail())
+            changes, full = self._capture(compact=bool(compact))
+            if not changes and not full:
+                return
+            try:
+                self._executor.submit(self._write_batch, changes, full).result()
+            except RuntimeError:
+                # Executor already shut down at interpreter exit; its queue is drained
+                self._write_batch(changes, full)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error saving data: {e}")
+
+persistence = PersistenceManager(storage_backend, {
+    'user': lambda: user_data,
+    'vps': lambda: vps_data,
+    'admin': lambda: admin_data,
+    'deploy': lambda: deployment_data,
+})
+atexit.register(persistence.flush_sync)
+
+# Deployment states used to be kept inside the admin store
+if 'deployments' in admin_data:
+    migrated = admin_data.pop('deployments')
+    deployment_data.update(migrated)
+    persistence.mark_dirty('admin', keys=['deployments'], op='deploy_migrate')
+    persistence.mark_dirty('deploy', keys=list(migrated), op='deploy_migrate')
+
+def save_data(*stores, key=None, op=None):
+    """Mark stores ('user', 'vps', 'admin', 'deploy') as changed; all stores if none given.
+
+    Pass key (a user id, deployment id, admin setting, or an iterable of them) when only those rows changed,
+    and op to label the mutation in the journal (e.g. 'credit_debit', 'vps_create').
+    """
+    if not stores or 'vps' in stores:
+        fleet_index.mark_dirty(key)
+        container_index.mark_dirty(key)
+    if key is None:
+        persistence.mark_dirty(*stores, op=op)
+    else:
+        persistence.mark_dirty(*stores, keys=[key] if isinstance(key, str) else key, op=op)
+
+def fleet_summary():
+    """Return (total_users, total_vps, running_vps) for overview embeds"""
+    # Every backend loads the full working set into memory, so this never touches storage
+    total_vps = sum(len(vps_list) for vps_list in vps_data.values())
+    running_vps = sum(1 for vps_list in vps_data.values() for vps in vps_list if vps.get('status') == 'running')
+    return len(vps_data), total_vps, running_vps
+
+def get_user_vps(user_id):
+    """VPS records owned by a user (the in-memory working set is keyed by owner)"""
+    return vps_data.get(user_id, [])
 
 # Admin checks
 def is_admin():
@@ -151,32 +624,105 @@ def maintenance_check():
     return commands.check(predicate)
 
 # Enhanced embed creation functions
+EMBED_ICON_URL = "https://i.ibb.co/XfknV1sc/IMG-20251018-110425.jpg"
+EMBED_FOOTER_PREFIX = f"{BOT_NAME} • Michael • "
+
+def embed_field(name, value, inline=False):
+    return {'name': str(name), 'value': str(value), 'inline': inline}
+
+class EmbedTemplate:
+    """The static parts of an embed, built once; render() only stamps the time (and any extra fields)"""
+
+    def __init__(self, title, description="", color=0x1a1a1a, fields=None, thumbnail=True, footer=None):
+        self.data = {'type': 'rich', 'title': f"▌ {title}", 'description': description, 'color': color, 'fields': []}
+        if thumbnail:
+            self.data['thumbnail'] = {'url': EMBED_ICON_URL}
+        # A fixed footer replaces the default timestamped one
+        self.footer = {'text': footer} if footer else None
+        for field in fields or ():
+            self.data['fields'].append(embed_field(f"▸ {field['name']}", field['value'], field.get('inline', False)))
+
+    def add_field(self, name, value, inline=False):
+        self.data['fields'].append(embed_field(name, value, inline))
+        return self
+
+    def render(self, fields=(), now=None):
+        now = now or datetime.now()
+        data = dict(self.data)
+        # Field dicts are copied because Embed.set_field_at edits them in place
+        data['fields'] = [dict(field) for field in self.data['fields']] + [embed_field(**field) for field in fields]
+        data['footer'] = dict(self.footer) if self.footer else {'text': EMBED_FOOTER_PREFIX + now.strftime('%Y-%m-%d %H:%M:%S'), 'icon_url': EMBED_ICON_URL}
+        embed = discord.Embed.from_dict(data)
+        embed.timestamp = now
+        return embed
+
 def create_embed(title, description="", color=0x1a1a1a, fields=None, thumbnail=True):
     """Create a dark-themed embed with enhanced styling"""
-    embed = discord.Embed(
-        title=f"▌ {title}",
-        description=description,
-        color=color,
-        timestamp=datetime.now()
-    )
-
-    if thumbnail:
-        embed.set_thumbnail(url="https://i.ibb.co/XfknV1sc/IMG-20251018-110425.jpg")
-
-    if fields:
-        for field in fields:
-            embed.add_field(
-                name=f"▸ {field['name']}",
-                value=field["value"],
-                inline=field.get("inline", False)
-            )
+    return EmbedTemplate(title, description, color, fields, thumbnail).render()
+
+class StaticEmbedCache:
+    """Prebuilt templates for static screens, rebuilt when the data version moves on"""
+
+    def __init__(self):
+        self.version = 0
+        self.templates = {}
+
+    def invalidate(self):
+        """Bump the data version; every page rebuilds on its next use"""
+        self.version += 1
+
+    def get(self, key, build):
+        entry = self.templates.get(key)
+        if entry is None or entry[0] != self.version:
+            entry = (self.version, build())
+            self.templates[key] = entry
+        return entry[1].render()
+
+static_embeds = StaticEmbedCache()
+
+# Debounced progress messages
+PROGRESS_UPDATE_INTERVAL = float(os.getenv('PROGRESS_UPDATE_INTERVAL', '1.5'))
+
+class ProgressReporter:
+    """Coalesces progress edits of one message into at most one edit per interval; the final state always lands"""
+
+    def __init__(self, edit, interval=PROGRESS_UPDATE_INTERVAL):
+        self.edit = edit  # e.g. message.edit or interaction.edit_original_response
+        self.interval = interval
+        self.pending = None
+        self.last_edit = 0.0
+        self.task = None
+        self.lock = asyncio.Lock()
+
+    def update(self, embed):
+        """Queue the latest state without waiting; earlier unsent states are dropped"""
+        self.pending = embed
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        delay = self.last_edit + self.interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await self._send()
+        except Exception as e:
+            logger.warning(f"Progress update failed: {e}")
 
-    embed.set_footer(
-        text=f"{BOT_NAME} • Michael • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        icon_url="https://i.ibb.co/XfknV1sc/IMG-20251018-110425.jpg"
-    )
+    async def _send(self, **kwargs):
+        async with self.lock:
+            embed, self.pending = self.pending, None
+            if embed is None:
+                return
+            self.last_edit = time.monotonic()
+            await self.edit(embed=embed, **kwargs)
 
-    return embed
+    async def finish(self, embed, **kwargs):
+        """Deliver the final state now, superseding any scheduled update"""
+        if self.task and not self.task.done():
+            self.task.cancel()
+        self.pending = embed
+        await self._send(**kwargs)
 
 def create_success_embed(title, description=""):
     return create_embed(title, description, color=0x00ff88)
@@ -193,23 +739,660 @@ def create_warning_embed(title, description=""):
 def create_premium_embed(title, description=""):
     return create_embed(title, description, color=0xffd700)
 
+# Native LXD API client
+def _default_lxd_socket():
+    for path in ('/var/snap/lxd/common/lxd/unix.socket', '/var/lib/lxd/unix.socket'):
+        if os.path.exists(path):
+            return path
+    return ''
+
+LXD_API_ENABLED = os.getenv('LXD_API_ENABLED', 'true').lower() == 'true'
+LXD_SOCKET = os.getenv('LXD_SOCKET', '') or _default_lxd_socket()
+LXD_POOL_SIZE = int(os.getenv('LXD_POOL_SIZE', '8'))
+
+# Image remotes the CLI ships with, so remote:alias launches work over the API too
+LXD_IMAGE_REMOTES = {
+    'ubuntu': {'server': 'https://cloud-images.ubuntu.com/releases', 'protocol': 'simplestreams'},
+    'ubuntu-daily': {'server': 'https://cloud-images.ubuntu.com/daily', 'protocol': 'simplestreams'},
+    'images': {'server': 'https://images.linuxcontainers.org', 'protocol': 'simplestreams'},
+}
+
+class LXDAPIError(Exception):
+    """LXD rejected a request or an operation failed"""
+
+class LXDUnavailable(Exception):
+    """The LXD socket could not be reached; callers fall back to the CLI"""
+
+class LXDClient:
+    """Minimal asyncio LXD REST client over the local unix socket with keep-alive pooling"""
+
+    def __init__(self, socket_path, pool_size=LXD_POOL_SIZE):
+        self.socket_path = socket_path
+        self.pool_size = pool_size
+        self._idle = []
+        self.stats = {'requests': 0, 'connections_opened': 0, 'reused': 0}
+
+    async def _acquire(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.stats['reused'] += 1
+                return True, reader, writer
+            writer.close()
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        except OSError as e:
+            raise LXDUnavailable(f"Cannot connect to LXD socket {self.socket_path}: {e}")
+        self.stats['connections_opened'] += 1
+        return False, reader, writer
+
+    def _release(self, reader, writer, keep_alive):
+        if keep_alive and len(self._idle) < self.pool_size:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+
+    @staticmethod
+    async def _read_response(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("LXD closed the connection")
+        status = int(status_line.split(b' ', 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip(), 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+            body = bytes(body)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return status, body, keep_alive
+
+    async def request(self, method, path, body=None, timeout=120, raw=False):
+        """Send one HTTP request and return the decoded LXD response (or raw bytes)"""
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = (f"{method} {path} HTTP/1.1\r\nHost: lxd\r\nUser-Agent: {BOT_NAME}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n").encode()
+        self.stats['requests'] += 1
+        for attempt in range(2):
+            reused, reader, writer = await self._acquire()
+            try:
+                writer.write(head + payload)
+                await writer.drain()
+                status, data, keep_alive = await asyncio.wait_for(self._read_response(reader), timeout=timeout)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                # The server may have dropped an idle keep-alive connection; retry once on a fresh one
+                if reused and attempt == 0:
+                    continue
+                raise LXDAPIError(f"LXD connection error: {e}")
+            except BaseException:
+                writer.close()
+                raise
+            self._release(reader, writer, keep_alive)
+            break
+
+        if raw:
+            if status >= 400:
+                raise LXDAPIError(f"LXD returned HTTP {status} for {path}")
+            return data
+        response = json.loads(data) if data else {}
+        if status >= 400 or response.get('type') == 'error':
+            raise LXDAPIError(response.get('error') or f"LXD returned HTTP {status} for {path}")
+        return response
+
+    async def wait_operation(self, operation, timeout=120):
+        """Block on LXD's operation wait endpoint instead of polling"""
+        response = await self.request('GET', f"{operation}/wait?timeout={int(timeout)}", timeout=timeout + 5)
+        metadata = response.get('metadata') or {}
+        if metadata.get('status') != 'Success':
+            raise LXDAPIError(metadata.get('err') or f"Operation {metadata.get('status', 'failed')}")
+        return metadata
+
+    async def call(self, method, path, body=None, timeout=120):
+        """Run a request and, for async responses, wait for the operation to finish"""
+        response = await self.request(method, path, body, timeout=timeout)
+        if response.get('type') == 'async':
+            return await self.wait_operation(response['operation'], timeout)
+        return response.get('metadata')
+
+    @staticmethod
+    def _instance_path(name):
+        return f"/1.0/instances/{urllib.parse.quote(name, safe='')}"
+
+    @staticmethod
+    def image_source(image):
+        """Translate a CLI image reference (remote:alias, alias or fingerprint) to an API source"""
+        remote, sep, alias = image.partition(':')
+        if not sep:
+            remote, alias = 'local', image
+        if remote == 'local':
+            if re.fullmatch(r'[0-9a-f]{12,64}', alias):
+                return {'type': 'image', 'fingerprint': alias}
+            return {'type': 'image', 'alias': alias}
+        if remote not in LXD_IMAGE_REMOTES:
+            return None
+        return {'type': 'image', 'mode': 'pull', 'alias': alias, **LXD_IMAGE_REMOTES[remote]}
+
+    async def list_instances(self, recursion=1):
+        return await self.call('GET', f"/1.0/instances?recursion={recursion}")
+
+    async def info(self, name):
+        return await self.call('GET', f"{self._instance_path(name)}?recursion=1")
+
+    async def state(self, name):
+        return await self.call('GET', f"{self._instance_path(name)}/state")
+
+    async def launch(self, name, source, config=None, profiles=None, devices=None, start=True, timeout=600):
+        body = {'name': name, 'type': 'container', 'source': source, 'config': config or {}, 'devices': devices or {}}
+        if profiles is not None:
+            body['profiles'] = profiles
+        await self.call('POST', '/1.0/instances', body, timeout=timeout)
+        if start:
+            await self.start(name, timeout=timeout)
+
+    async def change_state(self, name, action, force=False, stateful=False, timeout=120):
+        body = {'action': action, 'timeout': int(timeout), 'force': force, 'stateful': stateful}
+        return await self.call('PUT', f"{self._instance_path(name)}/state", body, timeout=timeout + 5)
+
+    async def start(self, name, stateful=False, timeout=120):
+        return await self.change_state(name, 'start', stateful=stateful, timeout=timeout)
+
+    async def stop(self, name, force=False, stateful=False, timeout=120):
+        return await self.change_state(name, 'stop', force=force, stateful=stateful, timeout=timeout)
+
+    async def restart(self, name, force=False, timeout=120):
+        return await self.change_state(name, 'restart', force=force, timeout=timeout)
+
+    async def delete(self, name, force=False, timeout=120):
+        if force:
+            current = await self.info(name)
+            if current.get('status') != 'Stopped':
+                await self.stop(name, force=True, timeout=timeout)
+        return await self.call('DELETE', self._instance_path(name), timeout=timeout)
+
+    async def snapshot(self, name, snapshot, timeout=120):
+        return await self.call('POST', f"{self._instance_path(name)}/snapshots", {'name': snapshot}, timeout=timeout)
+
+    async def restore(self, name, snapshot, timeout=120):
+        return await self.call('PUT', self._instance_path(name), {'restore': snapshot}, timeout=timeout)
+
+    async def rename(self, name, new_name, timeout=120):
+        return await self.call('POST', self._instance_path(name), {'name': new_name}, timeout=timeout)
+
+    async def assign_profiles(self, name, profiles, timeout=120):
+        return await self.call('PATCH', self._instance_path(name), {'profiles': profiles}, timeout=timeout)
+
+    async def set_config(self, name, config, timeout=120):
+        return await self.call('PATCH', self._instance_path(name), {'config': config}, timeout=timeout)
+
+    async def unset_config(self, name, keys, timeout=120):
+        current = await self.info(name)
+        writable = {key: current.get(key) for key in ('architecture', 'config', 'devices', 'ephemeral', 'profiles', 'stateful', 'description')}
+        for key in keys:
+            writable['config'].pop(key, None)
+        return await self.call('PUT', self._instance_path(name), writable, timeout=timeout)
+
+    async def add_device(self, name, device_name, device, timeout=120):
+        current = await self.info(name)
+        devices = dict(current.get('devices') or {})
+        if device_name in devices:
+            raise LXDAPIError("The device already exists")
+        devices[device_name] = device
+        return await self.call('PATCH', self._instance_path(name), {'devices': devices}, timeout=timeout)
+
+    async def exec(self, name, command, timeout=120):
+        """Run a command and return (exit code, stdout, stderr)"""
+        body = {'command': command, 'record-output': True, 'wait-for-websocket': False, 'interactive': False}
+        metadata = await self.call('POST', f"{self._instance_path(name)}/exec", body, timeout=timeout)
+        result = metadata.get('metadata') or {}
+        output = result.get('output') or {}
+        stdout = await self.request('GET', output['1'], raw=True) if output.get('1') else b''
+        stderr = await self.request('GET', output['2'], raw=True) if output.get('2') else b''
+        for log_path in output.values():
+            try:
+                await self.request('DELETE', log_path)
+            except LXDAPIError:
+                pass
+        return result.get('return', 0), stdout.decode(errors='replace'), stderr.decode(errors='replace')
+
+    async def run_cli(self, args, timeout=120):
+        """Execute an `lxc ...` argv over the API; returns None when the command has no API mapping"""
+        if len(args) < 2 or args[0] != 'lxc':
+            return None
+        sub, rest = args[1], args[2:]
+
+        if sub in ('start', 'stop', 'restart') and rest:
+            name, flags = rest[0], rest[1:]
+            force = stateful = False
+            op_timeout = timeout
+            i = 0
+            while i < len(flags):
+                if flags[i] in ('--force', '-f'):
+                    force = True
+                elif flags[i] == '--stateful':
+                    stateful = True
+                elif flags[i] == '--timeout' and i + 1 < len(flags) and flags[i + 1].isdigit():
+                    op_timeout = int(flags[i + 1])
+                    i += 1
+                else:
+                    # Other flags, extra instance names or a malformed --timeout: leave them to the CLI
+                    return None
+                i += 1
+            if sub == 'start':
+                await self.start(name, stateful=stateful, timeout=op_timeout)
+            elif sub == 'stop':
+                await self.stop(name, force=force, stateful=stateful, timeout=op_timeout)
+            else:
+                await self.restart(name, force=force, timeout=op_timeout)
+            return True
+
+        if sub == 'profile' and len(rest) == 3 and rest[0] == 'assign':
+            await self.assign_profiles(rest[1], [p for p in rest[2].split(',') if p], timeout=timeout)
+            return True
+
+        if sub == 'move' and len(rest) == 2 and not any(arg.startswith('-') or ':' in arg for arg in rest):
+            await self.rename(rest[0], rest[1], timeout=timeout)
+            return True
+
+        if sub == 'delete' and len(rest) in (1, 2) and rest[1:] in ([], ['--force'], ['-f']):
+            await self.delete(rest[0], force=len(rest) == 2, timeout=timeout)
+            return True
+
+        if sub == 'config' and len(rest) >= 4 and rest[0] == 'set':
+            name, pairs = rest[1], rest[2:]
+            if all('=' in p for p in pairs):
+                config = dict(p.split('=', 1) for p in pairs)
+            elif len(pairs) == 2:
+                config = {pairs[0]: pairs[1]}
+            else:
+                return None
+            await self.set_config(name, config, timeout=timeout)
+            return True
+
+        if sub == 'config' and len(rest) >= 3 and rest[0] == 'unset':
+            await self.unset_config(rest[1], rest[2:], timeout=timeout)
+            return True
+
+        if sub == 'config' and len(rest) >= 5 and rest[:2] == ['device', 'add']:
+            name, device_name, device_type, pairs = rest[2], rest[3], rest[4], rest[5:]
+            if not all('=' in p for p in pairs):
+                return None
+            device = {'type': device_type, **dict(p.split('=', 1) for p in pairs)}
+            await self.add_device(name, device_name, device, timeout=timeout)
+            return True
+
+        if sub in ('launch', 'init') and len(rest) >= 2:
+            return await self._run_launch(rest, timeout, start=sub == 'launch')
+
+        if sub in ('snapshot', 'restore') and len(rest) == 2 and not any(arg.startswith('-') for arg in rest):
+            await (self.snapshot if sub == 'snapshot' else self.restore)(rest[0], rest[1], timeout=timeout)
+            return True
+
+        if sub == 'exec' and len(rest) >= 3 and rest[1] == '--':
+            code, stdout, stderr = await self.exec(rest[0], rest[2:], timeout=timeout)
+            if code != 0:
+                raise LXDAPIError(stderr.strip() or f"Command exited with status {code}")
+            return stdout.strip() or True
+
+        if sub == 'query':
+            method, data, path = 'GET', None, None
+            i = 0
+            while i < len(rest):
+                if rest[i] in ('-X', '--request') and i + 1 < len(rest):
+                    method = rest[i + 1]
+                    i += 2
+                elif rest[i] in ('-d', '--data') and i + 1 < len(rest):
+                    try:
+                        data = json.loads(rest[i + 1])
+                    except ValueError:
+                        return None
+                    i += 2
+                elif rest[i] == '--wait':
+                    i += 1
+                elif rest[i].startswith('-') or path is not None:
+                    return None
+                else:
+                    path = rest[i]
+                    i += 1
+            if path is None:
+                return None
+            metadata = await self.call(method, path, data, timeout=timeout)
+            return json.dumps(metadata) if metadata is not None else True
+
+        return None
+
+    async def _run_launch(self, rest, timeout, start=True):
+        image, name = rest[0], rest[1]
+        config, profiles, pool, root_size = {}, None, None, None
+        i = 2
+        while i < len(rest):
+            flag = rest[i]
+            value = rest[i + 1] if i + 1 < len(rest) else None
+            if flag in ('--config', '-c') and value and '=' in value:
+                key, val = value.split('=', 1)
+                config[key] = val
+            elif flag in ('--storage', '-s') and value:
+                pool = value
+            elif flag in ('--profile', '-p') and value:
+                profiles = (profiles or []) + [value]
+            elif flag in ('--device', '-d') and value and value.startswith('root,size='):
+                root_size = value.split('=', 1)[1]
+            else:
+                return None
+            i += 2
+        source = self.image_source(image)
+        if source is None:
+            return None
+        devices = {}
+        if pool:
+            devices['root'] = {'type': 'disk', 'path': '/', 'pool': pool}
+            if root_size:
+                devices['root']['size'] = root_size
+        elif root_size:
+            # Overriding the root size needs to know the profile's pool; let the CLI resolve it
+            return None
+        await self.launch(name, source, config=config, profiles=profiles, devices=devices, start=start, timeout=timeout)
+        return True
+
+lxd_client = LXDClient(LXD_SOCKET) if LXD_API_ENABLED and LXD_SOCKET else None
+
+# LXC operation scheduler
+LXC_MAX_CONCURRENCY = int(os.getenv('LXC_MAX_CONCURRENCY', '8'))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: 'interactive', PRIORITY_NORMAL: 'normal', PRIORITY_BACKGROUND: 'background'}
+
+# Containers whose lock the current task already holds (see LxcScheduler.exclusive)
+_held_containers = contextvars.ContextVar('held_containers', default=frozenset())
+
+class LxcScheduler:
+    """Global concurrency cap for LXC operations with priority classes and per-container FIFO locks"""
+
+    def __init__(self, max_concurrency=LXC_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._active = 0
+        self._waiters = []  # heap of (priority, sequence, future)
+        self._sequence = itertools.count()
+        self._container_locks = {}
+        self._container_refs = {}
+        self.stats = {p: {'submitted': 0, 'waiting': 0, 'total_wait': 0.0, 'max_wait': 0.0} for p in PRIORITY_NAMES}
+
+    async def _acquire_slot(self, priority):
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed to us right before cancellation
+            if future.done() and not future.cancelled():
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the highest-priority waiter
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    @contextlib.asynccontextmanager
+    async def _container_lock(self, container):
+        if not container or container in _held_containers.get():
+            yield
+            return
+        lock = self._container_locks.setdefault(container, asyncio.Lock())
+        self._container_refs[container] = self._container_refs.get(container, 0) + 1
+        try:
+            async with lock:
+                token = _held_containers.set(_held_containers.get() | {container})
+                try:
+                    yield
+                finally:
+                    _held_containers.reset(token)
+        finally:
+            self._container_refs[container] -= 1
+            if not self._container_refs[container]:
+                del self._container_refs[container]
+                del self._container_locks[container]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, container=None, priority=PRIORITY_NORMAL):
+        """Wait for the container's turn, then for a global slot; yields while the operation runs"""
+        stats = self.stats[priority]
+        stats['submitted'] += 1
+        stats['waiting'] += 1
+        start = time.monotonic()
+        acquired = False
+        try:
+            async with self._container_lock(container):
+                await self._acquire_slot(priority)
+                acquired = True
+                stats['waiting'] -= 1
+                waited = time.monotonic() - start
+                stats['total_wait'] += waited
+                stats['max_wait'] = max(stats['max_wait'], waited)
+                try:
+                    yield
+                finally:
+                    self._release_slot()
+        finally:
+            if not acquired:
+                stats['waiting'] -= 1
+
+    @contextlib.asynccontextmanager
+    async def exclusive(self, container):
+        """Hold a container's lock across several execute_lxc calls (e.g. reinstall)"""
+        async with self._container_lock(container):
+            yield
+
+    def snapshot(self):
+        return {
+            'active': self._active,
+            'max_concurrency': self.max_concurrency,
+            'queued': len(self._waiters),
+            'containers_busy': len(self._container_locks),
+            'priorities': {
+                PRIORITY_NAMES[p]: {
+                    'submitted': s['submitted'],
+                    'waiting': s['waiting'],
+                    'avg_wait_ms': (s['total_wait'] / s['submitted'] * 1000) if s['submitted'] else 0.0,
+                    'max_wait_ms': s['max_wait'] * 1000,
+                } for p, s in self.stats.items()
+            },
+        }
+
+lxc_scheduler = LxcScheduler()
+
+def lxc_target(args):
+    """Container an `lxc ...` argv operates on, or None for fleet-wide commands"""
+    if len(args) < 3 or args[0] != 'lxc':
+        return None
+    sub = args[1]
+    if sub == 'launch' and len(args) >= 4:
+        return args[3]
+    if sub == 'config':
+        if args[2] in ('set', 'unset', 'show', 'get') and len(args) >= 4:
+            return args[3]
+        if args[2] == 'device' and len(args) >= 5:
+            return args[4]
+        return None
+    if sub in ('start', 'stop', 'restart', 'delete', 'info', 'exec', 'snapshot', 'restore', 'rename', 'move', 'copy'):
+        target = args[2]
+        return None if target.startswith('-') else target.split('/')[0]
+    return None
+
+# Latency instrumentation
+PERF_SNAPSHOT_FILE = os.getenv('PERF_SNAPSHOT_FILE', 'perf_metrics.json')
+PERF_SNAPSHOT_INTERVAL = int(os.getenv('PERF_SNAPSHOT_INTERVAL', '60'))
+# Bucket upper bounds in seconds, ~19% apart from 1ms to ~20min
+LATENCY_BUCKETS = tuple(0.001 * 1.19 ** i for i in range(81))
+PERF_KINDS = {'command': "⌨️ Commands", 'button': "🖱️ Manage Buttons", 'lxc': "📦 LXC Operations"}
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets: O(1) record, percentiles accurate to one bucket"""
+
+    def __init__(self):
+        self.counts = array('L', bytes(array('L').itemsize * (len(LATENCY_BUCKETS) + 1)))
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds, error=False):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if error:
+            self.errors += 1
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
+class PerfRegistry:
+    """Latency histograms per (kind, name): bot commands, manage buttons and lxc subcommands"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.started_at = time.time()
+        self._task = None
+
+    def record(self, kind, name, seconds, error=False):
+        histogram = self.histograms.get((kind, name))
+        if histogram is None:
+            histogram = self.histograms[(kind, name)] = LatencyHistogram()
+        histogram.record(seconds, error)
+
+    @contextlib.contextmanager
+    def timer(self, kind, name):
+        """Time the block; it counts as an error if it raises or sets the yielded outcome's 'error'"""
+        started = time.perf_counter()
+        outcome = {'error': False}
+        try:
+            yield outcome
+        except BaseException:
+            self.record(kind, name, time.perf_counter() - started, error=True)
+            raise
+        self.record(kind, name, time.perf_counter() - started, error=outcome['error'])
+
+    def summaries(self, kind):
+        """[(name, summary)] for one kind, busiest first"""
+        rows = [(name, histogram.summary()) for (row_kind, name), histogram in self.histograms.items() if row_kind == kind]
+        return sorted(rows, key=lambda row: row[1]['count'], reverse=True)
+
+    def snapshot(self):
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'uptime_seconds': round(time.time() - self.started_at),
+            'commands_executed': system_stats['commands_executed'],
+            **{kind: {name: {key: round(value, 6) for key, value in summary.items()} for name, summary in self.summaries(kind)}
+               for kind in PERF_KINDS},
+        }
+
+    def write_snapshot(self, path=PERF_SNAPSHOT_FILE):
+        atomic_write(path, json.dumps(self.snapshot(), indent=2))
+
+    def start(self):
+        if PERF_SNAPSHOT_INTERVAL <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(PERF_SNAPSHOT_INTERVAL)
+            try:
+                await asyncio.to_thread(self.write_snapshot)
+            except Exception as e:
+                logger.error(f"Error writing perf snapshot: {e}")
+
+perf = PerfRegistry()
+
+# lxc commands whose next token is always a subcommand; for every other command it is an instance name
+LXC_COMMAND_GROUPS = ('config', 'profile', 'image', 'storage', 'network', 'file', 'remote')
+
+def lxc_operation_name(cmd):
+    """'lxc config set vps-1 ...' -> 'config set'; one histogram per subcommand"""
+    if len(cmd) < 2:
+        return 'lxc'
+    if cmd[1] in LXC_COMMAND_GROUPS and len(cmd) > 2 and not cmd[2].startswith('-'):
+        if cmd[1] in ('config', 'profile') and cmd[2] == 'device' and len(cmd) > 3:
+            return f"{cmd[1]} device {cmd[3]}"
+        return f"{cmd[1]} {cmd[2]}"
+    return cmd[1]
+
 # Enhanced LXC execution
-async def execute_lxc(command, timeout=120):
-    """Execute LXC command with timeout and error handling"""
-    try:
-        cmd = shlex.split(command)
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+async def _execute_lxc_cli(cmd, timeout):
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+
+    if proc.returncode != 0:
+        error = stderr.decode().strip() if stderr else "Command failed with no error output"
+        raise Exception(error)
 
-        if proc.returncode != 0:
-            error = stderr.decode().strip() if stderr else "Command failed with no error output"
-            raise Exception(error)
+    return stdout.decode().strip() if stdout else True
 
-        return stdout.decode().strip() if stdout else True
+async def execute_lxc(command, timeout=120, priority=PRIORITY_NORMAL):
+    """Execute LXC command with timeout and error handling (LXD API first, CLI as fallback)"""
+    try:
+        cmd = shlex.split(command)
+        async with lxc_scheduler.slot(lxc_target(cmd), priority):
+            with perf.timer('lxc', lxc_operation_name(cmd)):
+                if lxd_client:
+                    try:
+                        result = await asyncio.wait_for(lxd_client.run_cli(cmd, timeout=timeout), timeout=timeout)
+                        if result is not None:
+                            return result
+                    except LXDUnavailable as e:
+                        logger.debug(f"LXD API unavailable, using CLI: {e}")
+                return await _execute_lxc_cli(cmd, timeout)
     except asyncio.TimeoutError:
         logger.error(f"LXC command timed out: {command}")
         raise Exception(f"Command timed out after {timeout} seconds")
@@ -217,39 +1400,1834 @@ async def execute_lxc(command, timeout=120):
         logger.error(f"LXC Error: {command} - {str(e)}")
         raise
 
+async def lxd_query(method, path, body=None, timeout=120, priority=PRIORITY_BACKGROUND):
+    """Raw LXD API request through `lxc query`; returns the decoded metadata or None"""
+    command = f"lxc query -X {method}"
+    if body is not None:
+        command += f" --wait -d {shlex.quote(json.dumps(body))}"
+    result = await execute_lxc(f"{command} {path}", timeout=timeout, priority=priority)
+    return json.loads(result) if isinstance(result, str) and result else None
+
+# Metrics history archive
+METRICS_ARCHIVE_ENABLED = os.getenv('METRICS_ARCHIVE_ENABLED', 'true').lower() == 'true'
+METRICS_ARCHIVE_DIR = os.getenv('METRICS_ARCHIVE_DIR', 'metrics_archive')
+# Every open archive holds a mapping and a file descriptor; the least recently used ones are closed past this
+METRICS_ARCHIVE_OPEN_FILES = int(os.getenv('METRICS_ARCHIVE_OPEN_FILES', '256'))
+HOST_SERIES = '_host'  # LXD names must start with a letter, so this never collides with a container
+CONTAINER_NAME_RE = re.compile(r'^[A-Za-z][A-Za-z0-9-]{0,62}$')
+
+# (step seconds, rows): 10s for 1h, 1m for 1d, 1h for 90d
+METRICS_ARCHIVE_LAYOUT = ((10, 360), (60, 1440), (3600, 2160))
+ARCHIVE_MAGIC = b'HYRRD1\0\0'
+ARCHIVE_HEADER = struct.Struct('<8sII')  # magic, metric count, archive count
+ARCHIVE_SPEC = struct.Struct('<II')  # step, rows
+ARCHIVE_NAME_SIZE = 16
+
+class RoundRobinFile:
+    """One fixed-size memory-mapped round-robin file holding several metrics at several resolutions.
+
+    Each archive is laid out column-wise as stamps[rows], counts[rows], then one
+    [rows] column per metric, all float64, so a time range of one metric is a
+    contiguous slice (two when it wraps).
+    """
+
+    def __init__(self, path, metrics, layout=METRICS_ARCHIVE_LAYOUT):
+        self.path = path
+        self.metrics = tuple(metrics)
+        self.layout = tuple(layout)
+        header_size = ARCHIVE_HEADER.size + ARCHIVE_SPEC.size * len(self.layout) + ARCHIVE_NAME_SIZE * len(self.metrics)
+        self._data_offset = (header_size + 7) // 8 * 8
+        columns = 2 + len(self.metrics)
+        size = self._data_offset + sum(rows * columns * 8 for _, rows in self.layout)
+
+        fresh = not os.path.exists(path) or os.path.getsize(path) != size
+        with open(path, 'r+b' if not fresh else 'w+b') as f:
+            if fresh:
+                f.truncate(size)
+            self._map = mmap.mmap(f.fileno(), size)
+        if fresh or not self._header_matches():
+            self._map[:self._data_offset] = self._header().ljust(self._data_offset, b'\0')
+            self._map[self._data_offset:] = bytes(size - self._data_offset)
+        self._view = memoryview(self._map).cast('B')[self._data_offset:].cast('d')
+
+        # Column offsets (in doubles) for each archive
+        self._archives = []
+        offset = 0
+        for step, rows in self.layout:
+            self._archives.append((step, rows, offset))
+            offset += rows * columns
+
+    def _header(self):
+        parts = [ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, len(self.metrics), len(self.layout))]
+        parts += [ARCHIVE_SPEC.pack(step, rows) for step, rows in self.layout]
+        parts += [name.encode()[:ARCHIVE_NAME_SIZE].ljust(ARCHIVE_NAME_SIZE, b'\0') for name in self.metrics]
+        return b''.join(parts)
+
+    def _header_matches(self):
+        header = self._header()
+        return self._map[:len(header)] == header
+
+    def _column(self, archive, column):
+        step, rows, offset = self._archives[archive]
+        start = offset + column * rows
+        return self._view[start:start + rows]
+
+    def record(self, stamp, values):
+        """Fold one sample into every archive: O(1) per archive, averaging within a step"""
+        for archive, (step, rows, _) in enumerate(self._archives):
+            bucket = int(stamp // step)
+            slot = bucket % rows
+            stamps = self._column(archive, 0)
+            counts = self._column(archive, 1)
+            bucket_stamp = float(bucket * step)
+            if stamps[slot] != bucket_stamp:
+                stamps[slot] = bucket_stamp
+                counts[slot] = 0.0
+            n = counts[slot] + 1
+            for index, metric in enumerate(self.metrics):
+                column = self._column(archive, 2 + index)
+                value = values.get(metric)
+                if value is None:
+                    continue
+                column[slot] = value if n == 1 else column[slot] + (value - column[slot]) / n
+            counts[slot] = n
+
+    def archive_for(self, seconds):
+        """Finest archive whose span covers the window (else the coarsest)"""
+        for archive, (step, rows, _) in enumerate(self._archives):
+            if step * rows >= seconds:
+                return archive
+        return len(self._archives) - 1
+
+    def _range(self, column, first, count, rows):
+        start = first % rows
+        if start + count <= rows:
+            return column[start:start + count].tolist()
+        return column[start:].tolist() + column[:start + count - rows].tolist()
+
+    def read(self, metric, seconds, now=None):
+        """[(stamp, value)] for the window, oldest first, at the finest resolution that covers it"""
+        archive = self.archive_for(seconds)
+        step, rows, _ = self._archives[archive]
+        now = time.time() if now is None else now
+        last = int(now // step)
+        count = min(rows, max(1, -(-int(seconds) // step)))
+        first = last - count + 1
+        stamps = self._range(self._column(archive, 0), first, count, rows)
+        values = self._range(self._column(archive, 2 + self.metrics.index(metric)), first, count, rows)
+        # Slots still holding an older lap of the ring are skipped
+        return [(stamp, value) for expected, stamp, value in zip(range(first * step, (last + 1) * step, step), stamps, values) if stamp == expected]
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+class MetricsArchive:
+    """Long-term history for the host and every container, one round-robin file per series"""
+
+    def __init__(self, directory=METRICS_ARCHIVE_DIR, max_open=METRICS_ARCHIVE_OPEN_FILES):
+        self.directory = directory
+        self.max_open = max(max_open, 1)
+        self._files = OrderedDict()  # series -> RoundRobinFile, least recently used first
+        # Samples are folded in on a single writer thread; the lock keeps readers off a file being closed
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='metrics-archive')
+        self.stats = {'opened': 0, 'evicted': 0, 'errors': 0}
+
+    def _path(self, series):
+        if series != HOST_SERIES and not CONTAINER_NAME_RE.match(series):
+            raise ValueError(f"invalid series name {series!r}")
+        return os.path.join(self.directory, f"{series}.rrd")
+
+    def _file(self, series, metrics):
+        """Open (or reuse) a series' file; callers hold self._lock"""
+        rrd = self._files.get(series)
+        if rrd is not None:
+            self._files.move_to_end(series)
+            return rrd
+        path = self._path(series)
+        os.makedirs(self.directory, exist_ok=True)
+        rrd = RoundRobinFile(path, metrics)
+        self._files[series] = rrd
+        self.stats['opened'] += 1
+        while len(self._files) > self.max_open:
+            _, evicted = self._files.popitem(last=False)
+            evicted.close()
+            self.stats['evicted'] += 1
+        return rrd
+
+    def write(self, metrics, samples):
+        """Fold [(series, values, stamp)] into their files; runs on the writer thread"""
+        for series, values, stamp in samples:
+            try:
+                with self._lock:
+                    self._file(series, metrics).record(stamp, values)
+            except (OSError, ValueError) as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error archiving metrics for {series}: {e}")
+
+    def record(self, series, metrics, values, stamp=None):
+        """Queue one sample for the writer thread without waiting for it"""
+        if not METRICS_ARCHIVE_ENABLED:
+            return
+        self._executor.submit(self.write, metrics, [(series, values, time.time() if stamp is None else stamp)])
+
+    async def record_batch(self, metrics, samples):
+        """Archive a whole collection pass of (series, values, stamp) off the event loop"""
+        if not METRICS_ARCHIVE_ENABLED or not samples:
+            return
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.write, metrics, samples)
+
+    def resolution(self, seconds):
+        """Step in seconds of the archive a window of this length is read from"""
+        for step, rows in METRICS_ARCHIVE_LAYOUT:
+            if step * rows >= seconds:
+                return step
+        return METRICS_ARCHIVE_LAYOUT[-1][0]
+
+    def has(self, series):
+        if series in self._files:
+            return True
+        try:
+            return os.path.exists(self._path(series))
+        except ValueError:
+            return False
+
+    def read(self, series, metrics, metric, seconds):
+        if not self.has(series):
+            return []
+        with self._lock:
+            return self._file(series, metrics).read(metric, seconds)
+
+    def summary(self, series, metrics, metric, seconds):
+        """min/avg/max of a metric over the window, or None without history"""
+        values = [value for _, value in self.read(series, metrics, metric, seconds)]
+        if not values:
+            return None
+        return {'min': min(values), 'avg': sum(values) / len(values), 'max': max(values), 'samples': len(values)}
+
+    def _flush_files(self):
+        with self._lock:
+            for rrd in self._files.values():
+                rrd.flush()
+
+    def flush(self):
+        """Write queued samples and sync every open file (used on shutdown)"""
+        try:
+            self._executor.submit(self._flush_files).result()
+        except RuntimeError:
+            # Executor already shut down at interpreter exit; its queue is drained
+            self._flush_files()
+
+    def forget(self, series):
+        """Close and delete the archive of a container that no longer exists"""
+        with self._lock:
+            rrd = self._files.pop(series, None)
+            if rrd is not None:
+                rrd.close()
+        try:
+            os.remove(self._path(series))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.error(f"Error removing metrics archive for {series}: {e}")
+
+    def prune(self, live_names):
+        """Forget every container series not in a full fleet listing"""
+        try:
+            stored = {name[:-4] for name in os.listdir(self.directory) if name.endswith('.rrd')}
+        except FileNotFoundError:
+            stored = set()
+        with self._lock:
+            stored |= set(self._files)
+        for series in stored - set(live_names) - {HOST_SERIES}:
+            logger.info(f"Removing metrics archive of vanished container {series}")
+            self.forget(series)
+
+metrics_archive = MetricsArchive()
+atexit.register(metrics_archive.flush)
+
 # System monitoring functions
-def get_system_info():
-    """Get comprehensive system information"""
-    try:
-        cpu_percent = psutil.cpu_percent(interval=1)
+SYSTEM_SAMPLE_INTERVAL = float(os.getenv('SYSTEM_SAMPLE_INTERVAL', '5'))
+SYSTEM_SAMPLE_HISTORY = int(os.getenv('SYSTEM_SAMPLE_HISTORY', '720'))
+
+SYSTEM_METRICS = ('cpu_usage', 'memory_usage', 'disk_usage', 'load_1')
+
+class SystemSampler:
+    """Samples host CPU, memory, disk and load in the background into a fixed-size ring buffer"""
+
+    def __init__(self, interval=SYSTEM_SAMPLE_INTERVAL, size=SYSTEM_SAMPLE_HISTORY):
+        self.interval = interval
+        self.samples = deque(maxlen=size)
+        self._task = None
+        # Prime the counters so the first non-blocking cpu_percent() call is meaningful
+        psutil.cpu_percent(interval=None)
+
+    def take_sample(self):
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
-        
-        return {
-            'cpu_usage': cpu_percent,
+        load_1, load_5, load_15 = os.getloadavg()
+        sample = {
+            'time': time.time(),
+            'cpu_usage': psutil.cpu_percent(interval=None),
             'memory_usage': memory.percent,
             'memory_total': memory.total // (1024**3),  # GB
             'memory_available': memory.available // (1024**3),  # GB
             'disk_usage': disk.percent,
             'disk_total': disk.total // (1024**3),  # GB
             'disk_free': disk.free // (1024**3),  # GB
+            'load_1': load_1,
+            'load_5': load_5,
+            'load_15': load_15,
         }
+        self.samples.append(sample)
+        metrics_archive.record(HOST_SERIES, SYSTEM_METRICS, sample, sample['time'])
+        return sample
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                self.take_sample()
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {e}")
+            await asyncio.sleep(self.interval)
+
+    def latest(self):
+        return self.samples[-1] if self.samples else self.take_sample()
+
+    def window(self, seconds):
+        cutoff = time.time() - seconds
+        return [sample for sample in reversed(self.samples) if sample['time'] >= cutoff]
+
+    def summary(self, metric, seconds):
+        """min/avg/max of a metric over the last `seconds`, or None without samples"""
+        values = [sample[metric] for sample in self.window(seconds)]
+        if not values:
+            return None
+        return {'min': min(values), 'avg': sum(values) / len(values), 'max': max(values), 'samples': len(values)}
+
+system_sampler = SystemSampler()
+
+def get_system_info():
+    """Get the latest host metrics sample (never blocks)"""
+    try:
+        return system_sampler.latest()
     except Exception as e:
         logger.error(f"Error getting system info: {e}")
         return None
 
-async def get_vps_status(container_name):
-    """Get real-time VPS status"""
+def iter_vps(user_ids=None):
+    """Yield (user_id, vps) for every record, or only for the given owners"""
+    for user_id in (vps_data.keys() if user_ids is None else user_ids):
+        for vps in vps_data.get(user_id, []):
+            yield user_id, vps
+
+def normalize_lxd_status(status):
+    status = (status or '').lower()
+    return status if status in ('running', 'stopped', 'frozen') else 'unknown'
+
+async def get_fleet_status(priority=PRIORITY_NORMAL):
+    """Fetch the state of every container with a single LXD query"""
+    # recursion=1 returns each instance's status without collecting full runtime state
+    result = await execute_lxc("lxc query /1.0/instances?recursion=1", timeout=60, priority=priority)
+    instances = json.loads(result) if isinstance(result, str) and result else []
+    return {inst['name']: normalize_lxd_status(inst.get('status')) for inst in instances}
+
+def apply_statuses(statuses, records=None):
+    """Copy LXD statuses onto VPS records; returns the set of owners whose records changed"""
+    now = datetime.now().isoformat()
+    updated_users = set()
+    for user_id, vps in (iter_vps() if records is None else records):
+        current_status = statuses.get(vps.get('container_name'))
+        if current_status is None:
+            continue
+        # A suspended VPS is stopped in LXD; keep the admin-set state
+        if vps.get('status') == 'suspended' and current_status == 'stopped':
+            continue
+        if current_status != vps.get('status'):
+            vps['status'] = current_status
+            vps['last_updated'] = now
+            updated_users.add(user_id)
+    if updated_users:
+        save_data('vps', key=updated_users, op='status_change')
+    return updated_users
+
+async def refresh_vps_statuses(records=None, priority=PRIORITY_NORMAL):
+    """Update stored statuses from one bulk query; returns the set of changed owners"""
+    statuses = await get_fleet_status(priority)
+    status_cache.update(statuses)
+    if statuses:
+        metrics_archive.prune(set(statuses) | containers_rebuilding)
+    return apply_statuses(statuses, records)
+
+# Shared container status cache
+STATUS_CACHE_TTL = int(os.getenv('STATUS_CACHE_TTL', '30'))
+
+class StatusCache:
+    """Container status cache with a TTL; stale entries are served while a refresh runs in the background"""
+
+    def __init__(self, ttl=STATUS_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}  # container_name -> (status or None if absent, fetched_at)
+        self._fleet_fetched_at = None
+        self._revalidate_task = None
+        self.stats = {'hits': 0, 'misses': 0, 'revalidations': 0}
+
+    def effective_ttl(self):
+        # While lifecycle events keep entries current, only the rare consistency sweep is needed
+        return STATUS_SWEEP_INTERVAL if lifecycle_monitor.connected else self.ttl
+
+    def update(self, statuses):
+        """Store a full fleet snapshot from the bulk provider"""
+        now = time.monotonic()
+        self._entries = {name: (status, now) for name, status in statuses.items()}
+        self._fleet_fetched_at = now
+
+    def invalidate(self, container_name, status=None):
+        """Drop an entry, or replace it with the state the bot just put the container in"""
+        if status is None:
+            self._entries.pop(container_name, None)
+        else:
+            self._entries[container_name] = (status, time.monotonic())
+
+    def invalidate_all(self):
+        self._entries.clear()
+        self._fleet_fetched_at = None
+
+    def revalidate(self):
+        """Refresh the whole fleet in the background (single flight)"""
+        if self._revalidate_task and not self._revalidate_task.done():
+            return
+        self.stats['revalidations'] += 1
+        self._revalidate_task = asyncio.get_running_loop().create_task(self._revalidate())
+
+    async def _revalidate(self):
+        try:
+            await refresh_vps_statuses(priority=PRIORITY_BACKGROUND)
+        except Exception as e:
+            logger.error(f"Error revalidating status cache: {e}")
+
+    async def ensure(self, records=None):
+        """Bring records up to date from cache, fetching synchronously only on a cold miss"""
+        records = list(iter_vps()) if records is None else records
+        now = time.monotonic()
+        ttl = self.effective_ttl()
+        fleet_fresh = self._fleet_fetched_at is not None and now - self._fleet_fetched_at < ttl
+        names = [vps.get('container_name') for _, vps in records if vps.get('container_name')]
+        # Unknown names are only a miss if the last fleet fetch is too old to prove they don't exist
+        if any(name not in self._entries for name in names) and not fleet_fresh:
+            self.stats['misses'] += 1
+            await refresh_vps_statuses(records)
+            # Remember containers LXD doesn't know about so they don't force a fetch every time
+            fetched_at = time.monotonic()
+            for name in names:
+                self._entries.setdefault(name, (None, fetched_at))
+            return
+        self.stats['hits'] += 1
+        apply_statuses({name: self._entries[name][0] for name in names if name in self._entries}, records)
+        if any(now - self._entries[name][1] >= ttl for name in names if name in self._entries):
+            self.revalidate()
+
+status_cache = StatusCache()
+
+# Lifecycle event tracking
+LIFECYCLE_EVENTS_ENABLED = os.getenv('LIFECYCLE_EVENTS_ENABLED', 'true').lower() == 'true'
+STATUS_SWEEP_INTERVAL = int(os.getenv('STATUS_SWEEP_INTERVAL', '3600'))
+LXD_EVENTS_REPLAY_FILE = os.getenv('LXD_EVENTS_REPLAY_FILE', '')
+
+LIFECYCLE_STATUS = {
+    'instance-started': 'running',
+    'instance-restarted': 'running',
+    'instance-resumed': 'running',
+    'instance-stopped': 'stopped',
+    'instance-shutdown': 'stopped',
+    'instance-paused': 'frozen',
+    'instance-deleted': 'deleted',
+}
+
+# Containers deleted on purpose while a reinstall rebuilds them; their records must not flip to 'deleted'
+containers_rebuilding = set()
+
+class ContainerIndex:
+    """container name -> (user_id, vps), kept current from save_data so misses (warm pool, bench containers) cost O(1)"""
+
+    def __init__(self):
+        self.by_name = {}
+        self.by_owner = {}  # user_id -> container names
+        self.dirty = set()
+        self.stale = True
+
+    def mark_dirty(self, user_ids=None):
+        if user_ids is None:
+            self.stale = True
+        else:
+            self.dirty.update([user_ids] if isinstance(user_ids, str) else user_ids)
+
+    def _index_owner(self, user_id):
+        names = []
+        for vps in vps_data.get(user_id, []):
+            if vps.get('container_name'):
+                self.by_name[vps['container_name']] = (user_id, vps)
+                names.append(vps['container_name'])
+        if names:
+            self.by_owner[user_id] = names
+
+    def refresh(self):
+        if self.stale:
+            self.by_name.clear()
+            self.by_owner.clear()
+            for user_id in vps_data:
+                self._index_owner(user_id)
+            self.stale = False
+            self.dirty.clear()
+            return
+        for user_id in self.dirty:
+            for name in self.by_owner.pop(user_id, []):
+                if self.by_name.get(name, (None,))[0] == user_id:
+                    del self.by_name[name]
+            self._index_owner(user_id)
+        self.dirty.clear()
+
+    def get(self, container_name):
+        self.refresh()
+        return self.by_name.get(container_name, (None, None))
+
+container_index = ContainerIndex()
+
+def find_vps(container_name):
+    """Return (user_id, vps) for a container, or (None, None) if no record uses it"""
+    return container_index.get(container_name)
+
+def handle_lifecycle_event(event):
+    """Apply one LXD lifecycle event to the cache and stored records; returns True if it was used"""
+    metadata = event.get('metadata') or {}
+    status = LIFECYCLE_STATUS.get(metadata.get('action'))
+    if status is None:
+        return False
+    container_name = metadata.get('source', '').split('?')[0].rsplit('/', 1)[-1]
+    if not container_name:
+        return False
+    if status == 'deleted':
+        status_cache.invalidate(container_name)
+    else:
+        status_cache.invalidate(container_name, status)
+    if status == 'deleted':
+        if container_name in containers_rebuilding:
+            return True
+        metrics_archive.forget(container_name)
+    user_id, vps = find_vps(container_name)
+    if vps is not None:
+        apply_statuses({container_name: status}, [(user_id, vps)])
+    return True
+
+async def replay_event_lines(path):
+    """Yield lines from a recorded `lxc monitor --format=json` stream"""
+    with open(path, 'rb') as f:
+        for line in f:
+            yield line
+
+class LifecycleEventMonitor:
+    """Long-lived `lxc monitor --type=lifecycle` subscriber that reconnects on failure"""
+
+    def __init__(self):
+        self.connected = False
+        self._task = None
+        self._proc = None
+        self.stats = {'events': 0, 'applied': 0, 'reconnects': 0}
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _set_connected(self, connected):
+        if connected == self.connected:
+            return
+        self.connected = connected
+        # Polling only runs as a consistency sweep while events are flowing
+        if auto_status_update.is_running():
+            auto_status_update.change_interval(seconds=STATUS_SWEEP_INTERVAL if connected else STATUS_UPDATE_INTERVAL)
+
+    async def consume(self, lines, live=False):
+        """Apply events from any async iterable of JSON lines"""
+        async for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+                if not isinstance(event, dict):
+                    raise ValueError("not an object")
+            except ValueError:
+                logger.warning(f"Skipping malformed lifecycle event: {line[:200]!r}")
+                continue
+            self.stats['events'] += 1
+            if live and not self.connected:
+                # Only trust the stream (and relax polling) once it has delivered something
+                self._set_connected(True)
+            try:
+                if handle_lifecycle_event(event):
+                    self.stats['applied'] += 1
+            except Exception as e:
+                logger.error(f"Error applying lifecycle event: {e}")
+
+    async def _run(self):
+        if LXD_EVENTS_REPLAY_FILE:
+            await self.consume(replay_event_lines(LXD_EVENTS_REPLAY_FILE))
+            logger.info(f"Replayed {self.stats['events']} lifecycle events from {LXD_EVENTS_REPLAY_FILE}")
+            return
+        backoff = 1
+        while True:
+            try:
+                self._proc = await asyncio.create_subprocess_exec(
+                    'lxc', 'monitor', '--type=lifecycle', '--format=json',
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                logger.info("Subscribed to LXD lifecycle events")
+                # Events may have been missed while disconnected
+                status_cache.revalidate()
+                backoff = 1
+                await self.consume(self._proc.stdout, live=True)
+                returncode = await self._proc.wait()
+                raise ConnectionError(f"lxc monitor exited with status {returncode}")
+            except asyncio.CancelledError:
+                if self._proc and self._proc.returncode is None:
+                    self._proc.kill()
+                raise
+            except Exception as e:
+                self._set_connected(False)
+                self.stats['reconnects'] += 1
+                logger.warning(f"Lifecycle event stream lost ({e}), reconnecting in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+lifecycle_monitor = LifecycleEventMonitor()
+
+# Storage pools
+STORAGE_POOL = os.getenv('DEFAULT_POOL', '')
+STORAGE_POOL_FALLBACK = os.getenv('STORAGE_POOL_FALLBACK', 'dir')
+
+# Drivers that create instances as copy-on-write clones of the cached image volume, in order of preference
+CLONE_POOL_DRIVERS = ('zfs', 'btrfs', 'lvm', 'ceph')
+
+def root_disk_size(storage):
+    """Plan storage ('10GB') -> LXD root device size in GiB, None if unparseable"""
+    size = parse_size_bytes(storage)
+    return f"{max(size // 1024 ** 3, 1)}GiB" if size else None
+
+class StoragePools:
+    """Chooses the pool new containers are created on and knows what its driver supports"""
+
+    def __init__(self, preferred=STORAGE_POOL, fallback=STORAGE_POOL_FALLBACK):
+        self.preferred = preferred
+        self.fallback = fallback
+        self.pools = {}  # name -> {'driver': ..., 'config': {...}}
+        self.selected = None
+
+    async def discover(self):
+        pools = await lxd_query('GET', '/1.0/storage-pools?recursion=1') or []
+        self.pools = {pool['name']: {'driver': pool.get('driver'), 'config': pool.get('config') or {}} for pool in pools}
+        self.selected = self.choose()
+        logger.info(f"Creating containers on storage pool {self.pool()} ({self.driver(self.pool()) or 'unknown driver'})")
+
+    def choose(self):
+        if self.preferred in self.pools:
+            return self.preferred
+        for driver in CLONE_POOL_DRIVERS:
+            for name in sorted(self.pools):
+                if self.supports_clone(name) and self.pools[name]['driver'] == driver:
+                    return name
+        return self.fallback if self.fallback in self.pools else next(iter(sorted(self.pools)), None)
+
+    def pool(self):
+        return self.selected or self.fallback
+
+    def driver(self, name):
+        return self.pools.get(name, {}).get('driver')
+
+    def supports_clone(self, name):
+        pool = self.pools.get(name)
+        if not pool or pool['driver'] not in CLONE_POOL_DRIVERS:
+            return False
+        # Thick LVM copies whole volumes
+        return pool['driver'] != 'lvm' or pool['config'].get('lvm.use_thinpool', 'true') == 'true'
+
+    def supports_quota(self, name):
+        # dir only enforces sizes with filesystem project quotas, which LXD doesn't set up by default
+        return self.driver(name) not in (None, 'dir')
+
+    def root_device(self, storage):
+        """Root disk device for the selected pool, sized from the plan when the driver can enforce it"""
+        device = {'type': 'disk', 'path': '/', 'pool': self.pool()}
+        size = root_disk_size(storage)
+        if size and self.supports_quota(self.pool()):
+            device['size'] = size
+        return device
+
+storage_pools = StoragePools()
+
+async def benchmark_pool(pool, image):
+    """Create and delete two throwaway containers on a pool; returns [(seconds, bytes used)] for cold and warm runs"""
+    runs = []
+    path = f"/1.0/storage-pools/{urllib.parse.quote(pool, safe='')}/resources"
+    for _ in range(2):
+        name = f"bench-{re.sub(r'[^a-z0-9]+', '-', pool.lower())[:20]}-{os.urandom(3).hex()}"
+        before = ((await lxd_query('GET', path) or {}).get('space') or {}).get('used', 0)
+        started = time.perf_counter()
+        try:
+            await execute_lxc(f"lxc init {image} {name} -s {pool}", timeout=900, priority=PRIORITY_BACKGROUND)
+            elapsed = time.perf_counter() - started
+            after = ((await lxd_query('GET', path) or {}).get('space') or {}).get('used', 0)
+        finally:
+            with contextlib.suppress(Exception):
+                await execute_lxc(f"lxc delete {name} --force", priority=PRIORITY_BACKGROUND)
+        runs.append((elapsed, max(after - before, 0)))
+    return runs
+
+# VPS plans and their LXD profiles
+PAID_PLAN_SPECS = {
+    "Starter": {"ram": "4GB", "cpu": "1", "storage": "10GB", "emoji": "🚀"},
+    "Basic": {"ram": "8GB", "cpu": "1", "storage": "10GB", "emoji": "⚡"},
+    "Standard": {"ram": "12GB", "cpu": "2", "storage": "10GB", "emoji": "🔥"},
+    "Pro": {"ram": "16GB", "cpu": "2", "storage": "10GB", "emoji": "💎"}
+}
+
+PAID_PLAN_PRICES = {
+    "Starter": {"Intel": 42, "AMD": 83},
+    "Basic": {"Intel": 96, "AMD": 164},
+    "Standard": {"Intel": 192, "AMD": 320},
+    "Pro": {"Intel": 220, "AMD": 340}
+}
+
+# Each free plan is unlocked by either "boosts" or "invites"
+FREE_PLAN_SPECS = {
+    "Boost Starter": {"ram": "2GB", "cpu": "1", "storage": "5GB", "boosts": 1},
+    "Boost Basic": {"ram": "4GB", "cpu": "1", "storage": "10GB", "boosts": 2},
+    "Boost Pro": {"ram": "6GB", "cpu": "2", "storage": "15GB", "boosts": 3},
+    "Invite Starter": {"ram": "1GB", "cpu": "1", "storage": "5GB", "invites": 5},
+    "Invite Basic": {"ram": "2GB", "cpu": "1", "storage": "8GB", "invites": 10},
+    "Invite Advanced": {"ram": "4GB", "cpu": "1", "storage": "12GB", "invites": 20}
+}
+
+def plan_requirement(specs):
+    """'2 boosts' / '10 invites' for a free plan"""
+    kind = 'boosts' if 'boosts' in specs else 'invites'
+    count = specs.get(kind, 0)
+    return f"{count} {kind[:-1] if count == 1 else kind}"
+
+def format_plan_size(size):
+    """'4GB' -> '4 GB' for the plan pages"""
+    return re.sub(r'(\d)([A-Za-z])', r'\1 \2', size, count=1)
+
+def format_cores(cpu):
+    return f"{cpu} Core{'' if str(cpu) == '1' else 's'}"
+
+# Container features the deploy panel enables (Docker-ready)
+BASE_PROFILE = 'vps-base'
+BASE_PROFILE_CONFIG = {
+    'security.nesting': 'true',
+    'security.privileged': 'true',
+    'linux.kernel_modules': 'overlay,loop,nf_nat,ip_tables,ip6_tables,netlink_diag,br_netfilter',
+}
+BASE_PROFILE_DEVICES = {'fuse': {'type': 'unix-char', 'path': '/dev/fuse'}}
+PLAN_PROFILE_PREFIX = 'plan-'
+
+def iter_plan_specs():
+    """Yield (name, specs) for built-in plans followed by admin-defined ones"""
+    yield from PAID_PLAN_SPECS.items()
+    yield from FREE_PLAN_SPECS.items()
+    for plans in admin_data.get('custom_plans', {}).values():
+        for plan in plans:
+            yield plan['name'], plan
+
+def get_plan_specs(plan_name):
+    """Get specifications for a plan"""
+    for name, specs in iter_plan_specs():
+        if name == plan_name:
+            return specs
+    return None
+
+def memory_mb(ram):
+    """'4GB' -> 4096 (the launch commands size memory in MiB)"""
+    size = parse_size_bytes(ram)
+    return size // (1024 ** 2) if size else None
+
+def plan_profile_name(plan_name):
+    return PLAN_PROFILE_PREFIX + re.sub(r'[^a-z0-9]+', '-', plan_name.lower()).strip('-')
+
+def compile_plan_profiles():
+    """Desired LXD profiles: the shared feature profile plus one limits profile per plan"""
+    profiles = {BASE_PROFILE: {'config': dict(BASE_PROFILE_CONFIG), 'devices': dict(BASE_PROFILE_DEVICES),
+                               'description': "VPS features: nesting, privileged, FUSE, kernel modules"}}
+    for name, specs in iter_plan_specs():
+        ram_mb = memory_mb(specs.get('ram'))
+        config = {'limits.cpu': str(specs.get('cpu', '1'))}
+        if ram_mb:
+            config['limits.memory'] = f"{ram_mb}MB"
+        devices = {'root': storage_pools.root_device(specs.get('storage'))} if storage_pools.selected else {}
+        profiles.setdefault(plan_profile_name(name), {'config': config, 'devices': devices, 'description': f"VPS plan {name}"})
+    return profiles
+
+synced_profiles = set()
+# Plan edits sync in the background; one sync at a time so a later edit never races an earlier one
+profile_sync_lock = asyncio.Lock()
+
+async def sync_plan_profiles(priority=PRIORITY_BACKGROUND):
+    """Create, update or remove plan profiles so LXD matches the plan catalogue"""
+    desired = compile_plan_profiles()
+    existing = {profile['name']: profile for profile in await lxd_query('GET', '/1.0/profiles?recursion=1', priority=priority) or []}
+    for name, body in desired.items():
+        current = existing.get(name)
+        try:
+            if current is None:
+                await lxd_query('POST', '/1.0/profiles', {'name': name, **body}, priority=priority)
+            elif any(current.get(key) != body[key] for key in ('config', 'devices', 'description')):
+                await lxd_query('PUT', f"/1.0/profiles/{name}", body, priority=priority)
+            synced_profiles.add(name)
+        except Exception as e:
+            synced_profiles.discard(name)
+            logger.error(f"Error syncing profile {name}: {e}")
+    for name, current in existing.items():
+        if name.startswith(PLAN_PROFILE_PREFIX) and name not in desired:
+            synced_profiles.discard(name)
+            if current.get('used_by'):
+                continue  # LXD refuses to delete a profile instances still use
+            try:
+                await lxd_query('DELETE', f"/1.0/profiles/{name}", priority=priority)
+            except Exception as e:
+                logger.warning(f"Could not delete stale profile {name}: {e}")
+    logger.info(f"Plan profiles in sync ({len(synced_profiles)} profiles)")
+
+async def sync_plan_profiles_safely(priority=PRIORITY_BACKGROUND):
+    try:
+        async with profile_sync_lock:
+            if storage_pools.selected is None:
+                await storage_pools.discover()
+            await sync_plan_profiles(priority)
+    except Exception as e:
+        logger.error(f"Error syncing plan profiles: {e}")
+
+# Local image cache
+MANAGED_IMAGES = [image.strip() for image in os.getenv('MANAGED_IMAGES', 'ubuntu:22.04,ubuntu:24.04,images:debian/11,images:centos/8').split(',') if image.strip()]
+IMAGE_REFRESH_INTERVAL = int(os.getenv('IMAGE_REFRESH_INTERVAL', '86400'))
+IMAGE_ALIAS_PREFIX = 'vps-image/'
+
+def local_image_alias(image):
+    """'images:debian/11' -> 'vps-image/images-debian-11'"""
+    return IMAGE_ALIAS_PREFIX + re.sub(r'[^a-z0-9.]+', '-', image.lower()).strip('-')
+
+class ImageManager:
+    """Pulls the configured remote images into the local store and pins launches to their fingerprints"""
+
+    def __init__(self, images):
+        self.images = {image: {'alias': local_image_alias(image), 'fingerprint': None, 'size': 0,
+                               'fetched_at': None, 'error': None} for image in images}
+        self.next_refresh = None
+        self.refreshing = set()
+        self._task = None
+
+    def start(self):
+        if not self.images or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def resolve(self, image):
+        """Local fingerprint for a managed image, or the remote reference until it has been cached"""
+        entry = self.images.get(image)
+        return entry['fingerprint'] if entry and entry['fingerprint'] else image
+
+    async def discover(self):
+        """Pick up images cached by a previous run from their local aliases"""
+        aliases = {alias['name']: alias['target'] for alias in await lxd_query('GET', '/1.0/images/aliases?recursion=1') or []}
+        for image, entry in self.images.items():
+            fingerprint = aliases.get(entry['alias'])
+            if not fingerprint:
+                continue
+            info = await lxd_query('GET', f"/1.0/images/{fingerprint}") or {}
+            uploaded = info.get('uploaded_at')
+            entry.update(fingerprint=fingerprint, size=info.get('size', 0),
+                         fetched_at=datetime.fromisoformat(uploaded[:19]) if uploaded else None)
+
+    async def refresh(self, image):
+        """Pull the current remote image and atomically repoint the local alias at it"""
+        entry = self.images[image]
+        source = LXDClient.image_source(image)
+        if source is None:
+            entry['error'] = "Unknown image remote"
+            return
+        self.refreshing.add(image)
+        try:
+            result = await lxd_query('POST', '/1.0/images', {'source': source, 'auto_update': False}, timeout=1800)
+            result = result or {}
+            fingerprint = result.get('fingerprint') or (result.get('metadata') or {}).get('fingerprint')
+            if not fingerprint:
+                raise Exception("LXD did not report the image fingerprint")
+            previous = entry['fingerprint']
+            if previous:
+                await lxd_query('PUT', f"/1.0/images/aliases/{urllib.parse.quote(entry['alias'], safe='')}", {'target': fingerprint, 'description': image})
+            else:
+                try:
+                    await lxd_query('POST', '/1.0/images/aliases', {'name': entry['alias'], 'target': fingerprint, 'description': image})
+                except Exception:
+                    # Alias left behind by an older run that discover() could not read
+                    await lxd_query('PUT', f"/1.0/images/aliases/{urllib.parse.quote(entry['alias'], safe='')}", {'target': fingerprint, 'description': image})
+            info = await lxd_query('GET', f"/1.0/images/{fingerprint}")
+            entry.update(fingerprint=fingerprint, size=(info or {}).get('size', 0), fetched_at=datetime.now(), error=None)
+            if previous and previous != fingerprint:
+                logger.info(f"Image {image} updated: {previous[:12]} -> {fingerprint[:12]}")
+                warm_pool.retire(image)
+                try:
+                    await lxd_query('DELETE', f"/1.0/images/{previous}")
+                except Exception as e:
+                    logger.warning(f"Could not delete superseded image {previous[:12]}: {e}")
+        except Exception as e:
+            entry['error'] = str(e)
+            logger.error(f"Error refreshing image {image}: {e}")
+        finally:
+            self.refreshing.discard(image)
+
+    async def refresh_all(self, stale_only=False):
+        for image, entry in self.images.items():
+            fetched_at = entry['fetched_at']
+            if stale_only and entry['fingerprint'] and fetched_at and (datetime.now() - fetched_at).total_seconds() < IMAGE_REFRESH_INTERVAL:
+                continue
+            await self.refresh(image)
+
+    async def _run(self):
+        try:
+            await self.discover()
+        except Exception as e:
+            logger.error(f"Error reading cached images: {e}")
+        stale_only = True
+        while True:
+            await self.refresh_all(stale_only=stale_only)
+            stale_only = False
+            self.next_refresh = datetime.now() + timedelta(seconds=IMAGE_REFRESH_INTERVAL)
+            await asyncio.sleep(IMAGE_REFRESH_INTERVAL)
+
+image_manager = ImageManager(MANAGED_IMAGES)
+
+# Pristine snapshot taken before a VPS first starts; reinstall restores it
+BASELINE_SNAPSHOTS = os.getenv('BASELINE_SNAPSHOTS', 'true').lower() == 'true'
+BASELINE_SNAPSHOT = 'baseline'
+
+async def set_guest_hostname(container_name, priority=PRIORITY_INTERACTIVE):
+    # Replace the 127.0.1.1 entry too, or sudo and friends keep resolving the old name
+    script = (f"echo {container_name} > /etc/hostname && hostname {container_name} && "
+              f"sed -i \"/^127\\.0\\.1\\.1[[:space:]]/d\" /etc/hosts && echo \"127.0.1.1 {container_name}\" >> /etc/hosts")
+    try:
+        await execute_lxc(f"lxc exec {container_name} -- sh -c '{script}'", priority=priority)
+    except Exception as e:
+        logger.warning(f"Could not set hostname on {container_name}: {e}")
+
+# Warm container pool
+WARM_POOL_TARGETS = os.getenv('WARM_POOL_TARGETS', '')  # "os@plan=count,..."; plan '*' serves any plan
+WARM_POOL_REFILL_INTERVAL = int(os.getenv('WARM_POOL_REFILL_INTERVAL', '60'))
+WARM_POOL_CONFIG_KEY = 'user.warm_pool'
+WARM_POOL_NAME_PREFIX = 'warm-'
+
+def parse_warm_pool_targets(spec):
+    """'ubuntu:22.04@*=2,ubuntu:24.04@Starter=1' -> {('ubuntu:22.04', '*'): 2, ...}"""
+    targets = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        try:
+            key, count = entry.rsplit('=', 1)
+            os_image, _, plan = key.partition('@')
+            targets[(os_image, plan or '*')] = int(count)
+        except ValueError:
+            logger.warning(f"Ignoring malformed warm pool target: {entry}")
+    return targets
+
+class WarmPool:
+    """Keeps stopped, already-booted containers per (OS, plan) so a purchase only has to rename and start one"""
+
+    def __init__(self, targets):
+        self.targets = targets
+        self.ready = {key: deque() for key in targets}
+        self.filling = set()
+        self.stats = {'hits': 0, 'misses': 0, 'launched': 0, 'failed': 0}
+        self.latency = {'pool': deque(maxlen=100), 'launch': deque(maxlen=100)}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if not self.targets or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def discover(self):
+        """Adopt pool containers left over from a previous run"""
+        result = await execute_lxc("lxc query /1.0/instances?recursion=1", timeout=60, priority=PRIORITY_BACKGROUND)
+        for inst in (json.loads(result) if isinstance(result, str) and result else []):
+            tag = (inst.get('config') or {}).get(WARM_POOL_CONFIG_KEY)
+            # A tagged container under a VPS name is a claim a restart interrupted; its deployment resumes it
+            if not tag or not inst['name'].startswith(WARM_POOL_NAME_PREFIX):
+                continue
+            os_image, _, plan = tag.rpartition('@')
+            key = (os_image, plan)
+            if key in self.ready and normalize_lxd_status(inst.get('status')) == 'stopped':
+                self.ready[key].append(inst['name'])
+            else:
+                # Half-built or no longer wanted
+                await self._discard(inst['name'])
+
+    async def _run(self):
+        try:
+            await self.discover()
+        except Exception as e:
+            logger.error(f"Error discovering warm pool containers: {e}")
+        while True:
+            try:
+                await self.refill()
+            except Exception as e:
+                logger.error(f"Error refilling warm pool: {e}")
+            self._wakeup.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), WARM_POOL_REFILL_INTERVAL)
+
+    async def refill(self):
+        """Launch missing pool members one at a time at background priority"""
+        for key, target in self.targets.items():
+            while len(self.ready[key]) < target:
+                # Don't add boot load while the host is shedding it
+                if overload_controller.level > 0:
+                    return
+                os_image, plan = key
+                slug = re.sub(r'[^a-z0-9]+', '-', f"{os_image}-{'any' if plan == '*' else plan}".lower()).strip('-')[:40]
+                name = f"{WARM_POOL_NAME_PREFIX}{slug}-{os.urandom(3).hex()}"
+                self.filling.add(name)
+                try:
+                    await execute_lxc(f"lxc launch {image_manager.resolve(os_image)} {name} --config {WARM_POOL_CONFIG_KEY}={os_image}@{plan} -s {storage_pools.pool()}", timeout=600, priority=PRIORITY_BACKGROUND)
+                    await execute_lxc(f"lxc stop {name}", priority=PRIORITY_BACKGROUND)
+                    self.ready[key].append(name)
+                    self.stats['launched'] += 1
+                except Exception as e:
+                    self.stats['failed'] += 1
+                    logger.error(f"Error launching warm pool container for {os_image}@{plan}: {e}")
+                    await self._discard(name)
+                    break
+                finally:
+                    self.filling.discard(name)
+
+    async def _discard(self, name):
+        try:
+            await execute_lxc(f"lxc delete {name} --force", priority=PRIORITY_BACKGROUND)
+        except Exception as e:
+            logger.warning(f"Could not delete warm pool container {name}: {e}")
+
+    def retire(self, os_image):
+        """Replace pool members built from an image that has since been updated"""
+        for (image, _), names in self.ready.items():
+            if image == os_image:
+                while names:
+                    run_in_background(self._discard(names.popleft()))
+        self._wakeup.set()
+
+    def _take(self, os_image, plan):
+        for key in ((os_image, plan), (os_image, '*')):
+            if self.ready.get(key):
+                return self.ready[key].popleft()
+        return None
+
+    async def claim(self, os_image, plan, container_name, profiles, limits, root_size=None, priority=PRIORITY_INTERACTIVE):
+        """Turn a pool container into `container_name`; returns False on a miss"""
+        name = self._take(os_image, plan)
+        if name is None:
+            self.stats['misses'] += 1
+            return False
+        self._wakeup.set()
+        try:
+            # LXD can only rename stopped instances, which is why the pool keeps them stopped
+            await execute_lxc(f"lxc move {name} {container_name}", priority=priority)
+        except Exception as e:
+            logger.error(f"Error claiming warm pool container {name}: {e}")
+            self.stats['misses'] += 1
+            run_in_background(self._discard(name))
+            return False
+        try:
+            if profiles != ['default']:
+                await execute_lxc(f"lxc profile assign {container_name} {','.join(profiles)}", priority=priority)
+            if limits:
+                pairs = " ".join(f"{key}={value}" for key, value in limits.items())
+                await execute_lxc(f"lxc config set {container_name} {pairs}", priority=priority)
+            if root_size:
+                # Pool members are launched with -s, so their root disk is an instance device
+                await execute_lxc(f"lxc config device set {container_name} root size={root_size}", priority=priority)
+            await execute_lxc(f"lxc config unset {container_name} {WARM_POOL_CONFIG_KEY}", priority=priority)
+            if BASELINE_SNAPSHOTS:
+                await execute_lxc(f"lxc snapshot {container_name} {BASELINE_SNAPSHOT}", priority=priority)
+            await execute_lxc(f"lxc start {container_name}", priority=priority)
+        except Exception as e:
+            logger.error(f"Error configuring claimed warm pool container {container_name}, falling back to a launch: {e}")
+            self.stats['misses'] += 1
+            await self._release(container_name, name, priority)
+            return False
+        self.stats['hits'] += 1
+        # The first boot happened under the pool name
+        await set_guest_hostname(container_name, priority)
+        return True
+
+    async def _release(self, container_name, name, priority):
+        """Undo a failed claim: give the half-configured container its pool name back and discard it"""
+        with contextlib.suppress(Exception):
+            await execute_lxc(f"lxc stop {container_name} --force", priority=priority)  # fails if never started
+        try:
+            await execute_lxc(f"lxc move {container_name} {name}", priority=priority)
+        except Exception as e:
+            # The fallback launch needs the VPS name, so delete it under that name before returning
+            logger.error(f"Could not rename {container_name} back to {name}: {e}")
+            await self._discard(container_name)
+            return
+        run_in_background(self._discard(name))
+
+    def ready_count(self):
+        return sum(len(names) for names in self.ready.values())
+
+warm_pool = WarmPool(parse_warm_pool_targets(WARM_POOL_TARGETS))
+
+async def provision_container(container_name, os_image, plan, ram_mb, cpu, storage=None, features=False, priority=PRIORITY_INTERACTIVE):
+    """Create and start a VPS container, from the warm pool when possible; returns 'pool' or 'launch'"""
+    started = time.perf_counter()
+    profiles = ['default']
+    if features and BASE_PROFILE in synced_profiles:
+        profiles.append(BASE_PROFILE)
+    limits = {'limits.memory': f"{ram_mb}MB", 'limits.cpu': str(cpu)}
+    root_size = root_disk_size(storage) if storage_pools.supports_quota(storage_pools.pool()) else None
+    # Catalogue plans carry their limits and root disk in a profile; sizes that differ are set on the instance
+    plan_profile = plan_profile_name(plan)
+    specs = get_plan_specs(plan)
+    if specs and plan_profile in synced_profiles:
+        profiles.append(plan_profile)
+        if ram_mb == memory_mb(specs.get('ram')) and str(cpu) == str(specs.get('cpu', '1')):
+            limits = {}
+
+    if await warm_pool.claim(os_image, plan, container_name, profiles, limits, root_size, priority):
+        source = 'pool'
+    else:
+        args = [f"-p {profile}" for profile in profiles] + [f"--config {key}={value}" for key, value in limits.items()]
+        if not (plan_profile in profiles and storage_pools.selected):
+            # No plan profile root device to inherit: pick the pool (and size) on the instance
+            args.append(f"-s {storage_pools.pool()}")
+            if root_size:
+                args.append(f"-d root,size={root_size}")
+        if BASELINE_SNAPSHOTS:
+            await execute_lxc(f"lxc init {image_manager.resolve(os_image)} {container_name} {' '.join(args)}", priority=priority)
+            await execute_lxc(f"lxc snapshot {container_name} {BASELINE_SNAPSHOT}", priority=priority)
+            await execute_lxc(f"lxc start {container_name}", priority=priority)
+        else:
+            await execute_lxc(f"lxc launch {image_manager.resolve(os_image)} {container_name} {' '.join(args)}", priority=priority)
+        source = 'launch'
+
+    if features and BASE_PROFILE not in profiles:
+        # Profiles not synced yet: apply the features one by one
+        await execute_lxc(f"lxc config set {container_name} security.nesting true", priority=priority)
+        await execute_lxc(f"lxc config set {container_name} security.privileged true", priority=priority)
+        await execute_lxc(f"lxc config device add {container_name} fuse unix-char path=/dev/fuse", priority=priority)
+        await execute_lxc(f"lxc config set {container_name} linux.kernel_modules {BASE_PROFILE_CONFIG['linux.kernel_modules']}", priority=priority)
+
+    elapsed = time.perf_counter() - started
+    warm_pool.latency[source].append(elapsed)
+    logger.info(f"Provisioned {container_name} from {source} in {elapsed:.1f}s")
+    return source
+
+async def reinstall_container(vps, priority=PRIORITY_INTERACTIVE):
+    """Return a VPS to its freshly-deployed state; returns ('restore' or 'rebuild', seconds)"""
+    container_name = vps['container_name']
+    started = time.perf_counter()
+    snapshots = await lxd_query('GET', f"/1.0/instances/{container_name}/snapshots", priority=priority) or []
+    if any(url.rsplit('/', 1)[-1] == BASELINE_SNAPSHOT for url in snapshots):
+        # A restore is a clone on CoW pools, but it also rolls the config back to deploy time
+        with contextlib.suppress(Exception):
+            await execute_lxc(f"lxc stop {container_name} --force", priority=priority)  # fails if already stopped
+        await execute_lxc(f"lxc restore {container_name} {BASELINE_SNAPSHOT}", priority=priority)
+        # Re-apply the size on record so upgrades made since the deploy survive
+        ram_mb = memory_mb(vps.get('ram'))
+        if ram_mb:
+            await execute_lxc(f"lxc config set {container_name} limits.memory={ram_mb}MB limits.cpu={vps.get('cpu', '1')}", priority=priority)
+        await execute_lxc(f"lxc start {container_name}", priority=priority)
+        # Baselines of warm pool containers predate the rename
+        await set_guest_hostname(container_name, priority)
+        return 'restore', time.perf_counter() - started
+
+    # No baseline (created before snapshots existed): full rebuild, which takes a new baseline.
+    logger.info(f"{container_name} has no {BASELINE_SNAPSHOT} snapshot, rebuilding")
+    # Only deploy-panel VPS (deployed_by) were created with the Docker features.
+    containers_rebuilding.add(container_name)
     try:
-        result = await execute_lxc(f"lxc info {container_name}")
-        if "Status: Running" in result:
-            return "running"
-        elif "Status: Stopped" in result:
-            return "stopped"
+        with contextlib.suppress(Exception):
+            await execute_lxc(f"lxc delete {container_name} --force", priority=priority)
+        await provision_container(container_name, vps.get('os', 'ubuntu:22.04'), vps.get('plan', 'Custom'),
+                                           memory_mb(vps.get('ram')) or 1024, vps.get('cpu', '1'), vps.get('storage'),
+                                           features='deployed_by' in vps, priority=priority)
+    finally:
+        containers_rebuilding.discard(container_name)
+    return 'rebuild', time.perf_counter() - started
+
+# Deployment pipeline
+DEPLOY_STEPS = ('reserve', 'debit', 'launch', 'configure', 'record', 'role', 'notify')
+DEPLOY_BEST_EFFORT_STEPS = ('role', 'notify')  # the VPS is already delivered by then
+DEPLOY_HISTORY = int(os.getenv('DEPLOY_HISTORY', '200'))
+
+class DeploymentPipeline:
+    """A VPS deployment as idempotent steps, checkpointed to disk after each one so a restart can resume or roll back"""
+
+    def __init__(self, state, hooks=None):
+        self.state = state
+        # Optional async callables taking the pipeline: 'progress' (called with the step too), 'role', 'notify'
+        self.hooks = hooks or {}
+
+    @classmethod
+    def create(cls, kind, user_id, vps_info, os_image, ram_mb, cost=0, features=False, guild_id=None, hooks=None):
+        state = {
+            'id': os.urandom(6).hex(),
+            'kind': kind,
+            'user_id': user_id,
+            'guild_id': guild_id,
+            'vps_info': vps_info,
+            'os': os_image,
+            'ram_mb': ram_mb,
+            'cost': cost,
+            'features': features,
+            'status': 'running',
+            'completed': [],
+            'timings': {},
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'error': None,
+        }
+        deployment_data[state['id']] = state
+        return cls(state, hooks)
+
+    @property
+    def container_name(self):
+        return self.state['vps_info']['container_name']
+
+    async def checkpoint(self, pruned=()):
+        """Durably write this deployment's state (and drop pruned ones) before moving on"""
+        save_data('deploy', key=[self.state['id'], *pruned], op='deploy_step')
+        await persistence.flush()
+
+    async def run(self):
+        for step in DEPLOY_STEPS:
+            if step in self.state['completed']:
+                continue
+            if 'progress' in self.hooks:
+                with contextlib.suppress(Exception):
+                    await self.hooks['progress'](self, step)
+            started = time.perf_counter()
+            try:
+                if step in self.hooks:
+                    await self.hooks[step](self)
+                else:
+                    await getattr(self, f"step_{step}")()
+            except Exception as e:
+                if step not in DEPLOY_BEST_EFFORT_STEPS:
+                    self.state['error'] = f"{step}: {e}"
+                    logger.error(f"Deployment {self.state['id']} failed at {step}: {e}")
+                    await self.rollback()
+                    raise
+                logger.warning(f"Deployment {self.state['id']} step {step} failed: {e}")
+            self.state['timings'][step] = round(time.perf_counter() - started, 3)
+            self.state['completed'].append(step)
+            await self.checkpoint()
+        await self.checkpoint(self.finish('done'))
+
+    def finish(self, status):
+        """Mark the deployment finished; returns the ids of old states dropped from the history"""
+        self.state['status'] = status
+        self.state['finished_at'] = datetime.now().isoformat()
+        finished = sorted((state for state in deployment_data.values() if state['status'] != 'running'),
+                          key=lambda state: state['finished_at'] or '')
+        pruned = [state['id'] for state in finished[:-DEPLOY_HISTORY]]
+        for deployment_id in pruned:
+            deployment_data.pop(deployment_id, None)
+        return pruned
+
+    async def rollback(self):
+        """Undo a deployment that never reached the record step"""
+        if 'record' in self.state['completed']:
+            return
+        if self.state.get('launch_started'):
+            # launch_started is only set once the name was confirmed free, so the instance is ours
+            await self.delete_instance()
+        if 'debit' in self.state['completed'] and self.state['cost']:
+            user_id = self.state['user_id']
+            user_data.setdefault(user_id, {"credits": 0})["credits"] += self.state['cost']
+            save_data('user', key=user_id, op='credit_refund')
+        await self.checkpoint(self.finish('rolled_back'))
+
+    async def delete_instance(self):
+        with contextlib.suppress(Exception):
+            await execute_lxc(f"lxc delete {self.container_name} --force", priority=PRIORITY_BACKGROUND)
+        status_cache.invalidate(self.container_name)
+
+    async def get_instance(self):
+        """The LXD instance under our container name, or None if there is none"""
+        instances = await lxd_query('GET', '/1.0/instances', priority=PRIORITY_INTERACTIVE) or []
+        if f"/1.0/instances/{self.container_name}" not in instances:
+            return None
+        return await lxd_query('GET', f"/1.0/instances/{self.container_name}", priority=PRIORITY_INTERACTIVE)
+
+    def instance_complete(self, instance):
+        """Whether a launch we were interrupted in left a fully configured VPS"""
+        config = instance.get('expanded_config') or {}
+        vps = self.state['vps_info']
+        if WARM_POOL_CONFIG_KEY in (instance.get('config') or {}):
+            return False  # claimed from the pool but never finished
+        if config.get('limits.memory') != f"{self.state['ram_mb']}MB" or config.get('limits.cpu') != str(vps['cpu']):
+            return False
+        return not self.state['features'] or config.get('security.nesting') == 'true'
+
+    async def step_reserve(self):
+        """Make sure no other VPS, running deployment or LXD instance uses the container name"""
+        taken = {vps.get('container_name') for _, vps in iter_vps()}
+        taken |= {url.rsplit('/', 1)[-1] for url in await lxd_query('GET', '/1.0/instances', priority=PRIORITY_INTERACTIVE) or []}
+        taken |= {state['vps_info']['container_name'] for state in deployment_data.values()
+                  if state['status'] == 'running' and state['id'] != self.state['id']}
+        name = self.container_name
+        base, _, number = name.rpartition('-')
+        number = int(number) if number.isdigit() else 1
+        while name in taken:
+            number += 1
+            name = f"{base}-{number}"
+        self.state['vps_info']['container_name'] = name
+
+    async def step_debit(self):
+        if not self.state['cost']:
+            return
+        user_id = self.state['user_id']
+        account = user_data.setdefault(user_id, {"credits": 0})
+        if account["credits"] < self.state['cost']:
+            raise Exception(f"Insufficient credits ({account['credits']}/{self.state['cost']})")
+        account["credits"] -= self.state['cost']
+        # Flushed together with the step checkpoint
+        save_data('user', key=user_id, op='credit_debit')
+
+    async def step_launch(self):
+        vps = self.state['vps_info']
+        instance = await self.get_instance()
+        if self.state.get('launch_started'):
+            # Resumed after a restart: keep what the interrupted launch created only if it got all the way
+            if instance is not None and self.instance_complete(instance):
+                return
+            if instance is not None:
+                logger.warning(f"Deployment {self.state['id']}: {self.container_name} was left half-built, relaunching")
+                await self.delete_instance()
+        elif instance is not None:
+            raise Exception(f"Container name {self.container_name} was taken after it was reserved")
+        self.state['launch_started'] = True
+        await self.checkpoint()
+        self.state['source'] = await provision_container(self.container_name, self.state['os'], vps.get('plan', 'Custom'),
+                                                         self.state['ram_mb'], vps['cpu'], vps.get('storage'),
+                                                         features=self.state['features'])
+
+    async def step_configure(self):
+        """Ensure the container is up (an interrupted launch may have stopped before starting it)"""
+        current = await lxd_query('GET', f"/1.0/instances/{self.container_name}/state", priority=PRIORITY_INTERACTIVE) or {}
+        if normalize_lxd_status(current.get('status')) != 'running':
+            await execute_lxc(f"lxc start {self.container_name}", priority=PRIORITY_INTERACTIVE)
+        status_cache.invalidate(self.container_name, 'running')
+
+    async def step_record(self):
+        user_id = self.state['user_id']
+        vps_list = vps_data.setdefault(user_id, [])
+        if any(vps.get('container_name') == self.container_name for vps in vps_list):
+            return
+        now = datetime.now().isoformat()
+        vps_list.append({**self.state['vps_info'], 'status': 'running', 'created_at': now, 'last_updated': now})
+        system_stats['total_vps_created'] += 1
+        save_data('vps', key=user_id, op='vps_create')
+
+    def vps_number(self):
+        names = [vps.get('container_name') for vps in vps_data.get(self.state['user_id'], [])]
+        return names.index(self.container_name) + 1 if self.container_name in names else len(names)
+
+    async def step_role(self):
+        guild = bot.get_guild(self.state['guild_id']) if self.state['guild_id'] else None
+        if guild is None:
+            return
+        member = guild.get_member(int(self.state['user_id'])) or await guild.fetch_member(int(self.state['user_id']))
+        vps_role = await get_or_create_vps_role(guild)
+        if vps_role:
+            await member.add_roles(vps_role, reason="VPS ownership granted")
+
+    async def step_notify(self):
+        """Generic DM, used when a resumed deployment no longer has its command's context"""
+        vps = self.state['vps_info']
+        user = await user_directory.resolve(self.state['user_id'])
+        if user is None:
+            raise Exception(f"Unknown user {self.state['user_id']}")
+        dm_embed = create_success_embed("🎉 Your VPS is Ready!", f"Your {vps.get('plan', 'Custom')} VPS has been deployed!")
+        dm_embed.add_field(name="📊 VPS Information",
+            value=f"**VPS ID:** #{self.vps_number()}\n**Container:** `{self.container_name}`\n**Resources:** {vps.get('ram')} RAM • {vps.get('cpu')} CPU • {vps.get('storage')} Storage",
+            inline=False)
+        dm_embed.add_field(name="🚀 Get Started", value="• Type `.manage` to access your VPS\n• Use **SSH Access** button for terminal", inline=False)
+        await user.send(embed=dm_embed)
+
+deployments_resumed = False
+
+async def resume_deployments():
+    """Finish (or roll back) deployments interrupted by a restart"""
+    pending = [state for state in deployment_data.values() if state['status'] == 'running']
+    for state in pending:
+        logger.info(f"Resuming deployment {state['id']} ({state['kind']}) of {state['vps_info']['container_name']} after {state['completed'][-1] if state['completed'] else 'start'}")
+        try:
+            await DeploymentPipeline(state).run()
+        except Exception as e:
+            logger.error(f"Resumed deployment {state['id']} rolled back: {e}")
+
+# Bulk operations
+BULK_CONCURRENCY = int(os.getenv('BULK_CONCURRENCY', str(LXC_MAX_CONCURRENCY)))
+BULK_PROGRESS_INTERVAL = float(os.getenv('BULK_PROGRESS_INTERVAL', '3'))
+BULK_FILTER_KEYS = ('plan', 'plan_type', 'status', 'owner', 'processor', 'before', 'after')
+
+def parse_bulk_filter(text):
+    """Parse `key=value[,value...]` tokens into a filter dict; `all` matches every VPS"""
+    filters = {}
+    for token in text.split():
+        if token == 'all':
+            continue
+        key, sep, value = token.partition('=')
+        key = key.lower()
+        if not sep or not value:
+            raise ValueError(f"Expected key=value, got `{token}`")
+        if key in ('before', 'after'):
+            filters[key] = datetime.fromisoformat(value).isoformat()
+        elif key == 'owner':
+            filters[key] = {v.strip('<@!>') for v in value.split(',')}
+        elif key in BULK_FILTER_KEYS:
+            filters[key] = {v.lower() for v in value.split(',')}
         else:
-            return "unknown"
-    except:
-        return "error"
+            raise ValueError(f"Unknown filter `{key}` (use {', '.join(BULK_FILTER_KEYS)})")
+    return filters
+
+def bulk_matches(user_id, vps, filters):
+    for key, wanted in filters.items():
+        if key == 'owner':
+            if user_id not in wanted:
+                return False
+        elif key == 'before':
+            if not vps.get('created_at') or vps['created_at'] >= wanted:
+                return False
+        elif key == 'after':
+            if not vps.get('created_at') or vps['created_at'] < wanted:
+                return False
+        elif str(vps.get(key, '')).lower() not in wanted:
+            return False
+    return True
+
+async def run_bounded(items, handler, concurrency=BULK_CONCURRENCY, progress=None):
+    """Run handler(item) for every item on a fixed pool of workers.
+
+    Returns [(item, result, error)] in input order; progress(done, total) is
+    awaited after each item finishes.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    queue = asyncio.Queue()
+    for index, item in enumerate(items):
+        queue.put_nowait((index, item))
+    done = 0
+
+    async def worker():
+        nonlocal done
+        while True:
+            try:
+                index, item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[index] = (item, await handler(item), None)
+            except Exception as e:
+                results[index] = (item, None, e)
+            done += 1
+            if progress:
+                with contextlib.suppress(Exception):
+                    await progress(done, len(items))
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(items))))))
+    return results
+
+def bulk_lxd_status(vps, args):
+    """LXD's status for a target, falling back to the record for containers the fleet query didn't list"""
+    return args.get('statuses', {}).get(vps['container_name'], vps.get('status'))
+
+async def bulk_start(user_id, vps, admin_id, args):
+    if vps.get('status') in ('running', 'suspended'):
+        return 'skipped'
+    await execute_lxc(f"lxc start {vps['container_name']}", priority=PRIORITY_NORMAL)
+    vps['status'] = 'running'
+    status_cache.invalidate(vps['container_name'], 'running')
+    return 'start'
+
+async def bulk_stop(user_id, vps, admin_id, args):
+    if vps.get('status') == 'suspended' or bulk_lxd_status(vps, args) not in ('running', 'frozen'):
+        return 'skipped'
+    # Same clean-shutdown-then-force escalation as .stopall
+    await stop_container_gracefully(vps['container_name'])
+    vps['status'] = 'stopped'
+    vps.pop('stopped_stateful', None)
+    status_cache.invalidate(vps['container_name'], 'stopped')
+    return 'stop'
+
+async def bulk_restart(user_id, vps, admin_id, args):
+    if vps.get('status') != 'running':
+        return 'skipped'
+    await execute_lxc(f"lxc restart {vps['container_name']}", priority=PRIORITY_NORMAL)
+    status_cache.invalidate(vps['container_name'], 'running')
+    return 'restart'
+
+async def bulk_suspend(user_id, vps, admin_id, args):
+    if vps.get('status') == 'suspended':
+        return 'skipped'
+    if bulk_lxd_status(vps, args) != 'stopped':
+        await execute_lxc(f"lxc stop {vps['container_name']} --force", priority=PRIORITY_NORMAL)
+    vps['status'] = 'suspended'
+    vps['suspended_at'] = datetime.now().isoformat()
+    vps['suspended_by'] = admin_id
+    status_cache.invalidate(vps['container_name'], 'stopped')
+    return 'suspend'
+
+async def bulk_unsuspend(user_id, vps, admin_id, args):
+    if vps.get('status') != 'suspended':
+        return 'skipped'
+    await execute_lxc(f"lxc start {vps['container_name']}", priority=PRIORITY_NORMAL)
+    vps['status'] = 'running'
+    vps.pop('suspended_at', None)
+    vps.pop('suspended_by', None)
+    status_cache.invalidate(vps['container_name'], 'running')
+    return 'unsuspend'
+
+async def bulk_upgrade(user_id, vps, admin_id, args):
+    # LXD applies memory and CPU limits live, so there is no stop/start cycle
+    await execute_lxc(f"lxc config set {vps['container_name']} limits.memory={args['ram'] * 1024}MB limits.cpu={args['cpu']}", priority=PRIORITY_NORMAL)
+    vps['ram'] = f"{args['ram']}GB"
+    vps['cpu'] = str(args['cpu'])
+    vps['upgraded_at'] = datetime.now().isoformat()
+    vps['upgraded_by'] = admin_id
+    return 'upgrade'
+
+STOPALL_CONCURRENCY = int(os.getenv('STOPALL_CONCURRENCY', str(BULK_CONCURRENCY)))
+STOPALL_GRACE_TIMEOUT = int(os.getenv('STOPALL_GRACE_TIMEOUT', '30'))
+
+async def stop_container_gracefully(container_name, grace=STOPALL_GRACE_TIMEOUT, stateful=False, priority=PRIORITY_NORMAL):
+    """Stop a container, escalating stateful -> clean shutdown -> force; returns the method that worked"""
+    if stateful:
+        try:
+            await execute_lxc(f"lxc stop {container_name} --stateful", timeout=grace + 60, priority=priority)
+            return 'stateful'
+        except Exception as e:
+            logger.warning(f"Stateful stop of {container_name} failed, shutting down instead: {e}")
+    try:
+        await execute_lxc(f"lxc stop {container_name} --timeout {grace}", timeout=grace + 30, priority=priority)
+        return 'graceful'
+    except Exception as e:
+        logger.warning(f"{container_name} did not shut down within {grace}s, forcing: {e}")
+    await execute_lxc(f"lxc stop {container_name} --force", priority=priority)
+    return 'forced'
+
+BULK_ACTIONS = {
+    'start': bulk_start,
+    'stop': bulk_stop,
+    'restart': bulk_restart,
+    'suspend': bulk_suspend,
+    'unsuspend': bulk_unsuspend,
+    'upgrade': bulk_upgrade,
+}
+BULK_LXD_STATUS_ACTIONS = ('stop', 'suspend')
+
+async def run_bulk_action(action, targets, admin_id, args=None, progress=None):
+    """Apply a bulk action to [(user_id, vps)]; returns (applied, skipped, failures)"""
+    handler = BULK_ACTIONS[action]
+    args = dict(args or {})
+    if action in BULK_LXD_STATUS_ACTIONS:
+        # Decide from what LXD reports, not what the records claim
+        args['statuses'] = await get_fleet_status(PRIORITY_INTERACTIVE)
+
+    async def apply(target):
+        user_id, vps = target
+        result = await handler(user_id, vps, admin_id, args)
+        if result != 'skipped':
+            vps['last_updated'] = datetime.now().isoformat()
+            save_data('vps', key=user_id, op=f"bulk_{result}")
+        return result
+
+    results = await run_bounded(targets, apply, progress=progress)
+    applied = sum(1 for _, result, error in results if error is None and result != 'skipped')
+    skipped = sum(1 for _, result, error in results if result == 'skipped')
+    failures = [(target, error) for target, _, error in results if error is not None]
+    return applied, skipped, failures
+
+# Discord user resolution
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '3600'))
+USER_FETCH_CONCURRENCY = int(os.getenv('USER_FETCH_CONCURRENCY', '4'))
+
+class UserDirectory:
+    """LRU/TTL cache of Discord users; the gateway cache is checked first, REST fetches are concurrent but bounded"""
+
+    def __init__(self, size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL, concurrency=USER_FETCH_CONCURRENCY):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # user_id -> (expires, user or None for unknown ids)
+        self.inflight = {}
+        self.fetch_slots = asyncio.Semaphore(concurrency)
+        self.stats = {'hits': 0, 'gateway': 0, 'fetched': 0, 'failed': 0}
+
+    def _store(self, user_id, user):
+        self.entries[user_id] = (time.monotonic() + self.ttl, user)
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def remember(self, user):
+        """Seed the cache with a user a command already resolved"""
+        self._store(str(user.id), user)
+
+    def lookup(self, user_id):
+        """(known, user) without any network call"""
+        user_id = str(user_id)
+        entry = self.entries.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            self.entries.move_to_end(user_id)
+            self.stats['hits'] += 1
+            return True, entry[1]
+        user = bot.get_user(int(user_id))
+        if user is not None:
+            self.stats['gateway'] += 1
+            self._store(user_id, user)
+            return True, user
+        return False, None
+
+    def cached(self, user_id):
+        return self.lookup(user_id)[1]
+
+    async def resolve(self, user_id):
+        """The user, or None if Discord does not know the id"""
+        user_id = str(user_id)
+        known, user = self.lookup(user_id)
+        if known:
+            return user
+        # Concurrent lookups of the same id share one request
+        if user_id not in self.inflight:
+            self.inflight[user_id] = asyncio.get_running_loop().create_task(self._fetch(user_id))
+        return await asyncio.shield(self.inflight[user_id])
+
+    async def _fetch(self, user_id):
+        try:
+            async with self.fetch_slots:
+                user = await bot.fetch_user(int(user_id))
+            self.stats['fetched'] += 1
+            self._store(user_id, user)
+            return user
+        except discord.NotFound:
+            self._store(user_id, None)
+            return None
+        except Exception as e:
+            # Not cached, so the next lookup retries
+            self.stats['failed'] += 1
+            logger.warning(f"Could not fetch user {user_id}: {e}")
+            return None
+        finally:
+            self.inflight.pop(user_id, None)
+
+    async def resolve_many(self, user_ids):
+        """{user_id: user or None}, fetching all cache misses concurrently"""
+        user_ids = [str(user_id) for user_id in dict.fromkeys(user_ids)]
+        users = await asyncio.gather(*(self.resolve(user_id) for user_id in user_ids))
+        return dict(zip(user_ids, users))
+
+    def name(self, user_id):
+        user = self.cached(user_id)
+        return user.name if user else f"Unknown User ({user_id})"
+
+user_directory = UserDirectory()
+
+# Fleet index
+FLEET_PAGE_SIZE = int(os.getenv('FLEET_PAGE_SIZE', '10'))
+
+def resource_sort_key(user_id, vps):
+    try:
+        cpu = float(vps.get('cpu') or 0)
+    except (TypeError, ValueError):
+        cpu = 0.0
+    return (parse_size_bytes(vps.get('ram')) or 0, cpu)
+
+FLEET_SORT_KEYS = {
+    'created_at': lambda user_id, vps: (vps.get('created_at') or '',),
+    'plan': lambda user_id, vps: (str(vps.get('plan') or 'Custom').lower(), vps.get('created_at') or ''),
+    'status': lambda user_id, vps: (vps.get('status') or 'unknown', vps.get('created_at') or ''),
+    'owner': lambda user_id, vps: (user_id, vps.get('created_at') or ''),
+    'resources': resource_sort_key,
+}
+
+class FleetIndex:
+    """Every VPS kept pre-sorted under each sort key, so any page is a slice.
+
+    Entries are (*sort key, container name, owner id, position); save_data marks
+    the changed owners dirty and only their entries are re-inserted.
+    """
+
+    def __init__(self):
+        self.sorted = {key: [] for key in FLEET_SORT_KEYS}
+        self.owner_entries = {}  # user_id -> [{sort key: entry}] for removal
+        self.dirty = set()
+        self.stale = True
+        self.version = 0
+
+    def mark_dirty(self, user_ids=None):
+        if user_ids is None:
+            self.stale = True
+        else:
+            self.dirty.update([user_ids] if isinstance(user_ids, str) else user_ids)
+
+    def _entries(self, user_id):
+        return [{key: (*sort_key(user_id, vps), vps.get('container_name') or '', user_id, position)
+                 for key, sort_key in FLEET_SORT_KEYS.items()}
+                for position, vps in enumerate(vps_data.get(user_id, []))]
+
+    def refresh(self):
+        if self.stale:
+            self.owner_entries = {user_id: self._entries(user_id) for user_id in vps_data}
+            for key in FLEET_SORT_KEYS:
+                self.sorted[key] = sorted(entry[key] for entries in self.owner_entries.values() for entry in entries)
+            self.stale = False
+            self.dirty.clear()
+            self.version += 1
+            return
+        if not self.dirty:
+            return
+        for user_id in self.dirty:
+            for entry in self.owner_entries.pop(user_id, []):
+                for key, item in entry.items():
+                    ordered = self.sorted[key]
+                    index = bisect.bisect_left(ordered, item)
+                    if index < len(ordered) and ordered[index] == item:
+                        del ordered[index]
+            entries = self._entries(user_id)
+            if entries:
+                self.owner_entries[user_id] = entries
+            for entry in entries:
+                for key, item in entry.items():
+                    bisect.insort(self.sorted[key], item)
+        self.dirty.clear()
+        self.version += 1
+
+    def entries(self, sort):
+        self.refresh()
+        return self.sorted[sort]
+
+    @staticmethod
+    def resolve(entry):
+        """(user_id, vps) for an entry, or None if the record has gone"""
+        user_id, position = entry[-2], entry[-1]
+        vps_list = vps_data.get(user_id, [])
+        return (user_id, vps_list[position]) if position < len(vps_list) else None
+
+fleet_index = FleetIndex()
+
+class FleetBrowserView(discord.ui.View):
+    """Paginated fleet listing over the fleet index; each page renders only when it is shown"""
+
+    def __init__(self, admin_id, summary_fields, sort='created_at', descending=True, filters=None, filter_text=""):
+        super().__init__(timeout=300)
+        self.admin_id = admin_id
+        self.summary_fields = summary_fields
+        self.sort = sort
+        self.descending = descending
+        self.filters = filters or {}
+        self.filter_text = filter_text
+        self.page = 0
+        self.matches = None  # (index version, sort, filtered entries)
+        self.add_controls()
+
+    def rows(self):
+        entries = fleet_index.entries(self.sort)
+        if not self.filters:
+            return entries
+        # Filtering scans once per sort/data version; paging through the result is then a slice
+        if self.matches is None or self.matches[:2] != (fleet_index.version, self.sort):
+            self.matches = (fleet_index.version, self.sort,
+                            [entry for entry in entries if (record := fleet_index.resolve(entry)) and bulk_matches(*record, self.filters)])
+        return self.matches[2]
+
+    def page_count(self, total):
+        return max(1, -(-total // FLEET_PAGE_SIZE))
+
+    def add_controls(self):
+        self.clear_items()
+        sort_select = discord.ui.Select(placeholder="Sort by...", options=[
+            discord.SelectOption(label=key.replace('_', ' ').title(), value=key, default=key == self.sort) for key in FLEET_SORT_KEYS
+        ])
+        sort_select.callback = self.change_sort
+        self.add_item(sort_select)
+        for emoji, label, action in (("⏪", "First", 'first'), ("◀️", "Previous", 'prev'), ("▶️", "Next", 'next'), ("⏩", "Last", 'last')):
+            button = discord.ui.Button(emoji=emoji, label=label, style=discord.ButtonStyle.secondary)
+            button.callback = self.make_nav(action)
+            self.add_item(button)
+        order = discord.ui.Button(label="Newest/Highest first" if self.descending else "Oldest/Lowest first", style=discord.ButtonStyle.primary)
+        order.callback = self.toggle_order
+        self.add_item(order)
+
+    async def render(self):
+        rows = self.rows()
+        total = len(rows)
+        pages = self.page_count(total)
+        self.page = max(0, min(self.page, pages - 1))
+        start = self.page * FLEET_PAGE_SIZE
+        if self.descending:
+            window = rows[max(0, total - start - FLEET_PAGE_SIZE):total - start][::-1]
+        else:
+            window = rows[start:start + FLEET_PAGE_SIZE]
+        records = [record for record in map(fleet_index.resolve, window) if record]
+        users = await user_directory.resolve_many(user_id for user_id, _ in records)
+
+        embed = create_embed("📊 All VPS Information", "Complete system overview", 0x1a1a1a)
+        for field in self.summary_fields:
+            embed.add_field(**field)
+        lines = []
+        for user_id, vps in records:
+            status_emoji = "🟢" if vps.get('status') == 'running' else "🔴" if vps.get('status') == 'stopped' else "⏸️"
+            owner = users.get(user_id)
+            lines.append(f"{status_emoji} **{owner.name if owner else f'Unknown User ({user_id})'}** - `{vps.get('container_name', 'Unknown')}` ({vps.get('plan', 'Custom')} • {vps.get('ram', '?')} • {vps.get('cpu', '?')} CPU)")
+        heading = f"🖥️ VPS {start + 1}-{start + len(window)} of {total}" if total else "🖥️ VPS"
+        embed.add_field(name=heading, value="\n".join(lines) or "No VPS match.", inline=False)
+        embed.add_field(name="🔍 View", value=f"**Sort:** {self.sort} ({'desc' if self.descending else 'asc'})\n**Filter:** {self.filter_text or 'none'}\n**Page:** {self.page + 1}/{pages}", inline=False)
+        return embed
+
+    async def show(self, interaction):
+        if str(interaction.user.id) != self.admin_id:
+            await interaction.response.send_message("This listing is not for you!", ephemeral=True)
+            return
+        await interaction.response.defer()
+        self.add_controls()
+        await interaction.edit_original_response(embed=await self.render(), view=self)
+
+    def make_nav(self, action):
+        async def navigate(interaction: discord.Interaction):
+            pages = self.page_count(len(self.rows()))
+            self.page = {'first': 0, 'prev': self.page - 1, 'next': self.page + 1, 'last': pages - 1}[action]
+            await self.show(interaction)
+        return navigate
+
+    async def change_sort(self, interaction: discord.Interaction):
+        self.sort = interaction.data['values'][0]
+        self.page = 0
+        await self.show(interaction)
+
+    async def toggle_order(self, interaction: discord.Interaction):
+        self.descending = not self.descending
+        self.page = 0
+        await self.show(interaction)
 
 # VPS role management
 async def get_or_create_vps_role(guild):
@@ -289,57 +3267,387 @@ async def auto_status_update():
     
     try:
         logger.info("Starting auto status update...")
-        updated_count = 0
-        
-        for user_id, vps_list in vps_data.items():
-            for vps in vps_list:
-                container_name = vps.get('container_name')
-                if container_name:
-                    current_status = await get_vps_status(container_name)
-                    if current_status != vps.get('status') and current_status != 'error':
-                        vps['status'] = current_status
-                        vps['last_updated'] = datetime.now().isoformat()
-                        updated_count += 1
-        
-        if updated_count > 0:
-            save_data()
-            logger.info(f"Auto status update completed: {updated_count} VPS updated")
+        updated_users = await refresh_vps_statuses(priority=PRIORITY_BACKGROUND)
+        if updated_users:
+            logger.info(f"Auto status update completed: VPS updated for {len(updated_users)} users")
     except Exception as e:
         logger.error(f"Error in auto status update: {e}")
 
-# CPU monitoring
-def cpu_monitor():
-    """Monitor CPU usage and stop all VPS if threshold is exceeded"""
-    global cpu_monitor_active
-    
-    while cpu_monitor_active:
+# Per-container resource metrics
+LXD_CGROUP_ROOT = os.getenv('LXD_CGROUP_ROOT', '/sys/fs/cgroup')
+CONTAINER_STATS_INTERVAL = int(os.getenv('CONTAINER_STATS_INTERVAL', '10'))
+CONTAINER_STATS_FINE_POINTS = int(os.getenv('CONTAINER_STATS_FINE_POINTS', '360'))  # 1h at 10s
+CONTAINER_STATS_COARSE_STEP = int(os.getenv('CONTAINER_STATS_COARSE_STEP', '300'))
+CONTAINER_STATS_COARSE_POINTS = int(os.getenv('CONTAINER_STATS_COARSE_POINTS', '288'))  # 24h at 5min
+
+CONTAINER_METRICS = ('cpu', 'memory', 'io_read', 'io_write')  # cores in use, bytes, bytes/s, bytes/s
+CGROUP_PREFIX = 'lxc.payload.'
+
+def parse_size_bytes(size):
+    """'4GB' / '512MB' -> bytes, None if unparseable"""
+    match = re.match(r'\s*([\d.]+)\s*([KMGT]?)i?B?\s*$', str(size or ''), re.IGNORECASE)
+    if not match:
+        return None
+    return int(float(match.group(1)) * 1024 ** ' KMGT'.index(match.group(2).upper() or ' '))
+
+def format_bytes(value):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(value) < 1024:
+            return f"{value:.1f}{unit}" if unit != 'B' else f"{value:.0f}B"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+def read_cgroup_counters(container_name):
+    """(usage_usec, memory_bytes, read_bytes, write_bytes) from the container's cgroup v2 files, None if unavailable"""
+    base = os.path.join(LXD_CGROUP_ROOT, CGROUP_PREFIX + container_name)
+    try:
+        usage_usec = None
+        with open(os.path.join(base, 'cpu.stat')) as f:
+            for line in f:
+                key, _, value = line.partition(' ')
+                if key == 'usage_usec':
+                    usage_usec = int(value)
+                    break
+        with open(os.path.join(base, 'memory.current')) as f:
+            memory = int(f.read())
+        read_bytes = write_bytes = 0
         try:
-            system_info = get_system_info()
-            if system_info and system_info['cpu_usage'] > CPU_THRESHOLD:
-                logger.warning(f"CPU usage ({system_info['cpu_usage']}%) exceeded threshold ({CPU_THRESHOLD}%). Stopping all VPS.")
-                
-                try:
-                    subprocess.run(['lxc', 'stop', '--all', '--force'], check=True)
-                    logger.info("All VPS stopped due to high CPU usage")
-                    
-                    # Update all VPS status in database
-                    for user_id, vps_list in vps_data.items():
-                        for vps in vps_list:
-                            if vps.get('status') == 'running':
-                                vps['status'] = 'stopped'
-                                vps['last_updated'] = datetime.now().isoformat()
-                    save_data()
-                except Exception as e:
-                    logger.error(f"Error stopping all VPS: {e}")
-            
-            time.sleep(CHECK_INTERVAL)
-        except Exception as e:
-            logger.error(f"Error in CPU monitor: {e}")
-            time.sleep(CHECK_INTERVAL)
+            with open(os.path.join(base, 'io.stat')) as f:
+                for line in f:
+                    for field in line.split()[1:]:
+                        key, _, value = field.partition('=')
+                        if key == 'rbytes':
+                            read_bytes += int(value)
+                        elif key == 'wbytes':
+                            write_bytes += int(value)
+        except OSError:
+            pass  # io controller not enabled for this cgroup
+    except (OSError, ValueError):
+        return None
+    if usage_usec is None:
+        return None
+    return usage_usec, memory, read_bytes, write_bytes
+
+def read_all_cgroup_counters():
+    """Counters for every running container in one pass over the cgroup tree"""
+    counters = {}
+    try:
+        entries = os.scandir(LXD_CGROUP_ROOT)
+    except OSError:
+        return counters
+    with entries:
+        for entry in entries:
+            if entry.name.startswith(CGROUP_PREFIX) and entry.is_dir():
+                name = entry.name[len(CGROUP_PREFIX):]
+                values = read_cgroup_counters(name)
+                if values is not None:
+                    counters[name] = values
+    return counters
+
+class MetricRing:
+    """Fixed-capacity time series: one array of timestamps plus one array per metric"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.stamps = array('d', bytes(8 * capacity))
+        self.values = {metric: array('d', bytes(8 * capacity)) for metric in CONTAINER_METRICS}
+        self.head = 0
+        self.count = 0
+
+    def append(self, stamp, sample):
+        self.stamps[self.head] = stamp
+        for metric in CONTAINER_METRICS:
+            self.values[metric][self.head] = sample[metric]
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last_stamp(self):
+        return self.stamps[self.head - 1] if self.count else None
+
+    def latest(self):
+        if not self.count:
+            return None
+        return {metric: self.values[metric][self.head - 1] for metric in CONTAINER_METRICS}
+
+    def average(self, since):
+        """Mean of each metric over points stamped at or after `since`, or None"""
+        totals = dict.fromkeys(CONTAINER_METRICS, 0.0)
+        points = 0
+        index = self.head
+        for _ in range(self.count):
+            index = (index - 1) % self.capacity
+            if self.stamps[index] < since:
+                break
+            for metric in CONTAINER_METRICS:
+                totals[metric] += self.values[metric][index]
+            points += 1
+        if not points:
+            return None
+        return {metric: total / points for metric, total in totals.items()}
+
+class ContainerSeries:
+    """Recent samples at full resolution plus coarse averages for the longer window"""
+
+    def __init__(self):
+        self.fine = MetricRing(CONTAINER_STATS_FINE_POINTS)
+        self.coarse = MetricRing(CONTAINER_STATS_COARSE_POINTS)
+        self._bucket = None
+        self._bucket_totals = dict.fromkeys(CONTAINER_METRICS, 0.0)
+        self._bucket_points = 0
+
+    def append(self, stamp, sample):
+        self.fine.append(stamp, sample)
+        bucket = int(stamp // CONTAINER_STATS_COARSE_STEP)
+        if self._bucket is not None and bucket != self._bucket:
+            self._close_bucket()
+        self._bucket = bucket
+        for metric in CONTAINER_METRICS:
+            self._bucket_totals[metric] += sample[metric]
+        self._bucket_points += 1
+
+    def _close_bucket(self):
+        if self._bucket_points:
+            self.coarse.append(self._bucket * CONTAINER_STATS_COARSE_STEP,
+                               {metric: total / self._bucket_points for metric, total in self._bucket_totals.items()})
+        self._bucket_totals = dict.fromkeys(CONTAINER_METRICS, 0.0)
+        self._bucket_points = 0
+
+    def average(self, seconds):
+        since = time.time() - seconds
+        if seconds <= CONTAINER_STATS_INTERVAL * CONTAINER_STATS_FINE_POINTS:
+            return self.fine.average(since)
+        # Long windows: closed coarse buckets plus whatever the open bucket has so far
+        result = self.coarse.average(since)
+        if self._bucket_points:
+            current = {metric: total / self._bucket_points for metric, total in self._bucket_totals.items()}
+            if result is None:
+                return current
+            n = min(self.coarse.count, seconds // CONTAINER_STATS_COARSE_STEP)
+            result = {metric: (result[metric] * n + current[metric]) / (n + 1) for metric in CONTAINER_METRICS}
+        return result
+
+class ContainerMetricsCollector:
+    """Samples CPU, memory and IO for every container in one pass on a fixed interval"""
+
+    def __init__(self, interval=CONTAINER_STATS_INTERVAL):
+        self.interval = interval
+        self.series = {}
+        self.source = None
+        self._counters = {}  # container_name -> (monotonic time, usage_usec, memory, read_bytes, write_bytes)
+        self._task = None
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Error collecting container metrics: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def read_counters(self):
+        counters = await asyncio.to_thread(read_all_cgroup_counters)
+        if counters:
+            self.source = 'cgroup'
+            return counters
+        # No cgroup v2 access (e.g. remote LXD): fall back to one bulk state query
+        self.source = 'lxd'
+        result = await execute_lxc("lxc query /1.0/instances?recursion=2", timeout=60, priority=PRIORITY_BACKGROUND)
+        for inst in (json.loads(result) if isinstance(result, str) and result else []):
+            state = inst.get('state') or {}
+            if normalize_lxd_status(inst.get('status')) != 'running':
+                continue
+            cpu_ns = (state.get('cpu') or {}).get('usage', 0)
+            memory = (state.get('memory') or {}).get('usage', 0)
+            counters[inst['name']] = (cpu_ns // 1000, memory, 0, 0)
+        return counters
+
+    async def collect(self):
+        counters = await self.read_counters()
+        now = time.monotonic()
+        stamp = time.time()
+        archived = []
+        for name, (usage_usec, memory, read_bytes, write_bytes) in counters.items():
+            previous = self._counters.get(name)
+            if previous is None or usage_usec < previous[1]:
+                continue  # first sight or counters reset by a restart
+            elapsed = now - previous[0]
+            if elapsed <= 0:
+                continue
+            sample = {
+                'cpu': (usage_usec - previous[1]) / (elapsed * 1_000_000),
+                'memory': memory,
+                'io_read': max(read_bytes - previous[3], 0) / elapsed,
+                'io_write': max(write_bytes - previous[4], 0) / elapsed,
+            }
+            self.series.setdefault(name, ContainerSeries()).append(stamp, sample)
+            archived.append((name, sample, stamp))
+        self._counters = {name: (now, *values) for name, values in counters.items()}
+        await metrics_archive.record_batch(CONTAINER_METRICS, archived)
+        # Keep history for stopped containers until it ages out of the long window
+        horizon = stamp - CONTAINER_STATS_COARSE_STEP * CONTAINER_STATS_COARSE_POINTS
+        for name in [name for name, series in self.series.items() if name not in counters and (series.fine.last_stamp() or 0) < horizon]:
+            del self.series[name]
+
+    def latest(self, container_name):
+        series = self.series.get(container_name)
+        return series.fine.latest() if series else None
+
+    def average(self, container_name, seconds):
+        series = self.series.get(container_name)
+        return series.average(seconds) if series else None
+
+    def ranked_cpu(self, seconds):
+        """[(container_name, share of host CPU %)] averaged over the window, highest first"""
+        cpus = psutil.cpu_count() or 1
+        ranking = []
+        for name in self._counters:
+            averages = self.average(name, seconds)
+            if averages:
+                ranking.append((name, averages['cpu'] * 100 / cpus))
+        ranking.sort(key=lambda item: item[1], reverse=True)
+        return ranking
+
+container_metrics = ContainerMetricsCollector()
+
+# CPU overload control
+CPU_RECOVER_THRESHOLD = int(os.getenv('CPU_RECOVER_THRESHOLD', str(max(CPU_THRESHOLD - 15, 0))))
+OVERLOAD_SUSTAIN_CHECKS = int(os.getenv('OVERLOAD_SUSTAIN_CHECKS', '2'))
+OVERLOAD_TOP_CONSUMERS = int(os.getenv('OVERLOAD_TOP_CONSUMERS', '3'))
+OVERLOAD_THROTTLE_ALLOWANCE = os.getenv('OVERLOAD_THROTTLE_ALLOWANCE', '25%')
+
+OVERLOAD_LEVELS = ('normal', 'throttle', 'stop offenders', 'stop all')
+
+def is_protected_owner(user_id):
+    return user_id in admin_data.get('purge_protection', {}).get('protected_users', [])
+
+class OverloadController:
+    """Escalates from throttling the top CPU consumers to stopping them, and only then to stopping everything"""
+
+    def __init__(self, interval=CHECK_INTERVAL):
+        self.interval = interval
+        self.level = 0
+        self.hot_checks = 0
+        self.cool_checks = 0
+        self.throttled = set()
+        self.stopped = set()
+        self.consumers = []  # [(container_name, host cpu %)] from the last check, highest first
+        self._task = None
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
 
-# Start monitoring systems
-cpu_thread = threading.Thread(target=cpu_monitor, daemon=True)
-cpu_thread.start()
+    async def _run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Error in CPU overload controller: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _running_containers(self):
+        return [vps['container_name'] for _, vps in iter_vps() if vps.get('status') == 'running' and vps.get('container_name')]
+
+    def measure(self):
+        """Per-container share of host CPU over the last check interval"""
+        self.consumers = container_metrics.ranked_cpu(self.interval)
+        return self.consumers
+
+    def offenders(self):
+        """Top consumers whose owners are not purge-protected"""
+        result = []
+        for name, share in self.consumers:
+            # Idle containers are not part of the problem
+            if share < 1:
+                break
+            user_id, _ = find_vps(name)
+            if user_id is not None and is_protected_owner(user_id):
+                continue
+            result.append(name)
+            if len(result) >= OVERLOAD_TOP_CONSUMERS:
+                break
+        return result
+
+    async def check(self):
+        self.measure()
+        samples = system_sampler.summary('cpu_usage', self.interval)
+        cpu_usage = samples['avg'] if samples else get_system_info()['cpu_usage']
+
+        # Hysteresis: escalate only after sustained load above CPU_THRESHOLD, relax only after sustained load below CPU_RECOVER_THRESHOLD
+        if cpu_usage > CPU_THRESHOLD:
+            self.hot_checks += 1
+            self.cool_checks = 0
+            if self.hot_checks >= OVERLOAD_SUSTAIN_CHECKS and self.level < len(OVERLOAD_LEVELS) - 1:
+                self.hot_checks = 0
+                self.level += 1
+                logger.warning(f"CPU usage ({cpu_usage:.1f}%) above threshold ({CPU_THRESHOLD}%), escalating to '{OVERLOAD_LEVELS[self.level]}'")
+                await self.escalate()
+        elif cpu_usage < CPU_RECOVER_THRESHOLD:
+            self.cool_checks += 1
+            self.hot_checks = 0
+            if self.cool_checks >= OVERLOAD_SUSTAIN_CHECKS and self.level > 0:
+                logger.info(f"CPU usage ({cpu_usage:.1f}%) back below {CPU_RECOVER_THRESHOLD}%, lifting overload measures")
+                await self.recover()
+        else:
+            self.hot_checks = self.cool_checks = 0
+
+    async def escalate(self):
+        if self.level == 1:
+            await self.throttle(self.offenders())
+        elif self.level == 2:
+            await self.stop(self.offenders())
+        else:
+            names = [name for name in self._running_containers() if not is_protected_owner(find_vps(name)[0])]
+            await self.stop(names)
+
+    async def throttle(self, names):
+        for name in names:
+            try:
+                await execute_lxc(f"lxc config set {name} limits.cpu.allowance {OVERLOAD_THROTTLE_ALLOWANCE}", priority=PRIORITY_BACKGROUND)
+                self.throttled.add(name)
+                logger.warning(f"Throttled {name} to {OVERLOAD_THROTTLE_ALLOWANCE} CPU due to host overload")
+            except Exception as e:
+                logger.error(f"Error throttling {name}: {e}")
+
+    async def stop(self, names):
+        async def stop_one(name):
+            try:
+                await execute_lxc(f"lxc stop {name} --force", priority=PRIORITY_BACKGROUND)
+                return name
+            except Exception as e:
+                logger.error(f"Error stopping {name}: {e}")
+                return None
+
+        results = await asyncio.gather(*(stop_one(name) for name in names))
+        stopped = {name for name in results if name}
+        for name in stopped:
+            status_cache.invalidate(name, 'stopped')
+            user_id, vps = find_vps(name)
+            if vps is not None:
+                apply_statuses({name: 'stopped'}, [(user_id, vps)])
+        self.stopped |= stopped
+        if stopped:
+            logger.warning(f"Stopped {len(stopped)} VPS due to high CPU usage: {', '.join(sorted(stopped))}")
+
+    async def recover(self):
+        for name in list(self.throttled):
+            try:
+                await execute_lxc(f"lxc config unset {name} limits.cpu.allowance", priority=PRIORITY_BACKGROUND)
+            except Exception as e:
+                logger.error(f"Error removing CPU throttle from {name}: {e}")
+            self.throttled.discard(name)
+        # Stopped containers stay stopped; their owners can start them again
+        self.stopped.clear()
+        self.level = 0
+        self.cool_checks = 0
+
+overload_controller = OverloadController()
 
 # Enhanced Help System with Pagination
 class HelpView(discord.ui.View):
@@ -389,11 +3697,16 @@ class HelpView(discord.ui.View):
             return self.get_system_info_embed()
     
     def get_user_commands_embed(self):
-        embed = create_embed("🔧 ZycronHosting VPS Management - Help (Page 1/3)", f"{BOT_NAME}\nUser Commands", 0x1a1a1a)
+        return static_embeds.get('help_user', self.build_user_commands_template)
+    
+    @staticmethod
+    def build_user_commands_template():
+        embed = EmbedTemplate("🔧 ZycronHosting VPS Management - Help (Page 1/3)", f"{BOT_NAME}\nUser Commands", 0x1a1a1a)
         
         commands_list = [
             "`.plans`\nView available VPS plans",
             "`.manage [user]`\nManage your VPS (admin: others')",
+            "`.stats [vps#]`\nView live and average resource usage",
             "`.buywc <plan>`\nBuy VPS with credits",
             "`.freeplans`\nView free plans (boost/invite)",
             "`.credits`\nCheck your credits balance",
@@ -408,8 +3721,11 @@ class HelpView(discord.ui.View):
     def get_admin_commands_embed(self):
         if not self.is_admin:
             return self.get_user_commands_embed()
-            
-        embed = create_embed("⚙️ Zycron VPS Management - Help (Page 2/3)", f"{BOT_NAME}\nAdmin Commands", 0x1a1a1a)
+        return static_embeds.get('help_admin', self.build_admin_commands_template)
+    
+    @staticmethod
+    def build_admin_commands_template():
+        embed = EmbedTemplate("⚙️ Zycron VPS Management - Help (Page 2/3)", f"{BOT_NAME}\nAdmin Commands", 0x1a1a1a)
         
         commands_list = [
             "`.deploy <user>`\nDeploy VPS for user",
@@ -419,9 +3735,10 @@ class HelpView(discord.ui.View):
             "`.addinvite <name> <invites> <ram> <cpu> <storage>`\nAdd invite plan",
             "`.removeplan <type> <name>`\nRemove plan",
             "`.create <user> <ram> <cpu> <storage>`\nCreate custom VPS",
-            "`.listall`\nList all VPS and users",
+            "`.list-all [sort=<key>] [filter]`\nBrowse all VPS and users",
             "`.suspendvps <user>`\nSuspend a VPS (interactive)",
-            "`.stopall [reason]`\nStop all VPS",
+            "`.stopall [--stateful] [reason]`\nStop all VPS",
+            "`.bulk <action> <filter>`\nStart/stop/suspend/upgrade matching VPS",
             "`.unsuspend <user> <vps#>`\nUnsuspend a VPS",
             "`.upgradevps <user> <vps#> <ram> <cpu>`\nUpgrade VPS",
             "`.deletevps <user>`\nDelete user's VPS (interactive)",
@@ -518,16 +3835,58 @@ async def on_ready():
         )
     )
     
+    # Start write-behind persistence
+    persistence.start()
+    
+    # Periodically write latency histograms for external scraping
+    perf.start()
+    
+    # Finish deployments a restart interrupted (only once; on_ready fires again on reconnects)
+    global deployments_resumed
+    if not deployments_resumed:
+        deployments_resumed = True
+        run_in_background(resume_deployments())
+    
+    # Start background host metrics sampling
+    system_sampler.start()
+    
+    # Start per-container metrics collection and CPU overload control
+    container_metrics.start()
+    overload_controller.start()
+    
     # Start auto status update
-    if AUTO_STATUS_UPDATE:
+    if AUTO_STATUS_UPDATE and not auto_status_update.is_running():
         auto_status_update.start()
         logger.info("Auto status update system started")
     
+    # Compile plans into LXD profiles so a deploy is a single launch
+    run_in_background(sync_plan_profiles_safely())
+    
+    # Cache launch images locally, then keep pre-booted containers ready for instant deploys
+    image_manager.start()
+    warm_pool.start()
+    
+    # Track status changes from LXD lifecycle events
+    if LIFECYCLE_EVENTS_ENABLED:
+        lifecycle_monitor.start()
+    
     logger.info("Bot is ready with enhanced features!")
 
+@bot.before_invoke
+async def start_command_timer(ctx):
+    system_stats['commands_executed'] += 1
+    ctx.perf_started = time.perf_counter()
+
+@bot.event
+async def on_command_completion(ctx):
+    perf.record('command', ctx.command.qualified_name, time.perf_counter() - ctx.perf_started)
+
 @bot.event
 async def on_command_error(ctx, error):
-    system_stats['commands_executed'] += 1
+    if ctx.command is not None:
+        # Failed checks and conversions never reach before_invoke; they count as instant errors
+        started = getattr(ctx, 'perf_started', None)
+        perf.record('command', ctx.command.qualified_name, time.perf_counter() - started if started else 0.0, error=True)
     
     if isinstance(error, commands.CommandNotFound):
         return
@@ -632,19 +3991,12 @@ class DeploymentView(discord.ui.View):
         """Show paid plan options"""
         self.clear_items()
         
-        paid_plans = [
-            {"name": "Starter", "price": 42, "ram": "4GB", "cpu": "1", "storage": "10GB"},
-            {"name": "Basic", "price": 96, "ram": "8GB", "cpu": "1", "storage": "10GB"},
-            {"name": "Standard", "price": 192, "ram": "12GB", "cpu": "2", "storage": "10GB"},
-            {"name": "Pro", "price": 220, "ram": "16GB", "cpu": "2", "storage": "10GB"}
-        ]
-        
         plan_options = []
-        for plan in paid_plans:
+        for name, plan in PAID_PLAN_SPECS.items():
             plan_options.append(discord.SelectOption(
-                label=f"{plan['name']} Plan",
-                description=f"{plan['ram']} RAM • {plan['cpu']} CPU • {plan['storage']} Storage • {plan['price']} credits",
-                value=plan['name']
+                label=f"{name} Plan",
+                description=f"{plan['ram']} RAM • {plan['cpu']} CPU • {plan['storage']} Storage • {PAID_PLAN_PRICES[name]['Intel']} credits",
+                value=name
             ))
         
         plan_select = discord.ui.Select(
@@ -668,20 +4020,13 @@ class DeploymentView(discord.ui.View):
         """Show free plan options"""
         self.clear_items()
         
-        free_plans = [
-            {"name": "Boost Starter", "type": "boost", "req": "1 boost", "ram": "2GB", "cpu": "1", "storage": "5GB"},
-            {"name": "Boost Basic", "type": "boost", "req": "2 boosts", "ram": "4GB", "cpu": "1", "storage": "10GB"},
-            {"name": "Invite Starter", "type": "invite", "req": "5 invites", "ram": "1GB", "cpu": "1", "storage": "5GB"},
-            {"name": "Invite Basic", "type": "invite", "req": "10 invites", "ram": "2GB", "cpu": "1", "storage": "8GB"}
-        ]
-        
         plan_options = []
-        for plan in free_plans:
-            emoji = "🚀" if plan['type'] == 'boost' else "👥"
+        for name, plan in FREE_PLAN_SPECS.items():
+            emoji = "🚀" if 'boosts' in plan else "👥"
             plan_options.append(discord.SelectOption(
-                label=f"{plan['name']}",
-                description=f"{plan['ram']} RAM • {plan['cpu']} CPU • {plan['storage']} Storage • {plan['req']}",
-                value=plan['name'],
+                label=name,
+                description=f"{plan['ram']} RAM • {plan['cpu']} CPU • {plan['storage']} Storage • {plan_requirement(plan)}",
+                value=name,
                 emoji=emoji
             ))
         
@@ -851,6 +4196,7 @@ class DeploymentView(discord.ui.View):
     async def deploy_vps(self, interaction):
         """Deploy the VPS with selected options"""
         await interaction.response.defer()
+        reporter = ProgressReporter(interaction.edit_original_response)
         
         try:
             # Get plan specifications
@@ -866,10 +4212,7 @@ class DeploymentView(discord.ui.View):
                 pass
             
             user_id = str(self.selected_user.id)
-            if user_id not in vps_data:
-                vps_data[user_id] = []
-            
-            vps_count = len(vps_data[user_id]) + 1
+            vps_count = len(vps_data.get(user_id, [])) + 1
             username = self.selected_user.name.replace(" ", "_").lower()
             container_name = f"vps-{username}-{vps_count}"
             
@@ -884,17 +4227,6 @@ class DeploymentView(discord.ui.View):
             
             # Deploy VPS
             ram_mb = int(plan_specs['ram'].replace('GB', '')) * 1024
-            
-            deploy_embed.set_field_at(1, name="🔄 Status", value=f"📦 **Installing {self.selected_os}...**", inline=False)
-            await interaction.edit_original_response(embed=deploy_embed)
-            
-            await execute_lxc(f"lxc launch {self.selected_os} {container_name} --config limits.memory={ram_mb}MB --config limits.cpu={plan_specs['cpu']} -s dir")
-            await execute_lxc(f"lxc config set {container_name} security.nesting true")
-            await execute_lxc(f"lxc config set {container_name} security.privileged true")
-            await execute_lxc(f"lxc config device add {container_name} fuse unix-char path=/dev/fuse")
-            await execute_lxc(f"lxc config set {container_name} linux.kernel_modules overlay,loop,nf_nat,ip_tables,ip6_tables,netlink_diag,br_netfilter")
-            
-            # Save to database
             vps_info = {
                 "container_name": container_name,
                 "plan": self.selected_plan,
@@ -902,62 +4234,53 @@ class DeploymentView(discord.ui.View):
                 "cpu": plan_specs['cpu'],
                 "storage": plan_specs['storage'],
                 "os": self.selected_os,
-                "status": "running",
-                "created_at": datetime.now().isoformat(),
-                "last_updated": datetime.now().isoformat(),
                 "deployed_by": self.admin_id,
                 "plan_type": self.selected_plan_type,
                 "shared_with": []
             }
-            vps_data[user_id].append(vps_info)
-            system_stats['total_vps_created'] += 1
-            save_data()
-            
-            # Success embed
-            success_embed = create_success_embed("✅ VPS Deployment Complete!", f"Successfully deployed {self.selected_plan} VPS for {self.selected_user.mention}")
-            success_embed.add_field(name="📊 VPS Details", 
-                value=f"**Container:** `{container_name}`\n**Plan:** {self.selected_plan}\n**OS:** {self.selected_os}\n**Resources:** {plan_specs['ram']} RAM • {plan_specs['cpu']} CPU • {plan_specs['storage']} Storage", 
-                inline=False)
-            success_embed.add_field(name="🎯 Next Steps", 
-                value=f"• User can access with `.manage`\n• VPS is running and ready to use\n• SSH access available immediately", 
-                inline=False)
             
-            await interaction.edit_original_response(embed=success_embed)
+            async def progress(pipeline, step):
+                if step == 'launch':
+                    deploy_embed.set_field_at(1, name="🔄 Status", value=f"📦 **Installing {self.selected_os}...**", inline=False)
+                    reporter.update(deploy_embed)
             
-            # Notify user
-            try:
-                dm_embed = create_success_embed("🎉 VPS Deployed!", f"Your {self.selected_plan} VPS has been deployed by an admin!")
-                dm_embed.add_field(name="📊 VPS Information", 
-                    value=f"**VPS ID:** #{vps_count}\n**Plan:** {self.selected_plan}\n**Container:** `{container_name}`\n**OS:** {self.selected_os}\n**Resources:** {plan_specs['ram']} RAM • {plan_specs['cpu']} CPU • {plan_specs['storage']} Storage", 
+            async def notify(pipeline):
+                container_name = pipeline.container_name
+                success_embed = create_success_embed("✅ VPS Deployment Complete!", f"Successfully deployed {self.selected_plan} VPS for {self.selected_user.mention}")
+                success_embed.add_field(name="📊 VPS Details", 
+                    value=f"**Container:** `{container_name}`\n**Plan:** {self.selected_plan}\n**OS:** {self.selected_os}\n**Resources:** {plan_specs['ram']} RAM • {plan_specs['cpu']} CPU • {plan_specs['storage']} Storage", 
                     inline=False)
-                dm_embed.add_field(name="🚀 Get Started", 
-                    value="• Type `.manage` to access your VPS\n• Use **SSH Access** button for terminal\n• VPS is ready to use immediately!", 
+                success_embed.add_field(name="🎯 Next Steps", 
+                    value=f"• User can access with `.manage`\n• VPS is running and ready to use\n• SSH access available immediately", 
                     inline=False)
-                await self.selected_user.send(embed=dm_embed)
-            except discord.Forbidden:
-                pass
+                
+                await reporter.finish(success_embed)
+                
+                # Notify user
+                try:
+                    dm_embed = create_success_embed("🎉 VPS Deployed!", f"Your {self.selected_plan} VPS has been deployed by an admin!")
+                    dm_embed.add_field(name="📊 VPS Information", 
+                        value=f"**VPS ID:** #{pipeline.vps_number()}\n**Plan:** {self.selected_plan}\n**Container:** `{container_name}`\n**OS:** {self.selected_os}\n**Resources:** {plan_specs['ram']} RAM • {plan_specs['cpu']} CPU • {plan_specs['storage']} Storage", 
+                        inline=False)
+                    dm_embed.add_field(name="🚀 Get Started", 
+                        value="• Type `.manage` to access your VPS\n• Use **SSH Access** button for terminal\n• VPS is ready to use immediately!", 
+                        inline=False)
+                    await self.selected_user.send(embed=dm_embed)
+                except discord.Forbidden:
+                    pass
+            
+            pipeline = DeploymentPipeline.create('deploy', user_id, vps_info, self.selected_os, ram_mb, features=True,
+                                                 guild_id=interaction.guild.id if interaction.guild else None,
+                                                 hooks={'progress': progress, 'notify': notify})
+            await pipeline.run()
             
         except Exception as e:
             error_embed = create_error_embed("❌ Deployment Failed", f"Failed to deploy VPS: {str(e)}")
-            await interaction.edit_original_response(embed=error_embed)
+            await reporter.finish(error_embed)
     
     def get_plan_specs(self, plan_name):
         """Get specifications for a plan"""
-        paid_plans = {
-            "Starter": {"ram": "4GB", "cpu": "1", "storage": "10GB"},
-            "Basic": {"ram": "8GB", "cpu": "1", "storage": "10GB"}, 
-            "Standard": {"ram": "12GB", "cpu": "2", "storage": "10GB"},
-            "Pro": {"ram": "16GB", "cpu": "2", "storage": "10GB"}
-        }
-        
-        free_plans = {
-            "Boost Starter": {"ram": "2GB", "cpu": "1", "storage": "5GB"},
-            "Boost Basic": {"ram": "4GB", "cpu": "1", "storage": "10GB"},
-            "Invite Starter": {"ram": "1GB", "cpu": "1", "storage": "5GB"},
-            "Invite Basic": {"ram": "2GB", "cpu": "1", "storage": "8GB"}
-        }
-        
-        return paid_plans.get(plan_name) or free_plans.get(plan_name)
+        return get_plan_specs(plan_name)
     
     async def go_back(self, interaction):
         """Go back to plan type selection"""
@@ -995,9 +4318,11 @@ async def deploy_command(ctx):
     embed = create_embed("🚀 VPS Deployment Center", "Choose your deployment method:", 0x1a1a1a)
     
     # System overview
-    total_users = len(vps_data)
-    total_vps = sum(len(vps_list) for vps_list in vps_data.values())
-    running_vps = sum(1 for vps_list in vps_data.values() for vps in vps_list if vps.get('status') == 'running')
+    try:
+        await status_cache.ensure()
+    except Exception as e:
+        logger.error(f"Error refreshing VPS status: {e}")
+    total_users, total_vps, running_vps = fleet_summary()
     
     embed.add_field(name="📊 System Overview", 
         value=f"**Total Users:** {total_users}\n**Total VPS:** {total_vps}\n**Running:** {running_vps}\n**Stopped:** {total_vps - running_vps}", 
@@ -1054,7 +4379,7 @@ class EnhancedManageView(discord.ui.View):
         owner_text = ""
         if self.is_admin and self.owner_id != self.user_id:
             try:
-                owner_user = bot.get_user(int(self.owner_id))
+                owner_user = user_directory.cached(self.owner_id)
                 owner_text = f"\n**Owner:** {owner_user.mention if owner_user else f'ID: {self.owner_id}'}"
             except:
                 owner_text = f"\n**Owner ID:** {self.owner_id}"
@@ -1120,7 +4445,7 @@ class EnhancedManageView(discord.ui.View):
         owner_text = ""
         if self.is_admin and self.owner_id != self.user_id:
             try:
-                owner_user = bot.get_user(int(self.owner_id))
+                owner_user = user_directory.cached(self.owner_id)
                 owner_text = f"\n**Owner:** {owner_user.mention if owner_user else f'ID: {self.owner_id}'}"
             except:
                 owner_text = f"\n**Owner ID:** {self.owner_id}"
@@ -1163,6 +4488,10 @@ class EnhancedManageView(discord.ui.View):
         
         embed.add_field(name="⚙️ Resources", value=resource_text, inline=True)
 
+        usage = container_metrics.latest(container_name)
+        if usage and status == 'running':
+            embed.add_field(name="📈 Live Usage", value=format_usage(vps, usage), inline=False)
+
         # Controls section
         controls_text = "Use the buttons below to manage this server"
         embed.add_field(name="🎮 Controls", value=controls_text, inline=False)
@@ -1178,18 +4507,18 @@ class EnhancedManageView(discord.ui.View):
                 style=discord.ButtonStyle.danger,
                 emoji="🔄"
             )
-            reinstall_button.callback = lambda inter: self.action_callback(inter, 'reinstall')
+            reinstall_button.callback = lambda inter: self.timed_action(inter, 'reinstall')
             self.add_item(reinstall_button)
 
         # Control buttons with unique emojis
         start_button = discord.ui.Button(label="Start", style=discord.ButtonStyle.success, emoji="▶️")
-        start_button.callback = lambda inter: self.action_callback(inter, 'start')
+        start_button.callback = lambda inter: self.timed_action(inter, 'start')
         
         stop_button = discord.ui.Button(label="Stop", style=discord.ButtonStyle.secondary, emoji="⏹️")
-        stop_button.callback = lambda inter: self.action_callback(inter, 'stop')
+        stop_button.callback = lambda inter: self.timed_action(inter, 'stop')
         
         ssh_button = discord.ui.Button(label="SSH Access", style=discord.ButtonStyle.primary, emoji="🔑")
-        ssh_button.callback = lambda inter: self.action_callback(inter, 'tmate')
+        ssh_button.callback = lambda inter: self.timed_action(inter, 'tmate')
 
         self.add_item(start_button)
         self.add_item(stop_button)
@@ -1206,6 +4535,11 @@ class EnhancedManageView(discord.ui.View):
         self.add_action_buttons()
         await interaction.response.edit_message(embed=new_embed, view=self)
 
+    async def timed_action(self, interaction: discord.Interaction, action: str):
+        with perf.timer('button', action) as outcome:
+            # The callback reports failures to the user itself and returns False instead of raising
+            outcome['error'] = await self.action_callback(interaction, action) is False
+
     async def action_callback(self, interaction: discord.Interaction, action: str):
         if str(interaction.user.id) != self.user_id and not self.is_admin:
             await interaction.response.send_message(embed=create_error_embed("Access Denied", "This is not your VPS!"), ephemeral=True)
@@ -1224,7 +4558,7 @@ class EnhancedManageView(discord.ui.View):
                 return
 
             confirm_embed = create_warning_embed("⚠️ Reinstall Warning",
-                f"**DANGER:** This will completely erase all data on VPS `{container_name}` and reinstall with Ubuntu 22.04.\n\n"
+                f"**DANGER:** This will completely erase all data on VPS `{container_name}` and restore it to its original deployed state.\n\n"
                 f"**This action cannot be undone!**\n\nDo you want to continue?")
 
             class ConfirmView(discord.ui.View):
@@ -1240,22 +4574,20 @@ class EnhancedManageView(discord.ui.View):
                 async def confirm(self, interaction: discord.Interaction, item: discord.ui.Button):
                     await interaction.response.defer(ephemeral=True)
                     try:
-                        await interaction.followup.send(embed=create_info_embed("🔄 Reinstalling", f"Destroying container `{self.container_name}`..."), ephemeral=True)
-                        await execute_lxc(f"lxc delete {self.container_name} --force")
-
-                        await interaction.followup.send(embed=create_info_embed("🚀 Creating", f"Deploying new container `{self.container_name}`..."), ephemeral=True)
-                        original_ram = self.vps["ram"]
-                        original_cpu = self.vps["cpu"]
-                        ram_mb = int(original_ram.replace("GB", "")) * 1024
-
-                        await execute_lxc(f"lxc launch ubuntu:22.04 {self.container_name} --config limits.memory={ram_mb}MB --config limits.cpu={original_cpu} -s dir")
+                        # Keep Start/Stop clicks from interleaving with the rebuild
+                        async with lxc_scheduler.exclusive(self.container_name):
+                            await interaction.followup.send(embed=create_info_embed("🔄 Reinstalling", f"Restoring `{self.container_name}` to its original state..."), ephemeral=True)
+                            method, elapsed = await reinstall_container(self.vps)
 
                         self.vps["status"] = "running"
+                        status_cache.invalidate(self.container_name, 'running')
                         self.vps["created_at"] = datetime.now().isoformat()
                         self.vps["last_updated"] = datetime.now().isoformat()
-                        save_data()
+                        save_data('vps', key=self.owner_id, op='reinstall')
                         
-                        await interaction.followup.send(embed=create_success_embed("✅ Reinstall Complete", f"VPS `{self.container_name}` has been successfully reinstalled with Ubuntu 22.04!"), ephemeral=True)
+                        how = "restored from its baseline snapshot" if method == 'restore' else "rebuilt from a fresh image"
+                        await interaction.followup.send(embed=create_success_embed("✅ Reinstall Complete", f"VPS `{self.container_name}` was {how} in {elapsed:.1f}s!"), ephemeral=True)
+                        logger.info(f"Reinstalled {self.container_name} via {method} in {elapsed:.1f}s")
 
                         if not self.parent_view.is_shared:
                             await interaction.message.edit(embed=self.parent_view.create_detailed_vps_embed(self.parent_view.selected_index), view=self.parent_view)
@@ -1272,10 +4604,11 @@ class EnhancedManageView(discord.ui.View):
         elif action == 'start':
             await interaction.response.defer(ephemeral=True)
             try:
-                await execute_lxc(f"lxc start {container_name}")
+                await execute_lxc(f"lxc start {container_name}", priority=PRIORITY_INTERACTIVE)
                 vps["status"] = "running"
+                status_cache.invalidate(container_name, 'running')
                 vps["last_updated"] = datetime.now().isoformat()
-                save_data()
+                save_data('vps', key=self.owner_id, op='status_change')
                 
                 # Green embed for successful start
                 start_embed = create_embed("✅ VPS Started Successfully", f"VPS `{container_name}` is now online!", 0x00ff88)
@@ -1284,14 +4617,16 @@ class EnhancedManageView(discord.ui.View):
                 await interaction.message.edit(embed=self.create_detailed_vps_embed(self.selected_index), view=self)
             except Exception as e:
                 await interaction.followup.send(embed=create_error_embed("❌ Start Failed", str(e)), ephemeral=True)
+                return False
 
         elif action == 'stop':
             await interaction.response.defer(ephemeral=True)
             try:
-                await execute_lxc(f"lxc stop {container_name}", timeout=120)
+                await execute_lxc(f"lxc stop {container_name}", timeout=120, priority=PRIORITY_INTERACTIVE)
                 vps["status"] = "stopped"
+                status_cache.invalidate(container_name, 'stopped')
                 vps["last_updated"] = datetime.now().isoformat()
-                save_data()
+                save_data('vps', key=self.owner_id, op='status_change')
                 
                 # Red embed for successful stop
                 stop_embed = create_embed("⏸️ VPS Stopped Successfully", f"VPS `{container_name}` is now offline!", 0xff3366)
@@ -1300,38 +4635,38 @@ class EnhancedManageView(discord.ui.View):
                 await interaction.message.edit(embed=self.create_detailed_vps_embed(self.selected_index), view=self)
             except Exception as e:
                 await interaction.followup.send(embed=create_error_embed("❌ Stop Failed", str(e)), ephemeral=True)
+                return False
 
         elif action == 'tmate':
             await interaction.response.send_message(embed=create_info_embed("🔑 SSH Access", "Generating SSH connection..."), ephemeral=True)
 
             try:
                 # Check if tmate exists
-                check_proc = await asyncio.create_subprocess_exec(
-                    "lxc", "exec", container_name, "--", "which", "tmate",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await check_proc.communicate()
+                try:
+                    await execute_lxc(f"lxc exec {container_name} -- which tmate", priority=PRIORITY_INTERACTIVE)
+                    tmate_installed = True
+                except Exception:
+                    tmate_installed = False
 
-                if check_proc.returncode != 0:
+                if not tmate_installed:
                     await interaction.followup.send(embed=create_info_embed("📦 Installing SSH", "Installing tmate for SSH access..."), ephemeral=True)
-                    await execute_lxc(f"lxc exec {container_name} -- sudo apt-get update -y")
-                    await execute_lxc(f"lxc exec {container_name} -- sudo apt-get install tmate -y")
+                    await execute_lxc(f"lxc exec {container_name} -- sudo apt-get update -y", priority=PRIORITY_INTERACTIVE)
+                    await execute_lxc(f"lxc exec {container_name} -- sudo apt-get install tmate -y", priority=PRIORITY_INTERACTIVE)
                     await interaction.followup.send(embed=create_success_embed("✅ Installation Complete", "SSH service installed successfully!"), ephemeral=True)
 
                 # Start tmate with unique session name
                 session_name = f"session-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                await execute_lxc(f"lxc exec {container_name} -- tmate -S /tmp/{session_name}.sock new-session -d")
+                await execute_lxc(f"lxc exec {container_name} -- tmate -S /tmp/{session_name}.sock new-session -d", priority=PRIORITY_INTERACTIVE)
                 await asyncio.sleep(3)
 
                 # Get SSH link
-                ssh_proc = await asyncio.create_subprocess_exec(
-                    "lxc", "exec", container_name, "--", "tmate", "-S", f"/tmp/{session_name}.sock", "display", "-p", "#{tmate_ssh}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await ssh_proc.communicate()
-                ssh_url = stdout.decode().strip() if stdout else None
+                display = shlex.join(["lxc", "exec", container_name, "--", "tmate", "-S", f"/tmp/{session_name}.sock", "display", "-p", "#{tmate_ssh}"])
+                error_msg = "Failed to generate SSH link"
+                try:
+                    result = await execute_lxc(display, priority=PRIORITY_INTERACTIVE)
+                    ssh_url = result if isinstance(result, str) else None
+                except Exception as e:
+                    ssh_url, error_msg = None, str(e)
 
                 if ssh_url:
                     try:
@@ -1344,18 +4679,17 @@ class EnhancedManageView(discord.ui.View):
                     except discord.Forbidden:
                         await interaction.followup.send(embed=create_error_embed("❌ DM Failed", "Please enable DMs to receive SSH credentials!"), ephemeral=True)
                 else:
-                    error_msg = stderr.decode().strip() if stderr else "Failed to generate SSH link"
                     await interaction.followup.send(embed=create_error_embed("❌ SSH Generation Failed", error_msg), ephemeral=True)
+                    return False
             except Exception as e:
                 await interaction.followup.send(embed=create_error_embed("❌ SSH Error", str(e)), ephemeral=True)
+                return False
 
 # Enhanced manage command
 @bot.command(name='manage')
 @maintenance_check()
 async def manage_vps(ctx, user: discord.Member = None):
     """Manage your VPS or another user's VPS (Admin only)"""
-    system_stats['commands_executed'] += 1
-    
     if user:
         # Only admins can manage other users' VPS
         if not (str(ctx.author.id) == str(MAIN_ADMIN_ID) or str(ctx.author.id) in admin_data.get("admins", [])):
@@ -1363,44 +4697,88 @@ async def manage_vps(ctx, user: discord.Member = None):
             return
         
         user_id = str(user.id)
-        vps_list = vps_data.get(user_id, [])
+        vps_list = get_user_vps(user_id)
         if not vps_list:
             await ctx.send(embed=create_error_embed("No VPS Found", f"{user.mention} doesn't have any VPS."))
             return
         
-        # Update VPS statuses before displaying
-        for vps in vps_list:
-            if vps.get('container_name'):
-                current_status = await get_vps_status(vps['container_name'])
-                if current_status != 'error':
-                    vps['status'] = current_status
-                    vps['last_updated'] = datetime.now().isoformat()
-        save_data()
+        # Serve statuses from the shared cache; stale entries refresh in the background
+        try:
+            await status_cache.ensure([(user_id, vps) for vps in vps_list])
+        except Exception as e:
+            logger.error(f"Error refreshing VPS status: {e}")
         
+        user_directory.remember(user)
         view = EnhancedManageView(str(ctx.author.id), vps_list, is_admin=True, owner_id=user_id)
         await ctx.send(embed=view.initial_embed, view=view)
     else:
         # User managing their own VPS
         user_id = str(ctx.author.id)
-        vps_list = vps_data.get(user_id, [])
+        vps_list = get_user_vps(user_id)
         if not vps_list:
             embed = create_embed("No VPS Found", "You don't have any VPS yet.", 0xff3366)
             embed.add_field(name="🚀 Get Started", value="• `.plans` - View available plans\n• `.freeplans` - Check free options\n• `.buywc <plan>` - Purchase VPS\n• `.buyc` - Buy credits", inline=False)
             await ctx.send(embed=embed)
             return
         
-        # Update VPS statuses before displaying
-        for vps in vps_list:
-            if vps.get('container_name'):
-                current_status = await get_vps_status(vps['container_name'])
-                if current_status != 'error':
-                    vps['status'] = current_status
-                    vps['last_updated'] = datetime.now().isoformat()
-        save_data()
+        # Serve statuses from the shared cache; stale entries refresh in the background
+        try:
+            await status_cache.ensure([(user_id, vps) for vps in vps_list])
+        except Exception as e:
+            logger.error(f"Error refreshing VPS status: {e}")
         
         view = EnhancedManageView(user_id, vps_list)
         await ctx.send(embed=view.initial_embed, view=view)
 
+# Resource usage command
+def format_usage(vps, usage):
+    """One block of CPU/RAM/IO text for a metrics dict"""
+    cores = float(re.sub(r'[^\d.]', '', str(vps.get('cpu', ''))) or 0)
+    cpu_text = f"{usage['cpu']:.2f} cores"
+    if cores:
+        cpu_text += f" ({usage['cpu'] * 100 / cores:.0f}%)"
+    memory_limit = parse_size_bytes(vps.get('ram'))
+    memory_text = format_bytes(usage['memory'])
+    if memory_limit:
+        memory_text += f" / {vps['ram']} ({usage['memory'] * 100 / memory_limit:.0f}%)"
+    return f"**CPU:** {cpu_text}\n**RAM:** {memory_text}\n**IO:** ⬇️ {format_bytes(usage['io_read'])}/s ⬆️ {format_bytes(usage['io_write'])}/s"
+
+@bot.command(name='stats')
+@maintenance_check()
+async def vps_stats(ctx, vps: str = None):
+    """Show live and average resource usage for your VPS"""
+    user_id = str(ctx.author.id)
+    is_admin_user = user_id == str(MAIN_ADMIN_ID) or user_id in admin_data.get("admins", [])
+
+    if vps is None:
+        records = [(user_id, record) for record in get_user_vps(user_id)]
+    elif vps.isdigit():
+        vps_list = get_user_vps(user_id)
+        index = int(vps) - 1
+        records = [(user_id, vps_list[index])] if 0 <= index < len(vps_list) else []
+    else:
+        owner_id, record = find_vps(vps)
+        records = [(owner_id, record)] if record is not None and (owner_id == user_id or is_admin_user) else []
+
+    if not records:
+        await ctx.send(embed=create_error_embed("No VPS Found", "Use `.stats` for all your VPS, `.stats <number>` or `.stats <container>`."))
+        return
+
+    embed = create_embed("📈 VPS Resource Usage", f"Sampled every {container_metrics.interval}s", 0x1a1a1a)
+    for owner_id, record in records[:10]:
+        container_name = record.get('container_name', 'Unknown')
+        current = container_metrics.latest(container_name)
+        if current is None:
+            embed.add_field(name=f"🖥️ {container_name}", value=f"No samples (status: `{record.get('status', 'unknown')}`)", inline=False)
+            continue
+        lines = [f"__Now__\n{format_usage(record, current)}"]
+        for label, seconds in (("1h avg", 3600), ("24h avg", 86400)):
+            averages = container_metrics.average(container_name, seconds)
+            if averages:
+                lines.append(f"__{label}__\n{format_usage(record, averages)}")
+        embed.add_field(name=f"🖥️ {container_name}", value="\n".join(lines), inline=False)
+    await ctx.send(embed=embed)
+
 # Purge protection commands
 @bot.command(name='dontpurgevps')
 @is_admin()
@@ -1421,7 +4799,7 @@ async def protect_vps(ctx, user: discord.Member):
     admin_data['purge_protection']['protected_users'] = protected_users
     admin_data['purge_protection']['protected_vps'] = admin_data['purge_protection'].get('protected_vps', 0) + len(vps_data.get(user_id, []))
     
-    save_data()
+    save_data('admin', key='purge_protection', op='purge_protect')
     
     embed = create_success_embed("🛡️ Purge Protection Enabled", f"Protection activated for {user.mention}")
     embed.add_field(name="Protected", value=f"• User: {user.mention}\n• VPS Count: {len(vps_data.get(user_id, []))}\n• Status: ✅ Active", inline=False)
@@ -1446,7 +4824,7 @@ async def remove_vps_protection(ctx, user: discord.Member):
     admin_data['purge_protection']['protected_users'] = protected_users
     admin_data['purge_protection']['protected_vps'] = admin_data['purge_protection'].get('protected_vps', 0) - len(vps_data.get(user_id, []))
     
-    save_data()
+    save_data('admin', key='purge_protection', op='purge_unprotect')
     
     embed = create_info_embed("🛡️ Purge Protection Removed", f"Protection removed from {user.mention}")
     embed.add_field(name="Unprotected", value=f"• User: {user.mention}\n• VPS Count: {len(vps_data.get(user_id, []))}\n• Status: ❌ Unprotected", inline=False)
@@ -1457,7 +4835,7 @@ async def remove_vps_protection(ctx, user: discord.Member):
 async def start_purge(ctx):
     """Start purge system (Main Admin only)"""
     admin_data['purge_protection']['enabled'] = True
-    save_data()
+    save_data('admin', key='purge_protection', op='purge_toggle')
     
     embed = create_success_embed("🛡️ Purge System Started", "Purge protection system is now active!")
     embed.add_field(name="Status", value="✅ Active\n🔄 Monitoring enabled\n⏰ Every 5 minutes", inline=False)
@@ -1468,7 +4846,7 @@ async def start_purge(ctx):
 async def stop_purge(ctx):
     """Stop purge system (Main Admin only)"""
     admin_data['purge_protection']['enabled'] = False
-    save_data()
+    save_data('admin', key='purge_protection', op='purge_toggle')
     
     embed = create_warning_embed("🛡️ Purge System Stopped", "Purge protection system is now inactive!")
     embed.add_field(name="Status", value="❌ Inactive\n⏸️ Monitoring disabled\n⚠️ VPS are unprotected", inline=False)
@@ -1495,6 +4873,21 @@ async def purge_info(ctx):
     await ctx.send(embed=embed)
 
 # Free Plans System
+def build_free_plans_template():
+    embed = EmbedTemplate("🆓 Free VPS Plans", "Get free VPS through server boosts or invites!", 0x1a1a1a)
+    
+    for kind, title in (('boosts', "🚀 Server Boost Plans"), ('invites', "👥 Invite Plans")):
+        text = ""
+        for name, plan in FREE_PLAN_SPECS.items():
+            if kind in plan:
+                text += f"**{name}** ({plan_requirement(plan)})\n"
+                text += f"• RAM: {plan['ram']} • CPU: {format_cores(plan['cpu'])} • Storage: {plan['storage']}\n\n"
+        embed.add_field(name=title, value=text, inline=False)
+    
+    embed.add_field(name="📋 How to Claim", value="• Boost this server to unlock boost plans\n• Invite friends to unlock invite plans\n• Contact admin to verify and claim\n• One free VPS per user maximum", inline=False)
+    
+    return embed
+
 @bot.command(name='freeplans')
 @maintenance_check()
 async def free_plans(ctx):
@@ -1503,39 +4896,7 @@ async def free_plans(ctx):
         await ctx.send(embed=create_error_embed("Free Plans Disabled", "Free plans are currently not available."))
         return
     
-    embed = create_embed("🆓 Free VPS Plans", "Get free VPS through server boosts or invites!", 0x1a1a1a)
-    
-    # Boost plans
-    boost_plans = [
-        {"name": "Boost Starter", "boosts": 1, "ram": "2GB", "cpu": "1", "storage": "5GB"},
-        {"name": "Boost Basic", "boosts": 2, "ram": "4GB", "cpu": "1", "storage": "10GB"},
-        {"name": "Boost Pro", "boosts": 3, "ram": "6GB", "cpu": "2", "storage": "15GB"}
-    ]
-    
-    boost_text = ""
-    for plan in boost_plans:
-        boost_text += f"**{plan['name']}** ({plan['boosts']} boost{'s' if plan['boosts'] > 1 else ''})\n"
-        boost_text += f"• RAM: {plan['ram']} • CPU: {plan['cpu']} Core{'s' if plan['cpu'] != '1' else ''} • Storage: {plan['storage']}\n\n"
-    
-    embed.add_field(name="🚀 Server Boost Plans", value=boost_text, inline=False)
-    
-    # Invite plans
-    invite_plans = [
-        {"name": "Invite Starter", "invites": 5, "ram": "1GB", "cpu": "1", "storage": "5GB"},
-        {"name": "Invite Basic", "invites": 10, "ram": "2GB", "cpu": "1", "storage": "8GB"},
-        {"name": "Invite Advanced", "invites": 20, "ram": "4GB", "cpu": "1", "storage": "12GB"}
-    ]
-    
-    invite_text = ""
-    for plan in invite_plans:
-        invite_text += f"**{plan['name']}** ({plan['invites']} invites)\n"
-        invite_text += f"• RAM: {plan['ram']} • CPU: {plan['cpu']} Core • Storage: {plan['storage']}\n\n"
-    
-    embed.add_field(name="👥 Invite Plans", value=invite_text, inline=False)
-    
-    embed.add_field(name="📋 How to Claim", value="• Boost this server to unlock boost plans\n• Invite friends to unlock invite plans\n• Contact admin to verify and claim\n• One free VPS per user maximum", inline=False)
-    
-    await ctx.send(embed=embed)
+    await ctx.send(embed=static_embeds.get('freeplans', build_free_plans_template))
 
 # Advanced Admin Commands
 @bot.command(name='addpaid')
@@ -1557,7 +4918,9 @@ async def add_paid_plan(ctx, name: str, price: int, ram: str, cpu: str, storage:
     }
     
     admin_data['custom_plans']['paid'].append(plan)
-    save_data()
+    save_data('admin', key='custom_plans', op='plan_add')
+    static_embeds.invalidate()
+    run_in_background(sync_plan_profiles_safely(PRIORITY_NORMAL))
     
     embed = create_success_embed("💎 Paid Plan Added", f"Successfully added paid plan: **{name}**")
     embed.add_field(name="Plan Details", value=f"**Price:** {price} credits\n**RAM:** {ram}\n**CPU:** {cpu} cores\n**Storage:** {storage}\n**Description:** {description}", inline=False)
@@ -1581,7 +4944,9 @@ async def add_boost_plan(ctx, name: str, boosts: int, ram: str, cpu: str, storag
     }
     
     admin_data['custom_plans']['boost'].append(plan)
-    save_data()
+    save_data('admin', key='custom_plans', op='plan_add')
+    static_embeds.invalidate()
+    run_in_background(sync_plan_profiles_safely(PRIORITY_NORMAL))
     
     embed = create_success_embed("🚀 Boost Plan Added", f"Successfully added boost plan: **{name}**")
     embed.add_field(name="Plan Details", value=f"**Boosts Required:** {boosts}\n**RAM:** {ram}\n**CPU:** {cpu} cores\n**Storage:** {storage}", inline=False)
@@ -1605,7 +4970,9 @@ async def add_invite_plan(ctx, name: str, invites: int, ram: str, cpu: str, stor
     }
     
     admin_data['custom_plans']['invite'].append(plan)
-    save_data()
+    save_data('admin', key='custom_plans', op='plan_add')
+    static_embeds.invalidate()
+    run_in_background(sync_plan_profiles_safely(PRIORITY_NORMAL))
     
     embed = create_success_embed("👥 Invite Plan Added", f"Successfully added invite plan: **{name}**")
     embed.add_field(name="Plan Details", value=f"**Invites Required:** {invites}\n**RAM:** {ram}\n**CPU:** {cpu} cores\n**Storage:** {storage}", inline=False)
@@ -1634,7 +5001,9 @@ async def remove_plan(ctx, plan_type: str, name: str):
         await ctx.send(embed=create_error_embed("Plan Not Found", f"No {plan_type} plan named '{name}' found."))
         return
     
-    save_data()
+    save_data('admin', key='custom_plans', op='plan_remove')
+    static_embeds.invalidate()
+    run_in_background(sync_plan_profiles_safely(PRIORITY_NORMAL))
     
     embed = create_success_embed("🗑️ Plan Removed", f"Successfully removed {plan_type} plan: **{name}**")
     await ctx.send(embed=embed)
@@ -1694,9 +5063,10 @@ async def suspend_vps(ctx, user: discord.Member):
         try:
             await execute_lxc(f"lxc stop {container_name} --force")
             vps['status'] = 'suspended'
+            status_cache.invalidate(container_name, 'stopped')
             vps['suspended_at'] = datetime.now().isoformat()
             vps['suspended_by'] = str(ctx.author.id)
-            save_data()
+            save_data('vps', key=user_id, op='suspend')
             
             # Yellow embed for suspension
             embed = create_embed("⏸️ VPS Suspended", f"VPS for {user.mention} has been suspended", 0xffaa00)
@@ -1735,9 +5105,10 @@ async def suspend_vps(ctx, user: discord.Member):
                 try:
                     await execute_lxc(f"lxc stop {container_name} --force")
                     vps['status'] = 'suspended'
+                    status_cache.invalidate(container_name, 'stopped')
                     vps['suspended_at'] = datetime.now().isoformat()
                     vps['suspended_by'] = str(ctx.author.id)
-                    save_data()
+                    save_data('vps', key=user_id, op='suspend')
                     
                     # Yellow embed for suspension
                     embed = create_embed("⏸️ VPS Suspended", f"VPS {selected_index + 1} for {user.mention} has been suspended", 0xffaa00)
@@ -1770,12 +5141,13 @@ async def unsuspend_vps(ctx, user: discord.Member, vps_number: int):
     try:
         await execute_lxc(f"lxc start {container_name}")
         vps['status'] = 'running'
+        status_cache.invalidate(container_name, 'running')
         if 'suspended_at' in vps:
             del vps['suspended_at']
         if 'suspended_by' in vps:
             del vps['suspended_by']
         vps['last_updated'] = datetime.now().isoformat()
-        save_data()
+        save_data('vps', key=user_id, op='unsuspend')
         
         # Green embed for successful unsuspension
         embed = create_embed("▶️ VPS Restored Successfully", f"VPS {vps_number} for {user.mention} is now online!", 0x00ff88)
@@ -1820,10 +5192,11 @@ async def upgrade_vps(ctx, user: discord.Member, vps_number: int, ram: int, cpu:
         vps['ram'] = f"{ram}GB"
         vps['cpu'] = str(cpu)
         vps['status'] = 'running'
+        status_cache.invalidate(container_name, 'running')
         vps['last_updated'] = datetime.now().isoformat()
         vps['upgraded_at'] = datetime.now().isoformat()
         vps['upgraded_by'] = str(ctx.author.id)
-        save_data()
+        save_data('vps', key=user_id, op='upgrade')
         
         # Green embed for successful upgrade
         embed = create_embed("⬆️ VPS Upgraded Successfully", f"VPS {vps_number} for {user.mention} has been upgraded and is online!", 0x00ff88)
@@ -1838,10 +5211,14 @@ async def upgrade_vps(ctx, user: discord.Member, vps_number: int, ram: int, cpu:
 @bot.command(name='stopall')
 @is_admin()
 async def stop_all_vps(ctx, *, reason: str = "Administrative maintenance"):
-    """Stop all VPS"""
+    """Stop all VPS (prefix the reason with --stateful to checkpoint memory for a fast resume)"""
+    stateful = reason.startswith('--stateful')
+    if stateful:
+        reason = reason[len('--stateful'):].strip() or "Administrative maintenance"
     confirm_embed = create_warning_embed("⚠️ Stop All VPS", 
         f"**WARNING:** This will stop ALL running VPS containers!\n\n"
-        f"**Reason:** {reason}\n\n"
+        f"**Reason:** {reason}\n"
+        f"**Mode:** {'Stateful (memory saved, fast resume)' if stateful else f'Clean shutdown ({STOPALL_GRACE_TIMEOUT}s grace, then force)'}\n\n"
         f"This action will affect all users. Continue?")
 
     class ConfirmView(discord.ui.View):
@@ -1857,23 +5234,49 @@ async def stop_all_vps(ctx, *, reason: str = "Administrative maintenance"):
             await interaction.response.defer()
             
             try:
-                await interaction.followup.send(embed=create_info_embed("🛑 Stopping All VPS", "Stopping all containers..."))
-                await execute_lxc("lxc stop --all --force")
-                
-                # Update all VPS status in database
-                stopped_count = 0
-                for user_id, vps_list in vps_data.items():
-                    for vps in vps_list:
-                        if vps.get('status') == 'running':
-                            vps['status'] = 'stopped'
-                            vps['last_updated'] = datetime.now().isoformat()
-                            vps['stopped_reason'] = reason
-                            vps['stopped_by'] = str(ctx.author.id)
-                            stopped_count += 1
-                
-                save_data()
+                # Stop what LXD reports as running, not what the records claim
+                statuses = await get_fleet_status(PRIORITY_INTERACTIVE)
+                records = {vps['container_name']: (user_id, vps) for user_id, vps in iter_vps() if vps.get('container_name')}
+                targets = [name for name, status in statuses.items() if status in ('running', 'frozen') and name in records]
+                progress_embed = create_info_embed("🛑 Stopping All VPS", f"Stopping {len(targets)} containers with {STOPALL_CONCURRENCY} workers...")
+                progress_embed.add_field(name="🔄 Progress", value=f"0/{len(targets)}", inline=False)
+                progress_msg = await interaction.followup.send(embed=progress_embed, wait=True)
+                reporter = ProgressReporter(progress_msg.edit, BULK_PROGRESS_INTERVAL)
+                started = time.monotonic()
+
+                async def progress(done, total):
+                    progress_embed.set_field_at(0, name="🔄 Progress", value=f"{done}/{total} • {time.monotonic() - started:.0f}s", inline=False)
+                    reporter.update(progress_embed)
+
+                async def stop(container_name):
+                    method = await stop_container_gracefully(container_name, stateful=stateful)
+                    user_id, vps = records[container_name]
+                    vps['status'] = 'stopped'
+                    vps['last_updated'] = datetime.now().isoformat()
+                    vps['stopped_reason'] = reason
+                    vps['stopped_by'] = str(ctx.author.id)
+                    if method == 'stateful':
+                        vps['stopped_stateful'] = True
+                    else:
+                        vps.pop('stopped_stateful', None)
+                    status_cache.invalidate(container_name, 'stopped')
+                    save_data('vps', key=user_id, op='status_change')
+                    return method
+
+                results = await run_bounded(targets, stop, STOPALL_CONCURRENCY, progress)
+                await reporter.finish(progress_embed)
+                methods = Counter(method for _, method, error in results if error is None)
+                failures = [(name, error) for name, _, error in results if error is not None]
+                # Reconcile any record the stops did not touch with what LXD now reports
+                await refresh_vps_statuses(priority=PRIORITY_INTERACTIVE)
                 
-                embed = create_success_embed("🛑 All VPS Stopped", f"Successfully stopped {stopped_count} running VPS")
+                stopped_count = sum(methods.values())
+                if failures:
+                    embed = create_warning_embed("🛑 Stop All Finished", f"Stopped {stopped_count} of {len(targets)} running VPS")
+                    embed.add_field(name="❌ Failed", value="\n".join(f"`{name}`: {str(error)[:60]}" for name, error in failures[:10]), inline=False)
+                else:
+                    embed = create_success_embed("🛑 All VPS Stopped", f"Successfully stopped {stopped_count} running VPS")
+                embed.add_field(name="📊 Method", value=f"**Stateful:** {methods['stateful']}\n**Clean:** {methods['graceful']}\n**Forced:** {methods['forced']}\n**Time:** {time.monotonic() - started:.1f}s", inline=True)
                 embed.add_field(name="Details", value=f"**Reason:** {reason}\n**Stopped by:** {ctx.author.mention}\n**Time:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", inline=False)
                 await interaction.followup.send(embed=embed)
                 
@@ -1894,7 +5297,7 @@ async def stop_all_vps(ctx, *, reason: str = "Administrative maintenance"):
 async def user_info(ctx, user: discord.Member):
     """Get user information"""
     user_id = str(user.id)
-    user_vps = vps_data.get(user_id, [])
+    user_vps = get_user_vps(user_id)
     user_credits = user_data.get(user_id, {}).get('credits', 0)
     
     # Calculate user stats
@@ -1958,17 +5361,12 @@ async def maintenance_mode(ctx, mode: str = None):
 @maintenance_check()
 async def create_vps(ctx, user: discord.Member, ram: int, cpu: int, disk: int):
     """Create a custom VPS for a user (Admin only)"""
-    system_stats['commands_executed'] += 1
-    
     if ram <= 0 or cpu <= 0 or disk <= 0:
         await ctx.send(embed=create_error_embed("Invalid Specs", "RAM, CPU, and Disk must be positive integers."))
         return
 
     user_id = str(user.id)
-    if user_id not in vps_data:
-        vps_data[user_id] = []
-
-    vps_count = len(vps_data[user_id]) + 1
+    vps_count = len(vps_data.get(user_id, [])) + 1
     username = user.name.replace(" ", "_").lower()
     container_name = f"vps-{username}-{vps_count}"
     ram_mb = ram * 1024
@@ -1979,42 +5377,30 @@ async def create_vps(ctx, user: discord.Member, ram: int, cpu: int, disk: int):
     creation_embed.add_field(name="📊 Specifications", value=f"**RAM:** {ram}GB\n**CPU:** {cpu} Cores\n**Storage:** {disk_gb}GB\n**Container:** `{container_name}`", inline=False)
     creation_embed.add_field(name="🔄 Status", value="⏳ **Initializing container...**", inline=False)
     creation_msg = await ctx.send(embed=creation_embed)
+    reporter = ProgressReporter(creation_msg.edit)
+
+    vps_info = {
+        "container_name": container_name,
+        "ram": f"{ram}GB",
+        "cpu": str(cpu),
+        "storage": f"{disk_gb}GB",
+        "shared_with": [],
+        "plan": "Custom",
+        "created_by": str(ctx.author.id)
+    }
 
-    try:
-        # Update creation status
-        creation_embed.set_field_at(1, name="🔄 Status", value="📦 **Launching Ubuntu 22.04...**", inline=False)
-        await creation_msg.edit(embed=creation_embed)
-        
-        await execute_lxc(f"lxc launch ubuntu:22.04 {container_name} --config limits.memory={ram_mb}MB --config limits.cpu={cpu} -s dir")
-
+    async def progress(pipeline, step):
         # Update creation status
-        creation_embed.set_field_at(1, name="🔄 Status", value="⚙️ **Configuring resources...**", inline=False)
-        await creation_msg.edit(embed=creation_embed)
-
-        vps_info = {
-            "container_name": container_name,
-            "ram": f"{ram}GB",
-            "cpu": str(cpu),
-            "storage": f"{disk_gb}GB",
-            "status": "running",
-            "created_at": datetime.now().isoformat(),
-            "last_updated": datetime.now().isoformat(),
-            "shared_with": [],
-            "plan": "Custom",
-            "created_by": str(ctx.author.id)
-        }
-        vps_data[user_id].append(vps_info)
-        system_stats['total_vps_created'] += 1
-        save_data()
+        if step == 'launch':
+            creation_embed.set_field_at(1, name="🔄 Status", value="📦 **Launching Ubuntu 22.04...**", inline=False)
+            reporter.update(creation_embed)
+        elif step == 'configure':
+            creation_embed.set_field_at(1, name="🔄 Status", value="⚙️ **Configuring resources...**", inline=False)
+            reporter.update(creation_embed)
 
-        # Get or create VPS role and assign to user
-        if ctx.guild:
-            vps_role = await get_or_create_vps_role(ctx.guild)
-            if vps_role:
-                try:
-                    await user.add_roles(vps_role, reason="VPS ownership granted")
-                except discord.Forbidden:
-                    logger.warning(f"Failed to assign VPS role to {user.name}")
+    async def notify(pipeline):
+        container_name = pipeline.container_name
+        vps_count = pipeline.vps_number()
 
         # Final success embed with enhanced formatting
         success_embed = create_success_embed("✅ Zycron - Zycron VPS Created Successfully", "")
@@ -2042,7 +5428,7 @@ async def create_vps(ctx, user: discord.Member, ram: int, cpu: int, disk: int):
         success_embed.set_footer(text=f"Zycron VPS Manager • Powered by Cloud Technology • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
                                 icon_url="https://i.ibb.co/XfknV1sc/IMG-20251018-110425.jpg")
 
-        await creation_msg.edit(embed=success_embed)
+        await reporter.finish(success_embed)
 
         # Send enhanced DM to user
         try:
@@ -2060,32 +5446,27 @@ async def create_vps(ctx, user: discord.Member, ram: int, cpu: int, disk: int):
         except discord.Forbidden:
             await ctx.send(embed=create_info_embed("📧 Notification", f"Couldn't send DM to {user.mention}. Please ensure DMs are enabled for setup instructions."))
 
+    try:
+        pipeline = DeploymentPipeline.create('create', user_id, vps_info, "ubuntu:22.04", ram_mb,
+                                             guild_id=ctx.guild.id if ctx.guild else None,
+                                             hooks={'progress': progress, 'notify': notify})
+        await pipeline.run()
+
     except Exception as e:
         error_embed = create_error_embed("❌ VPS Creation Failed", f"Error creating VPS: {str(e)}")
-        await creation_msg.edit(embed=error_embed)
+        await reporter.finish(error_embed)
 
 @bot.command(name='buywc')
 @maintenance_check()
 async def buy_with_credits(ctx, plan: str, processor: str = "Intel"):
     """Buy a VPS with credits"""
-    system_stats['commands_executed'] += 1
     user_id = str(ctx.author.id)
     
-    prices = {
-        "Starter": {"Intel": 42, "AMD": 83},
-        "Basic": {"Intel": 96, "AMD": 164},
-        "Standard": {"Intel": 192, "AMD": 320},
-        "Pro": {"Intel": 220, "AMD": 340}
-    }
-    plans = {
-        "Starter": {"ram": "4GB", "cpu": "1", "storage": "10GB"},
-        "Basic": {"ram": "8GB", "cpu": "1", "storage": "10GB"},
-        "Standard": {"ram": "12GB", "cpu": "2", "storage": "10GB"},
-        "Pro": {"ram": "16GB", "cpu": "2", "storage": "10GB"}
-    }
+    prices = PAID_PLAN_PRICES
+    plans = PAID_PLAN_SPECS
 
     if plan not in prices:
-        await ctx.send(embed=create_error_embed("Invalid Plan", "Available plans: Starter, Basic, Standard, Pro"))
+        await ctx.send(embed=create_error_embed("Invalid Plan", f"Available plans: {', '.join(PAID_PLAN_PRICES)}"))
         return
     if processor not in ["Intel", "AMD"]:
         await ctx.send(embed=create_error_embed("Invalid Processor", "Choose: Intel or AMD"))
@@ -2103,11 +5484,7 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel"):
         await ctx.send(embed=embed)
         return
 
-    user_data[user_id]["credits"] -= cost
-    if user_id not in vps_data:
-        vps_data[user_id] = []
-    
-    vps_count = len(vps_data[user_id]) + 1
+    vps_count = len(vps_data.get(user_id, [])) + 1
     username = ctx.author.name.replace(" ", "_").lower()
     container_name = f"vps-{username}-{vps_count}"
     ram_str = plans[plan]["ram"]
@@ -2116,42 +5493,31 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel"):
 
     # Enhanced purchase process
     purchase_embed = create_info_embed("💳 Processing Purchase", f"Purchasing {plan} VPS with {processor} processor...")
-    purchase_embed.add_field(name="💰 Transaction", value=f"**Plan:** {plan}\n**Processor:** {processor}\n**Cost:** {cost} credits\n**Remaining:** {user_data[user_id]['credits']} credits", inline=False)
+    purchase_embed.add_field(name="💰 Transaction", value=f"**Plan:** {plan}\n**Processor:** {processor}\n**Cost:** {cost} credits\n**Remaining:** {user_data[user_id]['credits'] - cost} credits", inline=False)
     purchase_msg = await ctx.send(embed=purchase_embed)
+    reporter = ProgressReporter(purchase_msg.edit)
+
+    vps_info = {
+        "plan": plan,
+        "container_name": container_name,
+        "ram": ram_str,
+        "cpu": cpu_str,
+        "storage": plans[plan]["storage"],
+        "processor": processor,
+        "shared_with": [],
+        "purchased_with": "credits",
+        "cost": cost
+    }
 
-    try:
+    async def progress(pipeline, step):
         # Update status
-        purchase_embed.set_field_at(0, name="🚀 Deployment", value="**Status:** Launching container...\n**Plan:** " + plan + f"\n**Processor:** {processor}\n**Container:** `{container_name}`", inline=False)
-        await purchase_msg.edit(embed=purchase_embed)
-        
-        await execute_lxc(f"lxc launch ubuntu:22.04 {container_name} --config limits.memory={ram_mb}MB --config limits.cpu={cpu_str} -s dir")
-        
-        vps_info = {
-            "plan": plan,
-            "container_name": container_name,
-            "ram": ram_str,
-            "cpu": cpu_str,
-            "storage": plans[plan]["storage"],
-            "status": "running",
-            "created_at": datetime.now().isoformat(),
-            "last_updated": datetime.now().isoformat(),
-            "processor": processor,
-            "shared_with": [],
-            "purchased_with": "credits",
-            "cost": cost
-        }
-        vps_data[user_id].append(vps_info)
-        system_stats['total_vps_created'] += 1
-        save_data()
+        if step == 'launch':
+            purchase_embed.set_field_at(0, name="🚀 Deployment", value="**Status:** Launching container...\n**Plan:** " + plan + f"\n**Processor:** {processor}\n**Container:** `{pipeline.container_name}`", inline=False)
+            reporter.update(purchase_embed)
 
-        # Get or create VPS role and assign to user
-        if ctx.guild:
-            vps_role = await get_or_create_vps_role(ctx.guild)
-            if vps_role:
-                try:
-                    await ctx.author.add_roles(vps_role, reason="VPS purchase completed")
-                except discord.Forbidden:
-                    logger.warning(f"Failed to assign VPS role to {ctx.author.name}")
+    async def notify(pipeline):
+        container_name = pipeline.container_name
+        vps_count = pipeline.vps_number()
 
         # Enhanced success message like in screenshot
         success_embed = create_success_embed("🎉 Zycron - Zycron VPS Created Successfully", "")
@@ -2169,7 +5535,7 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel"):
         success_embed.set_footer(text=f"Zycron VPS Manager • Powered by Cloud Technology • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 
                                 icon_url="https://i.ibb.co/XfknV1sc/IMG-20251018-110425.jpg")
 
-        await purchase_msg.edit(embed=success_embed)
+        await reporter.finish(success_embed)
 
         # Send enhanced DM
         try:
@@ -2184,19 +5550,20 @@ async def buy_with_credits(ctx, plan: str, processor: str = "Intel"):
         except discord.Forbidden:
             pass
 
+    pipeline = DeploymentPipeline.create('buywc', user_id, vps_info, "ubuntu:22.04", ram_mb, cost=cost,
+                                         guild_id=ctx.guild.id if ctx.guild else None,
+                                         hooks={'progress': progress, 'notify': notify})
+    try:
+        await pipeline.run()
+
     except Exception as e:
-        # Refund credits on failure
-        user_data[user_id]["credits"] += cost
-        save_data()
-        error_embed = create_error_embed("❌ Purchase Failed", f"Credits refunded. Error: {str(e)}")
-        await purchase_msg.edit(embed=error_embed)
+        # The pipeline rolls back (and refunds) whatever it had done
+        refunded = "Credits refunded" if 'debit' in pipeline.state['completed'] else "No credits were charged"
+        error_embed = create_error_embed("❌ Purchase Failed", f"{refunded}. Error: {str(e)}")
+        await reporter.finish(error_embed)
 
-@bot.command(name='buyc')
-@maintenance_check()
-async def buy_credits(ctx):
-    """Get payment information for credits"""
-    user = ctx.author
-    embed = create_embed("💳 Purchase Credits", "Choose your payment method below:", 0x1a1a1a)
+def build_buy_credits_template():
+    embed = EmbedTemplate("💳 Purchase Credits", "Choose your payment method below:", 0x1a1a1a)
 
     payment_fields = [
         {"name": "🇮🇳 UPI Payment", "value": f"```\n{os.getenv('UPI_ID', '9526303242@fam')}\n```", "inline": False},
@@ -2213,35 +5580,31 @@ async def buy_credits(ctx):
     for field in payment_fields:
         embed.add_field(**field)
 
+    return embed
+
+@bot.command(name='buyc')
+@maintenance_check()
+async def buy_credits(ctx):
+    """Get payment information for credits"""
+    user = ctx.author
+    embed = static_embeds.get('buyc', build_buy_credits_template)
+
     try:
         await user.send(embed=embed)
         await ctx.send(embed=create_success_embed("📧 Payment Info Sent", "Check your DMs for payment details!"))
     except discord.Forbidden:
         await ctx.send(embed=create_error_embed("❌ DM Failed", "Enable DMs to receive payment information!"))
 
-@bot.command(name='plans')
-@maintenance_check()
-async def show_plans(ctx):
-    """Show available VPS plans"""
-    embed = create_embed("💎 VPS Plans - Heaven node v1", "Choose your perfect VPS plan:", 0x1a1a1a)
-
-    plan_fields = [
-        {"name": "🚀 Starter Plan", 
-         "value": "**RAM:** 4 GB\n**CPU:** 1 Core\n**Storage:** 10 GB\n**OS:** Ubuntu 22.04\n━━━━━━━━━━━━━━\n💰 **Intel:** ₹42 | **AMD:** ₹83", 
-         "inline": False},
-        {"name": "⚡ Basic Plan", 
-         "value": "**RAM:** 8 GB\n**CPU:** 1 Core\n**Storage:** 10 GB\n**OS:** Ubuntu 22.04\n━━━━━━━━━━━━━━\n💰 **Intel:** ₹96 | **AMD:** ₹164", 
-         "inline": False},
-        {"name": "🔥 Standard Plan", 
-         "value": "**RAM:** 12 GB\n**CPU:** 2 Cores\n**Storage:** 10 GB\n**OS:** Ubuntu 22.04\n━━━━━━━━━━━━━━\n💰 **Intel:** ₹192 | **AMD:** ₹320", 
-         "inline": False},
-        {"name": "💎 Pro Plan", 
-         "value": "**RAM:** 16 GB\n**CPU:** 2 Cores\n**Storage:** 10 GB\n**OS:** Ubuntu 22.04\n━━━━━━━━━━━━━━\n💰 **Intel:** ₹220 | **AMD:** ₹340", 
-         "inline": False}
-    ]
+def build_plans_template():
+    embed = EmbedTemplate("💎 VPS Plans - Heaven node v1", "Choose your perfect VPS plan:", 0x1a1a1a,
+                          footer="All plans include • Full root access • SSH access • Docker support")
 
-    for field in plan_fields:
-        embed.add_field(**field)
+    for name, plan in PAID_PLAN_SPECS.items():
+        prices = PAID_PLAN_PRICES[name]
+        embed.add_field(name=f"{plan['emoji']} {name} Plan",
+            value=f"**RAM:** {format_plan_size(plan['ram'])}\n**CPU:** {format_cores(plan['cpu'])}\n**Storage:** {format_plan_size(plan['storage'])}\n"
+                  f"**OS:** Ubuntu 22.04\n━━━━━━━━━━━━━━\n💰 **Intel:** ₹{prices['Intel']} | **AMD:** ₹{prices['AMD']}",
+            inline=False)
 
     embed.add_field(name="🛒 How to Purchase", 
         value="1. **Get Credits:** `.buyc` for payment info\n2. **Buy VPS:** `.buywc <plan> <processor>`\n3. **Example:** `.buywc Starter Intel`", 
@@ -2249,50 +5612,84 @@ async def show_plans(ctx):
     embed.add_field(name="🆓 Free Options", 
         value="Check `.freeplans` for boost and invite plans!", 
         inline=False)
-    embed.set_footer(text="All plans include • Full root access • SSH access • Docker support")
-    await ctx.send(embed=embed)
+    return embed
+
+def benchmark_embeds(iterations=1000):
+    """Microseconds per embed for the direct, templated and cached build paths"""
+    def direct():
+        # What create_embed used to do: build every part, reading the clock twice
+        embed = discord.Embed(title="▌ Benchmark", description="Embed build timing", color=0x1a1a1a, timestamp=datetime.now())
+        embed.set_thumbnail(url=EMBED_ICON_URL)
+        embed.set_footer(text=f"{BOT_NAME} • Michael • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", icon_url=EMBED_ICON_URL)
+        return embed
+
+    cache = StaticEmbedCache()
+
+    def cold_page():
+        cache.invalidate()
+        return cache.get('plans', build_plans_template)
+
+    cases = {
+        'Direct build': direct,
+        'create_embed': lambda: create_embed("Benchmark", "Embed build timing"),
+        'Static page (rebuilt)': cold_page,
+        'Static page (cached)': lambda: static_embeds.get('plans', build_plans_template),
+    }
+    results = {}
+    for name, build in cases.items():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            build()
+        results[name] = (time.perf_counter() - started) * 1e6 / iterations
+    return results
+
+@bot.command(name='plans')
+@maintenance_check()
+async def show_plans(ctx):
+    """Show available VPS plans"""
+    await ctx.send(embed=static_embeds.get('plans', build_plans_template))
 
 # Add essential commands from original
 @bot.command(name='list-all')
 @is_admin()
 @maintenance_check()
-async def list_all_vps(ctx):
-    """List all VPS and user information (Admin only)"""
-    embed = create_embed("📊 All VPS Information", "Complete system overview", 0x1a1a1a)
+async def list_all_vps(ctx, *, options: str = ""):
+    """Browse every VPS with sorting and filters (Admin only)"""
+    sort, descending, filter_tokens = 'created_at', True, []
+    for token in options.split():
+        key, _, value = token.partition('=')
+        if key == 'sort' and value in FLEET_SORT_KEYS:
+            sort = value
+        elif key == 'order' and value in ('asc', 'desc'):
+            descending = value == 'desc'
+        else:
+            filter_tokens.append(token)
+    try:
+        filters = parse_bulk_filter(" ".join(filter_tokens))
+    except ValueError as e:
+        await ctx.send(embed=create_error_embed("Invalid Filter", f"{e}\nSort with `sort=<{'|'.join(FLEET_SORT_KEYS)}>` and `order=<asc|desc>`."))
+        return
     
-    total_vps = sum(len(vps_list) for vps_list in vps_data.values())
-    total_users = len(vps_data)
-    running_vps = sum(1 for vps_list in vps_data.values() for vps in vps_list if vps.get('status') == 'running')
+    try:
+        await status_cache.ensure()
+    except Exception as e:
+        logger.error(f"Error refreshing VPS status: {e}")
+    total_users, total_vps, running_vps = fleet_summary()
     stopped_vps = total_vps - running_vps
     
+    summary_fields = []
     system_info = get_system_info()
     if system_info:
-        embed.add_field(name="🖥️ System Resources", 
-            value=f"**CPU:** {system_info['cpu_usage']:.1f}%\n**Memory:** {system_info['memory_usage']:.1f}% ({system_info['memory_available']}GB free)\n**Disk:** {system_info['disk_usage']:.1f}% ({system_info['disk_free']}GB free)", 
-            inline=True)
-    
-    embed.add_field(name="📈 VPS Statistics", 
-        value=f"**Total Users:** {total_users}\n**Total VPS:** {total_vps}\n**Running:** {running_vps}\n**Stopped:** {stopped_vps}", 
-        inline=True)
-    
-    # Recent activity
-    vps_info = []
-    for user_id, vps_list in list(vps_data.items())[:5]:  # Show first 5 users
-        try:
-            user = await bot.fetch_user(int(user_id))
-            for i, vps in enumerate(vps_list):
-                status_emoji = "🟢" if vps.get('status') == 'running' else "🔴"
-                vps_info.append(f"{status_emoji} **{user.name}** - `{vps.get('container_name', 'Unknown')}` ({vps.get('plan', 'Custom')})")
-        except:
-            vps_info.append(f"❓ **Unknown User** ({user_id}) - {len(vps_list)} VPS")
-    
-    if vps_info:
-        embed.add_field(name="🖥️ Recent VPS", value="\n".join(vps_info), inline=False)
+        summary_fields.append({'name': "🖥️ System Resources", 
+            'value': f"**CPU:** {system_info['cpu_usage']:.1f}%\n**Memory:** {system_info['memory_usage']:.1f}% ({system_info['memory_available']}GB free)\n**Disk:** {system_info['disk_usage']:.1f}% ({system_info['disk_free']}GB free)", 
+            'inline': True})
     
-    if total_users > 5:
-        embed.add_field(name="➕ Additional", value=f"... and {total_users - 5} more users with VPS", inline=False)
+    summary_fields.append({'name': "📈 VPS Statistics", 
+        'value': f"**Total Users:** {total_users}\n**Total VPS:** {total_vps}\n**Running:** {running_vps}\n**Stopped:** {stopped_vps}", 
+        'inline': True})
     
-    await ctx.send(embed=embed)
+    view = FleetBrowserView(str(ctx.author.id), summary_fields, sort, descending, filters, " ".join(filter_tokens))
+    await ctx.send(embed=await view.render(), view=view)
 
 @bot.command(name='adminc')
 @is_admin()
@@ -2310,7 +5707,7 @@ async def admin_credits(ctx, user: discord.Member, amount: int):
     old_balance = user_data[user_id]["credits"]
     user_data[user_id]["credits"] += amount
     new_balance = user_data[user_id]["credits"]
-    save_data()
+    save_data('user', key=user_id, op='credit_add')
     
     embed = create_success_embed("💰 Credits Added", f"Successfully added credits to {user.mention}")
     embed.add_field(name="Transaction Details", 
@@ -2354,7 +5751,7 @@ async def admin_remove_credits(ctx, user: discord.Member, amount_or_all: str):
             await ctx.send(embed=create_error_embed("Invalid Amount", "Enter number or 'all'"))
             return
     
-    save_data()
+    save_data('user', key=user_id, op='credit_remove')
     
     embed = create_warning_embed("💸 Credits Removed", f"Credits removed from {user.mention}")
     embed.add_field(name="Transaction Details", 
@@ -2362,6 +5759,352 @@ async def admin_remove_credits(ctx, user: discord.Member, amount_or_all: str):
         inline=False)
     await ctx.send(embed=embed)
 
+@bot.command(name='sysinfo')
+@is_admin()
+async def system_info_command(ctx):
+    """Show host resource usage with min/avg/max over recent windows (Admin only)"""
+    latest = get_system_info()
+    if not latest:
+        await ctx.send(embed=create_error_embed("No Data", "System metrics are not available yet."))
+        return
+
+    embed = create_embed("🖥️ Host Resources", f"Sampled every {SYSTEM_SAMPLE_INTERVAL:g}s", 0x1a1a1a)
+    embed.add_field(name="📊 Current",
+        value=f"**CPU:** {latest['cpu_usage']:.1f}%\n**Memory:** {latest['memory_usage']:.1f}% ({latest['memory_available']}GB free)\n**Disk:** {latest['disk_usage']:.1f}% ({latest['disk_free']}GB free)\n**Load:** {latest['load_1']:.2f} / {latest['load_5']:.2f} / {latest['load_15']:.2f}",
+        inline=False)
+    labels = {'cpu_usage': 'CPU %', 'memory_usage': 'Memory %', 'disk_usage': 'Disk %', 'load_1': 'Load'}
+    for window_name, seconds in (("1 min", 60), ("5 min", 300), ("15 min", 900)):
+        lines = []
+        for metric in SYSTEM_METRICS:
+            stats = system_sampler.summary(metric, seconds)
+            if stats:
+                lines.append(f"**{labels[metric]}:** {stats['min']:.1f} / {stats['avg']:.1f} / {stats['max']:.1f}")
+        if lines:
+            embed.add_field(name=f"⏱️ {window_name} (min / avg / max)", value="\n".join(lines), inline=True)
+    await ctx.send(embed=embed)
+
+def parse_window(text):
+    """'90s' / '30m' / '6h' / '7d' -> seconds, None if unparseable"""
+    match = re.fullmatch(r'(\d+)([smhd])', (text or '').lower())
+    if not match:
+        return None
+    return int(match.group(1)) * {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[match.group(2)]
+
+def sparkline(values, width=40):
+    """Downsample values to `width` buckets and draw them with block characters"""
+    if not values:
+        return ""
+    blocks = "▁▂▃▄▅▆▇█"
+    chunk = max(1, -(-len(values) // width))
+    points = [sum(values[i:i + chunk]) / len(values[i:i + chunk]) for i in range(0, len(values), chunk)]
+    low, high = min(points), max(points)
+    span = (high - low) or 1
+    return "".join(blocks[int((point - low) / span * (len(blocks) - 1))] for point in points)
+
+@bot.command(name='history')
+@is_admin()
+async def metrics_history(ctx, target: str = "host", metric: str = None, window: str = "1h"):
+    """Show archived usage history for the host or a container (Admin only)"""
+    if target == "host":
+        series, metrics = HOST_SERIES, SYSTEM_METRICS
+    elif find_vps(target)[1] is not None:
+        series, metrics = target, CONTAINER_METRICS
+    else:
+        await ctx.send(embed=create_error_embed("Unknown Target", f"`{target}` is not `host` or a known container."))
+        return
+    metric = metric or metrics[0]
+    seconds = parse_window(window)
+    if metric not in metrics or seconds is None:
+        await ctx.send(embed=create_error_embed("Invalid Argument", f"Usage: `.history <host|container> [{'|'.join(metrics)}] [30m|6h|7d|90d]`"))
+        return
+    if not metrics_archive.has(series):
+        await ctx.send(embed=create_error_embed("No History", f"No archived metrics for `{target}`."))
+        return
+
+    points = metrics_archive.read(series, metrics, metric, seconds)
+    values = [value for _, value in points]
+    if not values:
+        await ctx.send(embed=create_warning_embed("No Data", f"No samples for `{target}` in the last {window}."))
+        return
+
+    if metric in ('memory', 'io_read', 'io_write'):
+        fmt = format_bytes
+    elif metric == 'cpu':
+        fmt = lambda value: f"{value:.2f} cores"
+    else:
+        fmt = lambda value: f"{value:.1f}"
+    step = metrics_archive.resolution(seconds)
+    embed = create_embed(f"📉 {target} — {metric}", f"Last {window} at {step}s resolution ({len(values)} points)", 0x1a1a1a)
+    embed.add_field(name="Trend", value=f"`{sparkline(values)}`", inline=False)
+    embed.add_field(name="Min", value=fmt(min(values)), inline=True)
+    embed.add_field(name="Avg", value=fmt(sum(values) / len(values)), inline=True)
+    embed.add_field(name="Max", value=fmt(max(values)), inline=True)
+    await ctx.send(embed=embed)
+
+@bot.command(name='overload')
+@is_admin()
+async def overload_status(ctx):
+    """Show the CPU overload controller state and top consumers (Admin only)"""
+    controller = overload_controller
+    color = 0x00ff88 if controller.level == 0 else 0xffaa00 if controller.level == 1 else 0xff3366
+    embed = create_embed("🔥 CPU Overload Control", f"**Level:** `{OVERLOAD_LEVELS[controller.level]}`", color)
+    embed.add_field(name="⚙️ Thresholds",
+        value=f"**Escalate above:** {CPU_THRESHOLD}%\n**Recover below:** {CPU_RECOVER_THRESHOLD}%\n**Sustain:** {OVERLOAD_SUSTAIN_CHECKS} checks × {controller.interval}s",
+        inline=True)
+    embed.add_field(name="🧯 Actions",
+        value=f"**Throttled:** {', '.join(sorted(controller.throttled)) or 'None'}\n**Stopped:** {', '.join(sorted(controller.stopped)) or 'None'}",
+        inline=True)
+    if controller.consumers:
+        lines = []
+        for name, share in controller.consumers[:5]:
+            user_id, _ = find_vps(name)
+            shield = " 🛡️" if user_id is not None and is_protected_owner(user_id) else ""
+            lines.append(f"`{name}` — {share:.1f}%{shield}")
+        embed.add_field(name="📈 Top Consumers", value="\n".join(lines), inline=False)
+    history = metrics_archive.summary(HOST_SERIES, SYSTEM_METRICS, 'cpu_usage', 86400)
+    if history:
+        embed.add_field(name="📉 Host CPU (24h)", value=f"**Min:** {history['min']:.1f}% **Avg:** {history['avg']:.1f}% **Max:** {history['max']:.1f}%", inline=False)
+    await ctx.send(embed=embed)
+
+@bot.command(name='warmpool')
+@is_admin()
+async def warm_pool_stats(ctx):
+    """Show warm pool readiness, hit rate and provisioning latency (Admin only)"""
+    if not warm_pool.targets:
+        await ctx.send(embed=create_warning_embed("Warm Pool Disabled", "Set `WARM_POOL_TARGETS` (e.g. `ubuntu:22.04@*=2`) to enable it."))
+        return
+
+    stats = warm_pool.stats
+    lookups = stats['hits'] + stats['misses']
+    hit_rate = f"{stats['hits'] * 100 / lookups:.0f}%" if lookups else "N/A"
+    embed = create_embed("🔥 Warm Pool", f"**Ready:** {warm_pool.ready_count()} • **Launching:** {len(warm_pool.filling)}", 0x1a1a1a)
+    targets_text = "\n".join(f"`{os_image}` @ `{plan}`: {len(warm_pool.ready[(os_image, plan)])}/{target}"
+                              for (os_image, plan), target in warm_pool.targets.items())
+    embed.add_field(name="🎯 Targets", value=targets_text, inline=False)
+    embed.add_field(name="📊 Claims", value=f"**Hits:** {stats['hits']}\n**Misses:** {stats['misses']}\n**Hit Rate:** {hit_rate}", inline=True)
+    embed.add_field(name="♻️ Refill", value=f"**Launched:** {stats['launched']}\n**Failed:** {stats['failed']}", inline=True)
+    latency_lines = []
+    for source, label in (('pool', 'From pool'), ('launch', 'Fresh launch')):
+        samples = warm_pool.latency[source]
+        if samples:
+            latency_lines.append(f"**{label}:** {sum(samples) / len(samples):.1f}s avg ({len(samples)})")
+    embed.add_field(name="⏱️ Deploy Latency", value="\n".join(latency_lines) or "No deploys yet", inline=False)
+    await ctx.send(embed=embed)
+
+@bot.command(name='deployments')
+@is_admin()
+async def deployment_stats(ctx):
+    """Show in-flight deployments and per-step timings (Admin only)"""
+    states = list(deployment_data.values())
+    running = [state for state in states if state['status'] == 'running']
+    outcomes = Counter(state['status'] for state in states)
+    embed = create_embed("🧩 Deployments", f"**Running:** {len(running)} • **Done:** {outcomes['done']} • **Rolled back:** {outcomes['rolled_back']}", 0x1a1a1a)
+    if running:
+        embed.add_field(name="⏳ In Progress", value="\n".join(
+            f"`{state['vps_info']['container_name']}` ({state['kind']}) • next: {next((step for step in DEPLOY_STEPS if step not in state['completed']), 'done')}"
+            for state in running[:10]), inline=False)
+    timing_lines = []
+    for step in DEPLOY_STEPS:
+        samples = sorted(state['timings'][step] for state in states if step in state['timings'])
+        if samples:
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            timing_lines.append(f"**{step}:** {sum(samples) / len(samples):.2f}s avg • {p95:.2f}s p95")
+    embed.add_field(name="⏱️ Step Timings", value="\n".join(timing_lines) or "No deployments yet", inline=False)
+    failures = [state for state in states if state['status'] == 'rolled_back' and state.get('error')][-5:]
+    if failures:
+        embed.add_field(name="↩️ Recent Rollbacks", value="\n".join(
+            f"`{state['vps_info']['container_name']}`: {state['error'][:80]}" for state in failures), inline=False)
+    await ctx.send(embed=embed)
+
+@bot.command(name='images')
+@is_admin()
+async def image_cache(ctx, action: str = None):
+    """Show the local image cache, or refresh it with `.images refresh` (Admin only)"""
+    if action == 'refresh':
+        await ctx.send(embed=create_info_embed("🔄 Refreshing Images", f"Pulling {len(image_manager.images)} images in the background..."))
+        run_in_background(image_manager.refresh_all())
+        return
+
+    if not image_manager.images:
+        await ctx.send(embed=create_warning_embed("No Managed Images", "Set `MANAGED_IMAGES` to cache launch images locally."))
+        return
+
+    embed = create_embed("💿 Image Cache", f"Refreshed every {IMAGE_REFRESH_INTERVAL // 3600}h off the deploy path", 0x1a1a1a)
+    for image, entry in image_manager.images.items():
+        if image in image_manager.refreshing:
+            state = "🔄 Refreshing"
+        elif entry['fingerprint']:
+            state = "✅ Cached"
+        else:
+            state = "❌ Not cached"
+        lines = [f"**State:** {state}", f"**Alias:** `{entry['alias']}`"]
+        if entry['fingerprint']:
+            lines.append(f"**Fingerprint:** `{entry['fingerprint'][:12]}`")
+            lines.append(f"**Size:** {format_bytes(entry['size'])}")
+        if entry['fetched_at']:
+            age = datetime.now() - entry['fetched_at']
+            lines.append(f"**Age:** {age.days}d {age.seconds // 3600}h")
+        if entry['error']:
+            lines.append(f"**Last Error:** {entry['error'][:100]}")
+        embed.add_field(name=f"🐧 {image}", value="\n".join(lines), inline=True)
+    if image_manager.next_refresh:
+        embed.set_footer(text=f"Next refresh: {image_manager.next_refresh.strftime('%Y-%m-%d %H:%M:%S')}")
+    await ctx.send(embed=embed)
+
+@bot.command(name='benchpools')
+@is_admin()
+async def bench_pools(ctx, *pools: str):
+    """Compare container creation time and disk usage across storage pools (Admin only)"""
+    await storage_pools.discover()
+    pools = list(pools) or sorted(storage_pools.pools)
+    unknown = [pool for pool in pools if pool not in storage_pools.pools]
+    if unknown or not pools:
+        await ctx.send(embed=create_error_embed("Unknown Pool", f"Available pools: {', '.join(sorted(storage_pools.pools)) or 'none'}"))
+        return
+
+    image = image_manager.resolve('ubuntu:22.04')
+    message = await ctx.send(embed=create_info_embed("⏱️ Benchmarking Storage Pools", f"Creating throwaway containers on {len(pools)} pool(s)..."))
+    embed = create_embed("💽 Storage Pool Benchmark", f"Image `{image[:24]}` • create without start, cold then warm", 0x1a1a1a)
+    for pool in pools:
+        driver = storage_pools.driver(pool)
+        try:
+            (cold_time, cold_used), (warm_time, warm_used) = await benchmark_pool(pool, image)
+            value = (f"**Cold:** {cold_time:.1f}s • {format_bytes(cold_used)}\n**Warm:** {warm_time:.1f}s • {format_bytes(warm_used)}\n"
+                     f"**Clone:** {'✅' if storage_pools.supports_clone(pool) else '❌'} • **Quota:** {'✅' if storage_pools.supports_quota(pool) else '❌'}")
+        except Exception as e:
+            value = f"❌ {str(e)[:200]}"
+        selected = " ⭐" if pool == storage_pools.pool() else ""
+        embed.add_field(name=f"{pool} ({driver}){selected}", value=value, inline=True)
+    embed.set_footer(text="Disk usage is the pool's used-space delta, so concurrent writes add noise")
+    await message.edit(embed=embed)
+
+@bot.command(name='bulk')
+@is_admin()
+async def bulk_operation(ctx, action: str = None, *, filter_text: str = ""):
+    """Run start/stop/restart/suspend/unsuspend/upgrade on every VPS matching a filter (Admin only)"""
+    if action not in BULK_ACTIONS:
+        embed = create_info_embed("📦 Bulk Operations", f"`.bulk <{'|'.join(BULK_ACTIONS)}> <filter>`")
+        embed.add_field(name="🔍 Filters", value="`plan=Starter,Basic` `plan_type=paid` `status=running` `owner=<id|@user>` `processor=AMD` `before=2025-01-01` `after=2025-01-01` or `all`", inline=False)
+        embed.add_field(name="⬆️ Upgrade", value="Add `ram=<GB> cpu=<cores>`, e.g. `.bulk upgrade plan=Starter ram=8 cpu=2`", inline=False)
+        await ctx.send(embed=embed)
+        return
+
+    args = {}
+    if action == 'upgrade':
+        tokens = []
+        for token in filter_text.split():
+            key, _, value = token.partition('=')
+            if key in ('ram', 'cpu') and value.isdigit() and int(value) > 0:
+                args[key] = int(value)
+            else:
+                tokens.append(token)
+        filter_text = " ".join(tokens)
+        if set(args) != {'ram', 'cpu'}:
+            await ctx.send(embed=create_error_embed("Missing Resources", "Upgrade needs positive `ram=<GB>` and `cpu=<cores>`."))
+            return
+    if not filter_text.strip():
+        await ctx.send(embed=create_error_embed("Missing Filter", "Give a filter, or `all` to target every VPS."))
+        return
+    try:
+        filters = parse_bulk_filter(filter_text)
+    except ValueError as e:
+        await ctx.send(embed=create_error_embed("Invalid Filter", str(e)))
+        return
+
+    targets = [(user_id, vps) for user_id, vps in iter_vps() if bulk_matches(user_id, vps, filters)]
+    if not targets:
+        await ctx.send(embed=create_warning_embed("No Matches", "No VPS matched that filter."))
+        return
+
+    confirm_embed = create_warning_embed(f"⚠️ Bulk {action.title()}",
+        f"**{len(targets)}** VPS from **{len({user_id for user_id, _ in targets})}** users match `{filter_text}`.\n\nContinue?")
+
+    class ConfirmView(discord.ui.View):
+        def __init__(self):
+            super().__init__(timeout=60)
+
+        @discord.ui.button(label="✅ Confirm", style=discord.ButtonStyle.danger)
+        async def confirm(self, interaction: discord.Interaction, item: discord.ui.Button):
+            if interaction.user.id != ctx.author.id:
+                await interaction.response.send_message("This is not your action!", ephemeral=True)
+                return
+
+            progress_embed = create_info_embed(f"📦 Bulk {action.title()}", f"Processing {len(targets)} VPS with {BULK_CONCURRENCY} workers...")
+            progress_embed.add_field(name="🔄 Progress", value=f"0/{len(targets)}", inline=False)
+            await interaction.response.edit_message(embed=progress_embed, view=None)
+            reporter = ProgressReporter(interaction.edit_original_response, BULK_PROGRESS_INTERVAL)
+            started = time.monotonic()
+
+            async def progress(done, total):
+                progress_embed.set_field_at(0, name="🔄 Progress", value=f"{done}/{total} • {time.monotonic() - started:.0f}s", inline=False)
+                reporter.update(progress_embed)
+
+            applied, skipped, failures = await run_bulk_action(action, targets, str(ctx.author.id), args, progress)
+            elapsed = time.monotonic() - started
+
+            if failures:
+                summary = create_warning_embed(f"📦 Bulk {action.title()} Finished", f"Completed with {len(failures)} failures in {elapsed:.1f}s")
+                summary.add_field(name="❌ Failures", value="\n".join(
+                    f"`{vps['container_name']}`: {str(error)[:60]}" for (_, vps), error in failures[:10]
+                ) + (f"\n...and {len(failures) - 10} more" if len(failures) > 10 else ""), inline=False)
+            else:
+                summary = create_success_embed(f"📦 Bulk {action.title()} Complete", f"Finished in {elapsed:.1f}s")
+            summary.add_field(name="📊 Results", value=f"**Applied:** {applied}\n**Skipped:** {skipped}\n**Failed:** {len(failures)}", inline=False)
+            await reporter.finish(summary)
+
+        @discord.ui.button(label="❌ Cancel", style=discord.ButtonStyle.secondary)
+        async def cancel(self, interaction: discord.Interaction, item: discord.ui.Button):
+            if interaction.user.id != ctx.author.id:
+                await interaction.response.send_message("This is not your action!", ephemeral=True)
+                return
+            await interaction.response.edit_message(embed=create_info_embed("Cancelled", "Bulk operation cancelled."), view=None)
+
+    await ctx.send(embed=confirm_embed, view=ConfirmView())
+
+@bot.command(name='benchembeds')
+@is_admin()
+async def bench_embeds(ctx, iterations: int = 1000):
+    """Time embed construction with and without templates (Admin only)"""
+    iterations = max(1, min(iterations, 5000))
+    # Thousands of builds would stall the gateway heartbeat if run on the event loop
+    results = await asyncio.to_thread(benchmark_embeds, iterations)
+    embed = create_embed("⏱️ Embed Build Benchmark", f"{iterations} builds per case • data version {static_embeds.version}", 0x1a1a1a)
+    embed.add_field(name="📊 Per Embed", value="\n".join(f"**{name}:** {micros:.1f}µs" for name, micros in results.items()), inline=False)
+    await ctx.send(embed=embed)
+
+@bot.command(name='perf')
+@is_admin()
+async def perf_stats(ctx, kind: str = None):
+    """Latency percentiles per command, manage button and lxc operation (Admin only)"""
+    kinds = [kind] if kind in PERF_KINDS else list(PERF_KINDS)
+    uptime = timedelta(seconds=round(time.time() - perf.started_at))
+    embed = create_embed("⏱️ Performance", f"**Commands executed:** {system_stats['commands_executed']} • **Since:** {uptime} ago", 0x1a1a1a)
+    for row_kind in kinds:
+        lines = [
+            f"`{name}` {summary['count']}× • p50 {summary['p50'] * 1000:.0f}ms • p95 {summary['p95'] * 1000:.0f}ms • p99 {summary['p99'] * 1000:.0f}ms"
+            + (f" • ❌ {summary['errors']}" if summary['errors'] else "")
+            for name, summary in perf.summaries(row_kind)[:10]
+        ]
+        embed.add_field(name=PERF_KINDS[row_kind], value="\n".join(lines) or "No samples yet", inline=False)
+    if PERF_SNAPSHOT_INTERVAL > 0:
+        embed.add_field(name="💾 Snapshot", value=f"`{PERF_SNAPSHOT_FILE}` every {PERF_SNAPSHOT_INTERVAL}s", inline=False)
+    await ctx.send(embed=embed)
+
+@bot.command(name='lxcqueue')
+@is_admin()
+async def lxc_queue_stats(ctx):
+    """Show LXC operation scheduler queue depth and wait times (Admin only)"""
+    stats = lxc_scheduler.snapshot()
+    embed = create_embed("🧮 LXC Operation Queue", "Scheduler state for container operations", 0x1a1a1a)
+    embed.add_field(name="📊 Overview",
+        value=f"**Running:** {stats['active']}/{stats['max_concurrency']}\n**Queued for a slot:** {stats['queued']}\n**Containers busy:** {stats['containers_busy']}",
+        inline=False)
+    for name, p in stats['priorities'].items():
+        embed.add_field(name=f"⏱️ {name.title()}",
+            value=f"**Submitted:** {p['submitted']:,}\n**Waiting:** {p['waiting']}\n**Avg Wait:** {p['avg_wait_ms']:.1f} ms\n**Max Wait:** {p['max_wait_ms']:.1f} ms",
+            inline=True)
+    await ctx.send(embed=embed)
+
 if __name__ == "__main__":
     if not DISCORD_TOKEN:
         logger.error("DISCORD_TOKEN not found in .env file!")
@@ -2371,5 +6114,8 @@ if __name__ == "__main__":
         bot.run(DISCORD_TOKEN)
     except Exception as e:
         logger.error(f"Failed to start bot: {e}")
+    finally:
+        # Make sure pending writes hit the disk before exiting
+        persistence.flush_sync()
 
 
@@ -0,0 +1,35 @@
+"""Import the bot module against a throwaway data directory and a stub lxc binary"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The module checks for lxc and loads its data files at import time
+WORKDIR = tempfile.mkdtemp(prefix='hycroe-tests-')
+BIN_DIR = os.path.join(WORKDIR, 'bin')
+os.makedirs(BIN_DIR)
+with open(os.path.join(BIN_DIR, 'lxc'), 'w') as f:
+    f.write("#!/bin/sh\nexit 1\n")
+os.chmod(os.path.join(BIN_DIR, 'lxc'), 0o755)
+os.environ['PATH'] = BIN_DIR + os.pathsep + os.environ.get('PATH', '')
+os.environ.update({
+    'STORAGE_BACKEND': 'json',
+    'LXD_API_ENABLED': 'false',
+    'USER_DATA_FILE': os.path.join(WORKDIR, 'user_data.json'),
+    'VPS_DATA_FILE': os.path.join(WORKDIR, 'vps_data.json'),
+    'ADMIN_DATA_FILE': os.path.join(WORKDIR, 'admin_data.json'),
+    'DEPLOY_DATA_FILE': os.path.join(WORKDIR, 'deployments.json'),
+    'JOURNAL_FILE': os.path.join(WORKDIR, 'data_journal.log'),
+})
+os.chdir(WORKDIR)
+sys.path.insert(0, ROOT)
+
+import hycroe_v4_enhanced  # noqa: E402
+
+
+@pytest.fixture
+def bot():
+    return hycroe_v4_enhanced
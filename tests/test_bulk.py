@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def fleet(bot, monkeypatch):
+    vps = {
+        '1': [{'container_name': 'vps-a', 'status': 'running', 'plan': 'Basic'},
+              {'container_name': 'vps-b', 'status': 'running', 'plan': 'Basic'}],
+        '2': [{'container_name': 'vps-c', 'status': 'stopped', 'plan': 'Pro'},
+              {'container_name': 'vps-d', 'status': 'suspended', 'plan': 'Pro'}],
+    }
+    # vps-b was stopped from inside the guest, so its record is stale
+    lxd = {'vps-a': 'Running', 'vps-b': 'Stopped', 'vps-c': 'Stopped', 'vps-d': 'Stopped'}
+    commands, saves = [], []
+
+    async def execute_lxc(command, timeout=120, priority=None):
+        commands.append(command)
+        if command.startswith('lxc query'):
+            return json.dumps([{'name': name, 'status': status} for name, status in lxd.items()])
+        return True
+
+    monkeypatch.setattr(bot, 'vps_data', vps)
+    monkeypatch.setattr(bot, 'execute_lxc', execute_lxc)
+    monkeypatch.setattr(bot, 'save_data', lambda *stores, key=None, op=None: saves.append((key, op)))
+    monkeypatch.setattr(bot, 'status_cache', bot.StatusCache())
+    return vps, lxd, commands, saves
+
+
+def run(bot, action, filter_text='all', args=None):
+    targets = [(user_id, vps) for user_id, vps in bot.iter_vps()
+               if bot.bulk_matches(user_id, vps, bot.parse_bulk_filter(filter_text))]
+    return asyncio.run(bot.run_bulk_action(action, targets, '99', args))
+
+
+def test_filters(bot):
+    filters = bot.parse_bulk_filter('plan=Basic,Pro owner=<@12> after=2025-01-01')
+    assert filters == {'plan': {'basic', 'pro'}, 'owner': {'12'}, 'after': '2025-01-01T00:00:00'}
+    assert bot.bulk_matches('12', {'plan': 'Pro', 'created_at': '2025-06-01T00:00:00'}, filters)
+    assert not bot.bulk_matches('12', {'plan': 'Pro', 'created_at': '2024-06-01T00:00:00'}, filters)
+    with pytest.raises(ValueError):
+        bot.parse_bulk_filter('colour=red')
+
+
+def test_suspend_skips_the_stop_for_containers_lxd_reports_stopped(bot, fleet):
+    vps, _, commands, saves = fleet
+
+    applied, skipped, failures = run(bot, 'suspend')
+
+    assert (applied, skipped, failures) == (3, 1, [])
+    assert [c for c in commands if not c.startswith('lxc query')] == ["lxc stop vps-a --force"]
+    # Already-stopped containers are still recorded as suspended
+    assert [v['status'] for v in vps['1'] + vps['2']] == ['suspended'] * 4
+    assert vps['1'][1]['suspended_by'] == '99'
+    assert sorted(key for key, _ in saves) == ['1', '1', '2']
+
+
+def test_stop_shuts_down_gracefully_what_lxd_reports_running(bot, fleet):
+    vps, _, commands, _ = fleet
+
+    applied, skipped, failures = run(bot, 'stop')
+
+    assert (applied, skipped, failures) == (1, 3, [])
+    assert commands[1:] == [f"lxc stop vps-a --timeout {bot.STOPALL_GRACE_TIMEOUT}"]
+    assert vps['1'][0]['status'] == 'stopped'
+
+
+def test_stop_escalates_to_force_when_the_guest_hangs(bot, fleet, monkeypatch):
+    vps, _, commands, _ = fleet
+    execute_lxc = bot.execute_lxc
+
+    async def hanging(command, timeout=120, priority=None):
+        if '--timeout' in command:
+            commands.append(command)
+            raise Exception('timed out')
+        return await execute_lxc(command, timeout, priority)
+
+    monkeypatch.setattr(bot, 'execute_lxc', hanging)
+    applied, _, failures = run(bot, 'stop', 'plan=Basic')
+
+    assert applied == 1 and failures == []
+    assert commands[-1] == "lxc stop vps-a --force"
+
+
+def test_failures_are_reported_per_target(bot, fleet, monkeypatch):
+    vps, lxd, commands, _ = fleet
+    lxd['vps-c'] = 'Running'
+    execute_lxc = bot.execute_lxc
+
+    async def failing(command, timeout=120, priority=None):
+        if 'vps-c' in command:
+            raise Exception('boom')
+        return await execute_lxc(command, timeout, priority)
+
+    monkeypatch.setattr(bot, 'execute_lxc', failing)
+    applied, skipped, failures = run(bot, 'suspend', 'plan=Pro')
+
+    assert (applied, skipped) == (0, 1)
+    assert [(target[1]['container_name'], str(error)) for target, error in failures] == [('vps-c', 'boom')]
+    assert vps['2'][0]['status'] == 'stopped'
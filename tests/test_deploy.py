@@ -0,0 +1,118 @@
+import asyncio
+import types
+
+import pytest
+
+
+@pytest.fixture
+def host(bot, monkeypatch):
+    state = types.SimpleNamespace(instances={}, commands=[], provisioned=[], dms=[], flushes=0)
+
+    async def lxd_query(method, path, body=None, timeout=120, priority=None):
+        if path == '/1.0/instances':
+            return [f"/1.0/instances/{name}" for name in state.instances]
+        name = path.split('/')[3]
+        if path.endswith('/state'):
+            return {'status': state.instances[name].get('status', 'Running')}
+        return state.instances.get(name)
+
+    async def execute_lxc(command, timeout=120, priority=None):
+        state.commands.append(command)
+        if command.startswith('lxc delete'):
+            state.instances.pop(command.split()[2], None)
+        return True
+
+    async def provision_container(name, os_image, plan, ram_mb, cpu, storage=None, features=False, priority=None):
+        state.provisioned.append(name)
+        state.instances[name] = {'expanded_config': {'limits.memory': f"{ram_mb}MB", 'limits.cpu': str(cpu)}}
+        return 'image'
+
+    async def flush():
+        state.flushes += 1
+
+    async def resolve(user_id):
+        return types.SimpleNamespace(send=lambda embed: state.dms.append(user_id) or asyncio.sleep(0))
+
+    monkeypatch.setattr(bot, 'deployment_data', {})
+    monkeypatch.setattr(bot, 'vps_data', {})
+    monkeypatch.setattr(bot, 'user_data', {'1': {'credits': 10}})
+    monkeypatch.setattr(bot, 'system_stats', {'total_vps_created': 0})
+    monkeypatch.setattr(bot, 'save_data', lambda *stores, key=None, op=None: None)
+    monkeypatch.setattr(bot, 'persistence', types.SimpleNamespace(flush=flush))
+    monkeypatch.setattr(bot, 'status_cache', bot.StatusCache())
+    monkeypatch.setattr(bot, 'lxd_query', lxd_query)
+    monkeypatch.setattr(bot, 'execute_lxc', execute_lxc)
+    monkeypatch.setattr(bot, 'provision_container', provision_container)
+    monkeypatch.setattr(bot, 'user_directory', types.SimpleNamespace(resolve=resolve))
+    return state
+
+
+def interrupted(bot, completed, cost=4, **extra):
+    """A deployment state as a restart would find it on disk"""
+    pipeline = bot.DeploymentPipeline.create('deploy', '1', {'container_name': 'vps-1-1', 'cpu': '2', 'plan': 'Basic'},
+                                             'ubuntu:22.04', 2048, cost=cost)
+    pipeline.state['completed'] = list(completed)
+    pipeline.state.update(extra)
+    return pipeline.state
+
+
+def test_resume_keeps_a_launch_that_finished_before_the_restart(bot, host):
+    state = interrupted(bot, ['reserve', 'debit'], launch_started=True)
+    host.instances['vps-1-1'] = {'expanded_config': {'limits.memory': '2048MB', 'limits.cpu': '2'}, 'status': 'Stopped'}
+    bot.user_data['1']['credits'] = 6
+
+    asyncio.run(bot.resume_deployments())
+
+    assert state['status'] == 'done' and state['completed'] == list(bot.DEPLOY_STEPS)
+    assert host.provisioned == []
+    # The launch was interrupted before the start, so configure brings it up
+    assert host.commands == ["lxc start vps-1-1"]
+    assert [vps['container_name'] for vps in bot.vps_data['1']] == ['vps-1-1']
+    # Completed steps are not repeated: the user is charged once
+    assert bot.user_data['1']['credits'] == 6
+    assert host.dms == ['1']
+
+
+def test_resume_relaunches_a_half_built_container(bot, host):
+    state = interrupted(bot, ['reserve', 'debit'], launch_started=True)
+    host.instances['vps-1-1'] = {'expanded_config': {'limits.memory': '512MB'}, 'config': {}}
+
+    asyncio.run(bot.resume_deployments())
+
+    assert state['status'] == 'done'
+    assert host.commands[0] == "lxc delete vps-1-1 --force"
+    assert host.provisioned == ['vps-1-1']
+
+
+def test_failure_before_record_rolls_back_and_refunds(bot, host, monkeypatch):
+    state = interrupted(bot, ['reserve'])
+
+    async def provision_container(*args, **kwargs):
+        host.instances['vps-1-1'] = {}
+        raise Exception('image not found')
+
+    monkeypatch.setattr(bot, 'provision_container', provision_container)
+    asyncio.run(bot.resume_deployments())
+
+    assert state['status'] == 'rolled_back'
+    assert state['error'] == 'launch: image not found'
+    assert 'vps-1-1' not in host.instances
+    assert bot.user_data['1']['credits'] == 10
+    assert bot.vps_data == {}
+
+
+def test_every_step_is_checkpointed(bot, host):
+    interrupted(bot, [], cost=0)
+    asyncio.run(bot.resume_deployments())
+    # One per step, one before provisioning, and one for the final state
+    assert host.flushes == len(bot.DEPLOY_STEPS) + 2
+
+
+def test_finished_history_is_capped(bot, host, monkeypatch):
+    monkeypatch.setattr(bot, 'DEPLOY_HISTORY', 2)
+    pipelines = [bot.DeploymentPipeline(interrupted(bot, [])) for _ in range(3)]
+    for i, pipeline in enumerate(pipelines):
+        pipeline.state['vps_info']['container_name'] = f"vps-1-{i}"
+        pruned = pipeline.finish('done')
+    assert pruned == [pipelines[0].state['id']]
+    assert set(bot.deployment_data) == {p.state['id'] for p in pipelines[1:]}
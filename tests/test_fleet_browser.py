@@ -0,0 +1,87 @@
+import asyncio
+import types
+
+import pytest
+
+
+@pytest.fixture
+def fleet(bot, monkeypatch):
+    vps = {
+        str(owner): [{'container_name': f"vps-{owner}-{i}", 'status': 'running' if i % 2 else 'stopped',
+                      'plan': 'Pro' if owner % 3 == 0 else 'Basic', 'ram': f"{i + 1}GB", 'cpu': '1',
+                      'created_at': f"2026-01-{owner:02d}T00:00:{i:02d}"} for i in range(3)]
+        for owner in range(1, 9)
+    }
+
+    async def resolve_many(user_ids):
+        return {user_id: types.SimpleNamespace(name=f"user{user_id}") for user_id in user_ids}
+
+    monkeypatch.setattr(bot, 'vps_data', vps)
+    monkeypatch.setattr(bot, 'fleet_index', bot.FleetIndex())
+    monkeypatch.setattr(bot, 'user_directory', types.SimpleNamespace(resolve_many=resolve_many))
+    monkeypatch.setattr(bot, 'FLEET_PAGE_SIZE', 10)
+    return vps
+
+
+def names(embed):
+    listing = next(field for field in embed.fields if field.name.startswith('🖥️'))
+    return [line.split('`')[1] for line in listing.value.splitlines()]
+
+
+def browse(bot, *pages, **options):
+    """Render the given pages of one view; returns the view and the embeds"""
+    async def scenario():
+        view = bot.FleetBrowserView('99', [], **options)
+        embeds = []
+        for page in pages:
+            view.page = page
+            embeds.append(await view.render())
+        return view, embeds
+    return asyncio.run(scenario())
+
+
+def test_pages_cover_the_fleet_newest_first(bot, fleet):
+    view, embeds = browse(bot, 0, 1, 2, 7)
+    pages = [names(embed) for embed in embeds]
+
+    assert pages[0][:4] == ['vps-8-2', 'vps-8-1', 'vps-8-0', 'vps-7-2']
+    assert [len(page) for page in pages[:3]] == [10, 10, 4]
+    assert sorted(sum(pages[:3], [])) == sorted(v['container_name'] for records in fleet.values() for v in records)
+    # Past the end clamps to the last page
+    assert view.page == 2 and pages[3] == pages[2]
+    assert embeds[2].fields[0].name == "🖥️ VPS 21-24 of 24"
+
+
+def test_sort_keys_and_ascending_order(bot, fleet):
+    _, (embed,) = browse(bot, 0, sort='resources', descending=False)
+    assert [name.rsplit('-', 1)[1] for name in names(embed)] == ['0'] * 8 + ['1'] * 2
+
+    _, (embed,) = browse(bot, 0, sort='owner', descending=False)
+    assert names(embed)[:3] == ['vps-1-0', 'vps-1-1', 'vps-1-2']
+
+
+def test_filters_are_applied_before_paging(bot, fleet):
+    filters = bot.parse_bulk_filter('plan=Pro status=running')
+    _, (embed,) = browse(bot, 0, filters=filters, filter_text='plan=Pro status=running')
+    assert names(embed) == ['vps-6-1', 'vps-3-1']
+    assert embed.fields[0].name == "🖥️ VPS 1-2 of 2"
+
+
+def test_index_only_reinserts_changed_owners(bot, fleet):
+    index = bot.fleet_index
+    assert len(index.entries('created_at')) == 24
+    version = index.version
+
+    fleet['4'].pop()
+    fleet['4'][0]['status'] = 'running'
+    fleet['9'] = [{'container_name': 'vps-9-0', 'status': 'running', 'created_at': '2026-02-01T00:00:00'}]
+    index.mark_dirty(['4', '9'])
+
+    ordered = index.entries('status')
+    assert index.version == version + 1
+    assert len(ordered) == 24
+    assert ordered == sorted(ordered)
+    assert [index.resolve(entry)[1]['container_name'] for entry in index.entries('created_at')][-1] == 'vps-9-0'
+    # Nothing dirty, nothing to do
+    index.entries('plan')
+    assert index.version == version + 1
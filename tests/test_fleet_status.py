@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def fleet(bot, monkeypatch):
+    vps = {
+        '1': [{'container_name': 'vps-a', 'status': 'stopped'}, {'container_name': 'vps-b', 'status': 'running'}],
+        '2': [{'container_name': 'vps-c', 'status': 'suspended'}],
+        '3': [{'container_name': 'vps-gone', 'status': 'running'}],
+    }
+    instances = [{'name': 'vps-a', 'status': 'Running'}, {'name': 'vps-b', 'status': 'Running'},
+                 {'name': 'vps-c', 'status': 'Stopped'}, {'name': 'other', 'status': 'Error'}]
+    calls, saves = [], []
+
+    async def execute_lxc(command, timeout=120, priority=None):
+        calls.append(command)
+        return json.dumps(instances)
+
+    monkeypatch.setattr(bot, 'vps_data', vps)
+    monkeypatch.setattr(bot, 'execute_lxc', execute_lxc)
+    monkeypatch.setattr(bot, 'save_data', lambda *stores, key=None, op=None: saves.append((stores, set(key), op)))
+    monkeypatch.setattr(bot, 'status_cache', bot.StatusCache(ttl=30))
+    monkeypatch.setattr(bot.metrics_archive, 'prune', lambda names: None)
+    return vps, instances, calls, saves
+
+
+def test_whole_fleet_is_refreshed_with_one_query(bot, fleet):
+    vps, _, calls, saves = fleet
+
+    updated = asyncio.run(bot.refresh_vps_statuses())
+
+    assert calls == ["lxc query /1.0/instances?recursion=1"]
+    assert updated == {'1'}
+    assert vps['1'][0]['status'] == 'running' and 'last_updated' in vps['1'][0]
+    # Suspended stays suspended while stopped, and containers LXD doesn't list are left alone
+    assert vps['2'][0]['status'] == 'suspended'
+    assert vps['3'][0]['status'] == 'running'
+    assert saves == [(('vps',), {'1'}, 'status_change')]
+
+
+def test_unknown_lxd_states_are_normalized(bot, fleet):
+    _, instances, _, _ = fleet
+
+    statuses = asyncio.run(bot.get_fleet_status())
+
+    assert statuses == {'vps-a': 'running', 'vps-b': 'running', 'vps-c': 'stopped', 'other': 'unknown'}
+
+
+def test_refresh_can_be_limited_to_some_records(bot, fleet):
+    vps, _, calls, _ = fleet
+
+    asyncio.run(bot.refresh_vps_statuses(list(bot.iter_vps(['2', '3']))))
+
+    assert len(calls) == 1
+    assert vps['1'][0]['status'] == 'stopped'
@@ -0,0 +1,76 @@
+import json
+
+
+def make_backend(bot, tmp_path):
+    paths = {name: str(tmp_path / f"{name}.json") for name in ('user', 'vps', 'admin', 'deploy')}
+    return bot.JsonBackend(paths, journal_path=str(tmp_path / 'journal.log'))
+
+
+def empty_stores():
+    return {'user': {}, 'vps': {}, 'admin': {}, 'deploy': {}}
+
+
+def test_keyed_mutations_replay_on_top_of_the_snapshot(bot, tmp_path):
+    backend = make_backend(bot, tmp_path)
+    users = {'1': {'credits': 10}, '2': {'credits': 20}}
+    admin = {'purge_protection': {'enabled': True}, 'custom_plans': {'paid': []}}
+    backend.write({'user': backend.serialize('user', users, {'1': 'credit_add', '2': 'credit_add'})})
+
+    users['1']['credits'] = 15
+    del users['2']
+    admin['custom_plans']['paid'].append({'name': 'Mini'})
+    backend.write({
+        'user': backend.serialize('user', users, {'1': 'credit_debit', '2': 'credit_remove'}),
+        'admin': backend.serialize('admin', admin, ['custom_plans']),
+    })
+
+    records = [json.loads(line) for line in open(tmp_path / 'journal.log')]
+    assert not any('full' in record for record in records)
+    assert {record['op'] for record in records if record['s'] == 'user'} == {'credit_add', 'credit_debit', 'credit_remove'}
+
+    stores = empty_stores()
+    stores['admin']['purge_protection'] = {'enabled': False}
+    make_backend(bot, tmp_path)._replay(stores)
+    assert stores['user'] == {'1': {'credits': 15}}
+    # Only the journaled admin key is replaced
+    assert stores['admin'] == {'purge_protection': {'enabled': False}, 'custom_plans': {'paid': [{'name': 'Mini'}]}}
+
+
+def test_torn_tail_is_dropped_and_truncated(bot, tmp_path):
+    backend = make_backend(bot, tmp_path)
+    backend.write({'user': backend.serialize('user', {'1': {'credits': 1}}, ['1'])})
+    intact = (tmp_path / 'journal.log').stat().st_size
+    with open(tmp_path / 'journal.log', 'ab') as f:
+        f.write(b'{"s":"user","k":"2","v":{"cre')
+
+    stores = empty_stores()
+    replayer = make_backend(bot, tmp_path)
+    replayer._replay(stores)
+
+    assert stores['user'] == {'1': {'credits': 1}}
+    assert replayer.stats['replayed'] == 1
+    assert (tmp_path / 'journal.log').stat().st_size == intact
+
+
+def test_compaction_writes_snapshots_and_empties_the_journal(bot, tmp_path):
+    backend = make_backend(bot, tmp_path)
+    users = {'1': {'credits': 1}}
+    backend.write({'user': backend.serialize('user', users, ['1'])})
+    snapshot = {name: backend.serialize_snapshot(name, obj) for name, obj in
+                {'user': users, 'vps': {}, 'admin': {}, 'deploy': {}}.items()}
+    backend.write({}, snapshot)
+
+    assert (tmp_path / 'journal.log').stat().st_size == 0
+    assert json.loads((tmp_path / 'user.json').read_text()) == users
+    assert not backend.has_journal_tail()
+
+
+def test_sqlite_admin_settings_are_written_per_key(bot, tmp_path):
+    backend = bot.SqliteBackend(str(tmp_path / 'bot.db'))
+    admin = {'admins': ['1'], 'custom_plans': {'paid': []}}
+    backend.write({'admin': backend.serialize('admin', admin, None)})
+    admin['custom_plans']['paid'].append({'name': 'Mini'})
+    backend.write({'admin': backend.serialize('admin', admin, ['custom_plans'])})
+
+    rows = dict(backend.conn.execute("SELECT key, value FROM admin"))
+    assert {key: json.loads(value) for key, value in rows.items()} == admin
@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+
+
+def lifecycle(action, name, project=None):
+    source = f"/1.0/instances/{name}" + (f"?project={project}" if project else '')
+    return json.dumps({
+        'type': 'lifecycle',
+        'timestamp': '2026-10-17T04:00:00.000000000Z',
+        'metadata': {'action': action, 'source': source, 'requestor': {'username': 'root', 'protocol': 'unix'}},
+        'location': 'none',
+        'project': project or 'default',
+    })
+
+
+@pytest.fixture
+def fleet(bot, monkeypatch):
+    vps = {
+        '1': [{'container_name': 'vps-a', 'status': 'stopped'}, {'container_name': 'vps-b', 'status': 'running'}],
+        '2': [{'container_name': 'vps-c', 'status': 'running'}],
+    }
+    saves, forgotten = [], []
+    monkeypatch.setattr(bot, 'vps_data', vps)
+    monkeypatch.setattr(bot, 'container_index', bot.ContainerIndex())
+    monkeypatch.setattr(bot, 'status_cache', bot.StatusCache(ttl=30))
+    monkeypatch.setattr(bot, 'containers_rebuilding', set())
+    monkeypatch.setattr(bot.metrics_archive, 'forget', forgotten.append)
+
+    def save_data(*stores, key=None, op=None):
+        bot.container_index.mark_dirty(key)
+        saves.append((stores, set(key), op))
+
+    monkeypatch.setattr(bot, 'save_data', save_data)
+    return vps, saves, forgotten
+
+
+def replay(bot, tmp_path, lines):
+    path = tmp_path / 'monitor.jsonl'
+    path.write_text('\n'.join(lines) + '\n')
+    monitor = bot.LifecycleEventMonitor()
+    asyncio.run(monitor.consume(bot.replay_event_lines(str(path))))
+    return monitor
+
+
+def test_recorded_stream_drives_status_transitions(bot, tmp_path, fleet):
+    vps, saves, _ = fleet
+    monitor = replay(bot, tmp_path, [
+        lifecycle('instance-started', 'vps-a'),
+        '',
+        '{"type": "lifecycle", "metadata": {"action": "instance-st',  # torn write
+        'not json at all',
+        lifecycle('instance-paused', 'vps-b', project='default'),
+        lifecycle('instance-created', 'vps-c'),  # not a state change
+        lifecycle('instance-shutdown', 'vps-c'),
+        lifecycle('instance-started', 'warm-0a1b2c'),  # no VPS record (warm pool)
+        '[]',
+        lifecycle('instance-stopped', 'vps-a'),
+    ])
+
+    assert [v['status'] for v in vps['1']] == ['stopped', 'frozen']
+    assert vps['2'][0]['status'] == 'stopped'
+    # Malformed lines are skipped; the unrelated action is counted but not applied
+    assert monitor.stats == {'events': 6, 'applied': 5, 'reconnects': 0}
+    assert [op for *_, op in saves] == ['status_change'] * 4
+    assert bot.status_cache._entries['warm-0a1b2c'][0] == 'running'
+    assert bot.status_cache._entries['vps-a'][0] == 'stopped'
+
+
+def test_deletions_mark_records_unless_a_rebuild_is_in_progress(bot, tmp_path, fleet):
+    vps, _, forgotten = fleet
+    bot.containers_rebuilding.add('vps-b')
+
+    replay(bot, tmp_path, [lifecycle('instance-deleted', 'vps-a'), lifecycle('instance-deleted', 'vps-b')])
+
+    assert [v['status'] for v in vps['1']] == ['deleted', 'running']
+    assert forgotten == ['vps-a']
+    assert 'vps-a' not in bot.status_cache._entries
+
+
+def test_index_follows_records_added_after_it_was_built(bot, tmp_path, fleet):
+    vps, _, _ = fleet
+    assert bot.find_vps('vps-c')[0] == '2'
+
+    vps['2'].append({'container_name': 'vps-d', 'status': 'stopped'})
+    bot.save_data('vps', key='2', op='vps_create')
+    vps['1'].pop(0)
+    bot.save_data('vps', key='1', op='vps_delete')
+    replay(bot, tmp_path, [lifecycle('instance-started', 'vps-d'), lifecycle('instance-started', 'vps-a')])
+
+    assert vps['2'][1]['status'] == 'running'
+    assert bot.find_vps('vps-a') == (None, None)
+    assert bot.container_index.by_owner == {'1': ['vps-b'], '2': ['vps-c', 'vps-d']}
+
+
+def test_live_stream_counts_as_connected_after_the_first_event(bot, fleet, monkeypatch):
+    monitor = bot.LifecycleEventMonitor()
+    seen = []
+    monkeypatch.setattr(monitor, '_set_connected', seen.append)
+
+    async def lines():
+        yield b'garbage\n'
+        assert seen == []
+        yield lifecycle('instance-started', 'vps-a').encode()
+
+    asyncio.run(monitor.consume(lines(), live=True))
+    assert seen == [True]
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import shlex
+
+import pytest
+
+
+class FakeLXD:
+    """Tiny HTTP/1.1 server on a unix socket answering like LXD does"""
+
+    def __init__(self, path):
+        self.path = path
+        self.requests = []
+        self.connections = 0
+        self.routes = {}
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_unix_server(self._serve, path=self.path)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, _ = request_line.decode().split(' ', 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b''):
+                name, _, value = line.decode().partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            self.requests.append((method, target, json.loads(body) if body else None))
+            status, payload = self.routes.get((method, target.split('?')[0]), (404, {'type': 'error', 'error': 'not found'}))
+            data = json.dumps(payload).encode()
+            # Alternate framings so both code paths get exercised
+            if len(self.requests) % 2:
+                writer.write(f"HTTP/1.1 {status} OK\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+            else:
+                writer.write(f"HTTP/1.1 {status} OK\r\nTransfer-Encoding: chunked\r\n\r\n{len(data):x}\r\n".encode()
+                             + data + b"\r\n0\r\n\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'lxd.sock')
+
+
+def test_stop_maps_to_a_state_change_and_waits_for_the_operation(bot, socket_path):
+    async def scenario():
+        async with FakeLXD(socket_path) as lxd:
+            lxd.routes[('PUT', '/1.0/instances/vps-a/state')] = (202, {'type': 'async', 'operation': '/1.0/operations/op1'})
+            lxd.routes[('GET', '/1.0/operations/op1/wait')] = (200, {'type': 'sync', 'metadata': {'status': 'Success'}})
+            client = bot.LXDClient(socket_path)
+            result = await client.run_cli(['lxc', 'stop', 'vps-a', '--force', '--timeout', '30'])
+            return result, lxd.requests, lxd.connections, client.stats
+
+    result, requests, connections, stats = asyncio.run(scenario())
+
+    assert result is True
+    assert requests == [
+        ('PUT', '/1.0/instances/vps-a/state', {'action': 'stop', 'timeout': 30, 'force': True, 'stateful': False}),
+        ('GET', '/1.0/operations/op1/wait?timeout=35', None),
+    ]
+    # The second request reuses the pooled keep-alive connection
+    assert connections == 1 and stats['reused'] == 1
+
+
+def test_query_returns_the_metadata_as_json(bot, socket_path):
+    async def scenario():
+        async with FakeLXD(socket_path) as lxd:
+            lxd.routes[('GET', '/1.0/instances')] = (200, {'type': 'sync', 'metadata': [{'name': 'vps-a', 'status': 'Running'}]})
+            client = bot.LXDClient(socket_path)
+            return await client.run_cli(['lxc', 'query', '/1.0/instances?recursion=1'])
+
+    assert json.loads(asyncio.run(scenario())) == [{'name': 'vps-a', 'status': 'Running'}]
+
+
+def test_api_errors_are_raised(bot, socket_path):
+    async def scenario():
+        async with FakeLXD(socket_path):
+            await bot.LXDClient(socket_path).run_cli(['lxc', 'start', 'missing'])
+
+    with pytest.raises(bot.LXDAPIError, match='not found'):
+        asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('args', [
+    ['lxc', 'stop', 'vps-a', '--timeout'],
+    ['lxc', 'stop', 'vps-a', '--timeout', 'soon'],
+    ['lxc', 'stop', 'vps-a', '--timeout=30'],
+    ['lxc', 'stop', 'vps-a', 'vps-b'],
+    ['lxc', 'query', '/1.0/instances', '-X'],
+    ['lxc', 'query', '-d', '{not json', '/1.0/instances'],
+    ['lxc', 'info', 'vps-a'],
+])
+def test_unmapped_or_malformed_commands_fall_back_to_the_cli(bot, socket_path, monkeypatch, args):
+    cli_calls = []
+
+    async def execute_cli(cmd, timeout):
+        cli_calls.append(cmd)
+        return 'from cli'
+
+    monkeypatch.setattr(bot, '_execute_lxc_cli', execute_cli)
+
+    async def scenario():
+        async with FakeLXD(socket_path) as lxd:
+            monkeypatch.setattr(bot, 'lxd_client', bot.LXDClient(socket_path))
+            result = await bot.execute_lxc(shlex.join(args))
+            return result, lxd.requests
+
+    result, requests = asyncio.run(scenario())
+
+    assert result == 'from cli'
+    assert cli_calls == [args]
+    assert requests == []
+
+
+def test_unreachable_socket_falls_back_to_the_cli(bot, socket_path, monkeypatch):
+    cli_calls = []
+
+    async def execute_cli(cmd, timeout):
+        cli_calls.append(cmd)
+        return True
+
+    monkeypatch.setattr(bot, '_execute_lxc_cli', execute_cli)
+    monkeypatch.setattr(bot, 'lxd_client', bot.LXDClient(socket_path))
+
+    assert asyncio.run(bot.execute_lxc("lxc start vps-a")) is True
+    assert cli_calls == [['lxc', 'start', 'vps-a']]
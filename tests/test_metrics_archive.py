@@ -0,0 +1,84 @@
+import asyncio
+import os
+import threading
+
+METRICS = ('cpu', 'memory')
+
+
+def test_round_robin_file_averages_within_a_step_and_wraps(bot, tmp_path):
+    rrd = bot.RoundRobinFile(str(tmp_path / 'a.rrd'), METRICS, layout=((10, 4),))
+    rrd.record(1000, {'cpu': 1.0, 'memory': 10})
+    rrd.record(1005, {'cpu': 3.0, 'memory': 30})
+    rrd.record(1010, {'cpu': 5.0})
+
+    assert rrd.read('cpu', 20, now=1010) == [(1000.0, 2.0), (1010.0, 5.0)]
+    # Metrics missing from a sample don't move the average; a bucket without any stays at zero
+    assert rrd.read('memory', 20, now=1010) == [(1000.0, 20.0), (1010.0, 0.0)]
+
+    # Four slots later the 1000 bucket has been overwritten and is no longer reported
+    rrd.record(1040, {'cpu': 7.0})
+    assert rrd.read('cpu', 40, now=1040) == [(1010.0, 5.0), (1040.0, 7.0)]
+    rrd.close()
+
+
+def test_files_survive_a_reopen(bot, tmp_path):
+    path = str(tmp_path / 'a.rrd')
+    rrd = bot.RoundRobinFile(path, METRICS)
+    rrd.record(3600, {'cpu': 0.5, 'memory': 1})
+    rrd.flush()
+    rrd.close()
+
+    assert bot.RoundRobinFile(path, METRICS).read('cpu', 10, now=3600) == [(3600.0, 0.5)]
+
+
+def test_open_files_are_capped_least_recently_used_first(bot, tmp_path):
+    archive = bot.MetricsArchive(str(tmp_path), max_open=3)
+    samples = [(f"vps-{i}", {'cpu': float(i)}, 1000) for i in range(5)]
+    archive.write(METRICS, samples)
+    assert list(archive._files) == ['vps-2', 'vps-3', 'vps-4']
+
+    # Reading touches a series, so the next eviction skips it
+    assert archive.read('vps-2', METRICS, 'cpu', 10) == []
+    archive.write(METRICS, [('vps-5', {'cpu': 5.0}, 1000)])
+    assert list(archive._files) == ['vps-4', 'vps-2', 'vps-5']
+    assert archive.stats == {'opened': 6, 'evicted': 3, 'errors': 0}
+
+    # Evicted series reopen from disk with their history intact
+    assert archive._file('vps-0', METRICS).read('cpu', 10, now=1000) == [(1000.0, 0.0)]
+    assert len(os.listdir(tmp_path)) == 6
+
+
+def test_batches_are_written_on_the_archive_thread(bot, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, 'METRICS_ARCHIVE_ENABLED', True)
+    archive = bot.MetricsArchive(str(tmp_path))
+    threads = []
+    write = archive.write
+
+    def recording_write(metrics, samples):
+        threads.append(threading.current_thread().name)
+        write(metrics, samples)
+
+    monkeypatch.setattr(archive, 'write', recording_write)
+
+    asyncio.run(archive.record_batch(METRICS, [('vps-a', {'cpu': 1.0}, 1000), ('vps-b', {'cpu': 2.0}, 1000)]))
+    archive.record(bot.HOST_SERIES, METRICS, {'cpu': 3.0}, 1000)
+    archive.flush()
+
+    assert threads and all(name.startswith('metrics-archive') for name in threads)
+    assert set(archive._files) == {'vps-a', 'vps-b', bot.HOST_SERIES}
+
+
+def test_invalid_series_names_are_rejected(bot, tmp_path):
+    archive = bot.MetricsArchive(str(tmp_path))
+    archive.write(METRICS, [('../etc/passwd', {'cpu': 1.0}, 1000)])
+    assert archive.stats['errors'] == 1
+    assert os.listdir(tmp_path) == []
+
+
+def test_prune_closes_and_deletes_vanished_containers(bot, tmp_path):
+    archive = bot.MetricsArchive(str(tmp_path), max_open=1)
+    archive.write(METRICS, [(name, {'cpu': 1.0}, 1000) for name in ('vps-a', 'vps-b', bot.HOST_SERIES)])
+
+    archive.prune({'vps-b'})
+
+    assert sorted(os.listdir(tmp_path)) == sorted(['vps-b.rrd', f"{bot.HOST_SERIES}.rrd"])
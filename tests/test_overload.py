@@ -0,0 +1,95 @@
+import asyncio
+import types
+
+import pytest
+
+
+@pytest.fixture
+def host(bot, monkeypatch):
+    state = types.SimpleNamespace(cpu=50.0, commands=[], protected={'9'})
+    owners = {'vps-hog': '1', 'vps-busy': '2', 'vps-vip': '9', 'vps-idle': '3'}
+    vps = {owner: [{'container_name': name, 'status': 'running'}] for name, owner in owners.items()}
+    consumers = [('vps-vip', 60.0), ('vps-hog', 30.0), ('vps-busy', 5.0), ('vps-idle', 0.2)]
+
+    async def execute_lxc(command, timeout=120, priority=None):
+        state.commands.append(command)
+        return True
+
+    monkeypatch.setattr(bot, 'vps_data', vps)
+    monkeypatch.setattr(bot, 'execute_lxc', execute_lxc)
+    monkeypatch.setattr(bot, 'find_vps', lambda name: (owners[name], vps[owners[name]][0]) if name in owners else (None, None))
+    monkeypatch.setattr(bot, 'is_protected_owner', lambda user_id: user_id in state.protected)
+    monkeypatch.setattr(bot, 'save_data', lambda *stores, key=None, op=None: None)
+    monkeypatch.setattr(bot, 'status_cache', bot.StatusCache())
+    monkeypatch.setattr(bot, 'system_sampler', types.SimpleNamespace(summary=lambda metric, seconds: {'avg': state.cpu}))
+    monkeypatch.setattr(bot, 'container_metrics', types.SimpleNamespace(ranked_cpu=lambda seconds: consumers))
+    monkeypatch.setattr(bot, 'CPU_THRESHOLD', 90)
+    monkeypatch.setattr(bot, 'CPU_RECOVER_THRESHOLD', 75)
+    monkeypatch.setattr(bot, 'OVERLOAD_SUSTAIN_CHECKS', 2)
+    monkeypatch.setattr(bot, 'OVERLOAD_TOP_CONSUMERS', 3)
+    return state, vps
+
+
+def run_checks(controller, state, *readings):
+    async def scenario():
+        for cpu in readings:
+            state.cpu = cpu
+            await controller.check()
+    asyncio.run(scenario())
+
+
+def test_a_single_spike_does_nothing(bot, host):
+    state, _ = host
+    controller = bot.OverloadController()
+    run_checks(controller, state, 95, 80, 95, 50)
+    assert controller.level == 0 and state.commands == []
+
+
+def test_sustained_load_throttles_then_stops_the_top_unprotected_consumers(bot, host):
+    state, vps = host
+    controller = bot.OverloadController()
+
+    run_checks(controller, state, 95, 95)
+    assert controller.level == 1
+    # Protected owners and idle containers are left alone
+    assert state.commands == [
+        f"lxc config set vps-hog limits.cpu.allowance {bot.OVERLOAD_THROTTLE_ALLOWANCE}",
+        f"lxc config set vps-busy limits.cpu.allowance {bot.OVERLOAD_THROTTLE_ALLOWANCE}",
+    ]
+
+    state.commands.clear()
+    run_checks(controller, state, 95, 95)
+    assert controller.level == 2
+    assert sorted(state.commands) == ["lxc stop vps-busy --force", "lxc stop vps-hog --force"]
+    assert controller.stopped == {'vps-hog', 'vps-busy'}
+    assert vps['1'][0]['status'] == 'stopped'
+    assert vps['9'][0]['status'] == 'running'
+
+
+def test_last_resort_stops_everything_unprotected(bot, host):
+    state, vps = host
+    controller = bot.OverloadController()
+    run_checks(controller, state, *[99] * 6)
+
+    assert controller.level == 3
+    assert {owner for owner, records in vps.items() if records[0]['status'] == 'stopped'} == {'1', '2', '3'}
+    # It never escalates past the last level
+    run_checks(controller, state, 99, 99)
+    assert controller.level == 3
+
+
+def test_recovery_lifts_throttles_after_sustained_cool_down(bot, host):
+    state, _ = host
+    controller = bot.OverloadController()
+    run_checks(controller, state, 95, 95)
+    state.commands.clear()
+
+    # Between the two thresholds nothing changes
+    run_checks(controller, state, 80, 80, 80)
+    assert controller.level == 1 and state.commands == []
+
+    run_checks(controller, state, 60, 60)
+    assert controller.level == 0
+    assert sorted(state.commands) == ["lxc config unset vps-busy limits.cpu.allowance",
+                                      "lxc config unset vps-hog limits.cpu.allowance"]
+    assert controller.throttled == set()
@@ -0,0 +1,115 @@
+import asyncio
+import types
+
+import pytest
+
+
+def bucket_of(bot, seconds):
+    """Upper bound of the bucket a sample lands in"""
+    return next(bound for bound in bot.LATENCY_BUCKETS if bound >= seconds)
+
+
+def test_percentiles_are_accurate_to_one_bucket(bot):
+    histogram = bot.LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+
+    assert histogram.count == 100
+    for q, expected in ((0.50, 0.050), (0.95, 0.095), (0.99, 0.099)):
+        assert expected <= histogram.percentile(q) <= bucket_of(bot, expected)
+    assert histogram.percentile(1.0) == histogram.max == 0.1
+    assert histogram.summary()['avg'] == pytest.approx(0.0505)
+
+
+def test_percentiles_never_exceed_the_slowest_sample(bot):
+    histogram = bot.LatencyHistogram()
+    histogram.record(0.0123)
+    assert histogram.percentile(0.5) == histogram.percentile(0.99) == 0.0123
+    # Beyond the last bucket the max is the only upper bound left
+    histogram.record(5000)
+    assert histogram.percentile(0.99) == 5000
+
+
+def test_empty_histogram_summary(bot):
+    summary = bot.LatencyHistogram().summary()
+    assert summary['count'] == summary['errors'] == 0
+    assert summary['p50'] == summary['p99'] == summary['avg'] == 0.0
+
+
+def test_timer_records_errors(bot):
+    registry = bot.PerfRegistry()
+    with registry.timer('command', 'ok'):
+        pass
+    with pytest.raises(RuntimeError):
+        with registry.timer('command', 'broken'):
+            raise RuntimeError()
+
+    assert registry.histograms[('command', 'ok')].summary()['errors'] == 0
+    assert registry.histograms[('command', 'broken')].summary()['errors'] == 1
+
+
+def test_lxc_operations_are_timed(bot, monkeypatch):
+    registry = bot.PerfRegistry()
+    monkeypatch.setattr(bot, 'perf', registry)
+    monkeypatch.setattr(bot, 'lxd_client', None)
+
+    async def execute_cli(cmd, timeout):
+        if cmd[1] == 'delete':
+            raise Exception("not found")
+        return True
+
+    monkeypatch.setattr(bot, '_execute_lxc_cli', execute_cli)
+
+    async def scenario():
+        await bot.execute_lxc("lxc start vps-a")
+        with pytest.raises(Exception):
+            await bot.execute_lxc("lxc delete vps-a --force")
+
+    asyncio.run(scenario())
+    summaries = dict(registry.summaries('lxc'))
+    assert summaries['start']['count'] == 1 and summaries['start']['errors'] == 0
+    assert summaries['delete']['errors'] == 1
+
+
+class Interaction:
+    def __init__(self, user_id):
+        self.user = types.SimpleNamespace(id=user_id)
+        self.sent = []
+        self.response = types.SimpleNamespace(defer=self._noop, send_message=self._send)
+        self.followup = types.SimpleNamespace(send=self._send)
+        self.message = types.SimpleNamespace(edit=self._noop)
+
+    async def _noop(self, *args, **kwargs):
+        pass
+
+    async def _send(self, *args, embed=None, **kwargs):
+        self.sent.append(embed.title.lstrip("▌ "))
+
+
+def test_button_failures_reported_to_the_user_count_as_errors(bot, monkeypatch):
+    registry = bot.PerfRegistry()
+    monkeypatch.setattr(bot, 'perf', registry)
+    monkeypatch.setattr(bot, 'save_data', lambda *stores, key=None, op=None: None)
+    monkeypatch.setattr(bot, 'status_cache', bot.StatusCache())
+
+    async def execute_lxc(command, timeout=120, priority=None):
+        if command.startswith('lxc stop'):
+            raise Exception('instance is busy')
+        return True
+
+    monkeypatch.setattr(bot, 'execute_lxc', execute_lxc)
+
+    async def scenario():
+        view = bot.EnhancedManageView('1', [{'container_name': 'vps-a', 'status': 'stopped'}])
+        interactions = [Interaction(1), Interaction(1), Interaction(2)]
+        await view.timed_action(interactions[0], 'start')
+        await view.timed_action(interactions[1], 'stop')
+        # Denied clicks are not failures of the action
+        await view.timed_action(interactions[2], 'stop')
+        return interactions
+
+    interactions = asyncio.run(scenario())
+    assert [i.sent for i in interactions] == [["✅ VPS Started Successfully"], ["❌ Stop Failed"], ["Access Denied"]]
+    summaries = dict(registry.summaries('button'))
+    assert (summaries['start']['count'], summaries['start']['errors']) == (1, 0)
+    assert (summaries['stop']['count'], summaries['stop']['errors']) == (2, 1)
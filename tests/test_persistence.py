@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.writes = []
+        self.threads = set()
+
+    def serialize(self, store, obj, keys):
+        self.threads.add(threading.current_thread().name)
+        return dict(obj)
+
+    def serialize_snapshot(self, store, obj):
+        return dict(obj)
+
+    def write(self, batch, snapshot=None):
+        self.writes.append((batch, snapshot))
+
+
+def test_mutations_coalesce_into_one_flush(bot):
+    backend = RecordingBackend()
+    users = {}
+    manager = bot.PersistenceManager(backend, {'user': lambda: users}, interval_ms=50)
+
+    async def scenario():
+        manager.start()
+        for i in range(20):
+            users[str(i)] = {'credits': i}
+            manager.mark_dirty('user', keys=[str(i)], op='credit_add')
+        await asyncio.sleep(0.2)
+
+    asyncio.run(scenario())
+    assert len(backend.writes) == 1
+    batch, snapshot = backend.writes[0]
+    assert snapshot is None
+    assert batch['user'] == {str(i): {'credits': i} for i in range(20)}
+
+
+def test_flush_serializes_a_copy_on_the_writer_thread(bot):
+    backend = RecordingBackend()
+    users = {'a': 1, 'b': 2}
+    manager = bot.PersistenceManager(backend, {'user': lambda: users})
+
+    async def scenario():
+        manager.mark_dirty('user', keys=['a', 'gone'])
+        changes, full = manager._capture()
+        # Later mutations on the loop must not leak into the captured rows
+        users['a'] = 99
+        users['c'] = 3
+        await asyncio.get_running_loop().run_in_executor(manager._executor, manager._write_batch, changes, full)
+
+    asyncio.run(scenario())
+    assert backend.writes == [({'user': {'a': 1}}, None)]
+    assert backend.threads and all(name.startswith('persistence') for name in backend.threads)
+
+
+def test_flush_sync_compacts_the_whole_state(bot):
+    backend = RecordingBackend()
+    backend.has_journal_tail = lambda: True
+    users, vps = {'a': 1}, {'a': []}
+    manager = bot.PersistenceManager(backend, {'user': lambda: users, 'vps': lambda: vps})
+
+    manager.flush_sync()
+
+    assert backend.writes == [({}, {'user': {'a': 1}, 'vps': {'a': []}})]
@@ -0,0 +1,61 @@
+import asyncio
+
+
+class Message:
+    def __init__(self, fail=False):
+        self.edits = []
+        self.fail = fail
+
+    async def edit(self, embed=None, **kwargs):
+        if self.fail:
+            raise Exception('429 Too Many Requests')
+        self.edits.append((embed, kwargs))
+
+
+def test_a_burst_of_updates_costs_one_edit_per_interval(bot):
+    message = Message()
+
+    async def scenario():
+        reporter = bot.ProgressReporter(message.edit, interval=0.05)
+        for step in range(10):
+            reporter.update(f"step {step}")
+        await reporter.task
+        # The first edit goes out right away with the latest state; the rest were dropped
+        assert [embed for embed, _ in message.edits] == ['step 9']
+
+        for step in range(10, 20):
+            reporter.update(f"step {step}")
+            await asyncio.sleep(0.005)
+        await reporter.task
+
+    asyncio.run(scenario())
+    assert [embed for embed, _ in message.edits] == ['step 9', 'step 19']
+
+
+def test_finish_supersedes_a_scheduled_update(bot):
+    message = Message()
+
+    async def scenario():
+        reporter = bot.ProgressReporter(message.edit, interval=10)
+        reporter.update('first')
+        await reporter.task
+        reporter.update('stale')
+        await reporter.finish('done', view=None)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert message.edits == [('first', {}), ('done', {'view': None})]
+
+
+def test_failed_progress_edits_are_logged_not_raised(bot):
+    message = Message(fail=True)
+
+    async def scenario():
+        reporter = bot.ProgressReporter(message.edit, interval=0)
+        reporter.update('step')
+        await reporter.task
+        message.fail = False
+        await reporter.finish('done')
+
+    asyncio.run(scenario())
+    assert message.edits == [('done', {})]
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def lxd(bot, monkeypatch):
+    commands, snapshots = [], []
+
+    async def execute_lxc(command, timeout=120, priority=None):
+        commands.append(command)
+        return True
+
+    async def lxd_query(method, path, body=None, timeout=120, priority=None):
+        return [f"/1.0/instances/vps-a/snapshots/{name}" for name in snapshots]
+
+    monkeypatch.setattr(bot, 'execute_lxc', execute_lxc)
+    monkeypatch.setattr(bot, 'lxd_query', lxd_query)
+    monkeypatch.setattr(bot, 'containers_rebuilding', set())
+    return commands, snapshots
+
+
+def test_reinstall_restores_the_baseline_and_keeps_the_current_size(bot, lxd, monkeypatch):
+    commands, snapshots = lxd
+    snapshots.append(bot.BASELINE_SNAPSHOT)
+    monkeypatch.setattr(bot, 'provision_container', None)  # must not be reached
+
+    method, _ = asyncio.run(bot.reinstall_container({'container_name': 'vps-a', 'ram': '4GB', 'cpu': '2'}))
+
+    assert method == 'restore'
+    assert commands[:4] == [
+        "lxc stop vps-a --force",
+        f"lxc restore vps-a {bot.BASELINE_SNAPSHOT}",
+        "lxc config set vps-a limits.memory=4096MB limits.cpu=2",
+        "lxc start vps-a",
+    ]
+    assert commands[4].startswith("lxc exec vps-a -- sh -c")
+
+
+def test_reinstall_without_a_baseline_rebuilds_and_shields_the_record(bot, lxd, monkeypatch):
+    commands, _ = lxd
+    provisioned = []
+
+    async def provision_container(name, os_image, plan, ram_mb, cpu, storage=None, features=False, priority=None):
+        # Lifecycle deletions seen during the rebuild must not mark the VPS deleted
+        assert name in bot.containers_rebuilding
+        provisioned.append((name, os_image, ram_mb, features))
+        return 'image'
+
+    monkeypatch.setattr(bot, 'provision_container', provision_container)
+    vps = {'container_name': 'vps-a', 'ram': '2GB', 'cpu': '1', 'os': 'ubuntu:24.04', 'deployed_by': '9'}
+
+    method, _ = asyncio.run(bot.reinstall_container(vps))
+
+    assert method == 'rebuild'
+    assert commands == ["lxc delete vps-a --force"]
+    assert provisioned == [('vps-a', 'ubuntu:24.04', 2048, True)]
+    assert bot.containers_rebuilding == set()
@@ -0,0 +1,61 @@
+import asyncio
+
+
+def test_concurrency_cap_and_priority_order(bot):
+    scheduler = bot.LxcScheduler(max_concurrency=2)
+    order, running, peak = [], [0], [0]
+
+    async def operation(name, priority):
+        async with scheduler.slot(name, priority):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            order.append(name)
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+
+    async def scenario():
+        tasks = [asyncio.create_task(operation(f"bg-{i}", bot.PRIORITY_BACKGROUND)) for i in range(4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(operation('user', bot.PRIORITY_INTERACTIVE)))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert peak[0] == 2
+    # The interactive operation jumps the queued background work
+    assert order.index('user') == 2
+
+
+def test_operations_on_one_container_run_one_at_a_time(bot):
+    scheduler = bot.LxcScheduler(max_concurrency=8)
+    running, peak = [0], [0]
+
+    async def operation():
+        async with scheduler.slot('vps-a'):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+
+    async def scenario():
+        await asyncio.gather(*(operation() for _ in range(3)))
+
+    asyncio.run(scenario())
+    assert peak[0] == 1
+    assert scheduler.snapshot()['containers_busy'] == 0
+
+
+def test_tmate_commands_go_through_execute_lxc(bot, monkeypatch):
+    commands = []
+
+    async def execute_cli(cmd, timeout):
+        commands.append(cmd)
+        return 'ssh abc@nyc1.tmate.io'
+
+    monkeypatch.setattr(bot, 'lxd_client', None)
+    monkeypatch.setattr(bot, '_execute_lxc_cli', execute_cli)
+    display = bot.shlex.join(["lxc", "exec", "vps-a", "--", "tmate", "-S", "/tmp/s.sock", "display", "-p", "#{tmate_ssh}"])
+
+    assert asyncio.run(bot.execute_lxc(display)) == 'ssh abc@nyc1.tmate.io'
+    # The format string survives quoting intact and the target container is scheduled
+    assert commands == [["lxc", "exec", "vps-a", "--", "tmate", "-S", "/tmp/s.sock", "display", "-p", "#{tmate_ssh}"]]
+    assert bot.lxc_target(commands[0]) == 'vps-a'
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def fleet(bot, monkeypatch):
+    vps = {'1': [{'container_name': 'vps-a', 'status': 'stopped'}]}
+    lxd = {'vps-a': 'running'}
+    fetches = []
+
+    async def get_fleet_status(priority=None):
+        fetches.append(priority)
+        return dict(lxd)
+
+    cache = bot.StatusCache(ttl=30)
+    monkeypatch.setattr(bot, 'vps_data', vps)
+    monkeypatch.setattr(bot, 'get_fleet_status', get_fleet_status)
+    monkeypatch.setattr(bot, 'status_cache', cache)
+    monkeypatch.setattr(bot, 'save_data', lambda *stores, key=None, op=None: None)
+    monkeypatch.setattr(bot.metrics_archive, 'prune', lambda names: None)
+    monkeypatch.setattr(bot.lifecycle_monitor, 'connected', False)
+    return cache, vps, lxd, fetches
+
+
+def test_cold_miss_fetches_then_hits_are_served_from_memory(bot, fleet):
+    cache, vps, _, fetches = fleet
+
+    async def scenario():
+        await cache.ensure()
+        await cache.ensure()
+        await cache.ensure()
+
+    asyncio.run(scenario())
+    assert len(fetches) == 1
+    assert cache.stats == {'hits': 2, 'misses': 1, 'revalidations': 0}
+    assert vps['1'][0]['status'] == 'running'
+
+
+def test_stale_entries_are_served_while_revalidating_in_the_background(bot, fleet, monkeypatch):
+    cache, vps, lxd, fetches = fleet
+    clock = [1000.0]
+    monkeypatch.setattr(bot.time, 'monotonic', lambda: clock[0])
+
+    async def scenario():
+        await cache.ensure()
+        lxd['vps-a'] = 'stopped'
+        clock[0] += 31
+        await cache.ensure()
+        # The stale value is returned right away ...
+        assert vps['1'][0]['status'] == 'running'
+        await cache._revalidate_task
+        # ... and the background refresh brings it up to date
+        assert vps['1'][0]['status'] == 'stopped'
+
+    asyncio.run(scenario())
+    assert cache.stats['revalidations'] == 1
+    assert fetches == [bot.PRIORITY_NORMAL, bot.PRIORITY_BACKGROUND]
+
+
+def test_invalidate_replaces_an_entry_with_the_known_state(bot, fleet):
+    cache, vps, _, fetches = fleet
+
+    async def scenario():
+        await cache.ensure()
+        cache.invalidate('vps-a', 'frozen')
+        await cache.ensure()
+
+    asyncio.run(scenario())
+    assert len(fetches) == 1
+    assert vps['1'][0]['status'] == 'frozen'
+
+
+def test_missing_containers_do_not_force_a_fetch_every_time(bot, fleet):
+    cache, vps, lxd, fetches = fleet
+    vps['1'].append({'container_name': 'vps-gone', 'status': 'running'})
+
+    async def scenario():
+        await cache.ensure()
+        await cache.ensure()
+
+    asyncio.run(scenario())
+    assert len(fetches) == 1
+    assert vps['1'][1]['status'] == 'running'
+
+
+def test_live_lifecycle_events_stretch_the_ttl(bot, fleet, monkeypatch):
+    cache = fleet[0]
+    assert cache.effective_ttl() == 30
+    monkeypatch.setattr(bot.lifecycle_monitor, 'connected', True)
+    assert cache.effective_ttl() == bot.STATUS_SWEEP_INTERVAL
@@ -0,0 +1,36 @@
+def write(backend, store, obj, keys):
+    backend.write({store: backend.serialize(store, obj, keys)})
+
+
+def test_sqlite_backend_updates_only_the_changed_rows(bot, tmp_path):
+    backend = bot.SqliteBackend(str(tmp_path / 'bot.db'))
+    users = {'1': {'credits': 10}, '2': {'credits': 20}}
+    vps = {'1': [{'container_name': 'vps-a', 'status': 'running'}, {'container_name': 'vps-b', 'status': 'stopped'}]}
+    write(backend, 'user', users, None)
+    write(backend, 'vps', vps, None)
+
+    users['1']['credits'] = 5
+    del users['2']
+    write(backend, 'user', users, ['1', '2'])
+    vps['1'].pop(0)
+    write(backend, 'vps', vps, ['1'])
+
+    conn = backend.conn
+    assert conn.execute("SELECT user_id, credits FROM users").fetchall() == [('1', 5)]
+    assert conn.execute("SELECT owner_id, position, container_name FROM vps").fetchall() == [('1', 0, 'vps-b')]
+
+
+def test_sqlite_backend_migrates_the_json_files_once(bot, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, 'load_data', lambda: {'1': {'credits': 3}})
+    monkeypatch.setattr(bot, 'load_vps_data', lambda: {'1': [{'container_name': 'vps-a'}]})
+    monkeypatch.setattr(bot, 'load_admin_data', lambda: {'admins': ['1']})
+    monkeypatch.setattr(bot, 'load_deployment_data', lambda: {})
+    path = str(tmp_path / 'bot.db')
+
+    users, vps, admin, deploy = bot.SqliteBackend(path).load()
+    assert users == {'1': {'credits': 3}}
+    assert vps == {'1': [{'container_name': 'vps-a'}]}
+    assert admin == {'admins': ['1']}
+
+    monkeypatch.setattr(bot, 'load_data', lambda: {})
+    assert bot.SqliteBackend(path).load()[0] == {'1': {'credits': 3}}